@@ -1,6 +1,13 @@
 from flask import Flask, render_template_string, url_for, request, redirect, session
 from dash import Dash, html
 
+from cheminf.db.db import init_indexes, start_checkpoint_task, transaction
+from cheminf.time_series.summary import ensure_summary_table
+from cheminf.time_series.rollups import ensure_rollup_table
+from cheminf.molecules.depiction import ensure_depiction_table
+from cheminf.molecules.fingerprints import ensure_fingerprint_table
+from cheminf.molecules.structure import ensure_structure_columns
+from cheminf.molecules.descriptors import ensure_descriptor_table
 from cheminf.molecules.rest_api import server as api_server
 from cheminf.molecules.ui import app as dash_app
 from cheminf.app_server import server
@@ -291,5 +298,24 @@ START_PAGE = """
 def index():
     return render_template_string(START_PAGE, instance_name=instance_name)
 
+def init_app():
+    """
+    Prepare the database for serving: create missing indexes and tables, migrate
+    older databases and start the WAL checkpoint thread. Called by the launchers
+    (scripts/run.py, the packaged entry point) before server.run(), not at import,
+    so importing this module does not write to the database.
+    """
+    init_indexes()           # Create missing indexes for the time series and LIMS query paths
+    with transaction() as connection:
+        ensure_summary_table(connection)  # Per-series summary used by the time series listings
+        ensure_rollup_table(connection)   # Minute/hour/day buckets for long-range queries
+        ensure_depiction_table(connection) # PNG blob tier of the molecule depiction cache
+        ensure_fingerprint_table(connection) # Persisted fingerprints for structure search
+        ensure_structure_columns(connection) # Canonical SMILES / InChIKey unique keys
+        ensure_descriptor_table(connection)  # Indexed MW/logP/TPSA/... for range filters
+    start_checkpoint_task()  # Keep the WAL file bounded while readers and writers run concurrently
+    return server
+
 if __name__ == '__main__':
+    init_app()
     server.run(debug=True, port=8050)
\ No newline at end of file
@@ -61,6 +61,24 @@ else:
     
 DB_PREFIX = SETTINGS["database"]["prefix"]
 
+# Connection pool (0 disables pooling and opens a connection per query)
+DB_POOL_SIZE = SETTINGS["database"].get("pool_size", 8)
+DB_POOL_TIMEOUT = SETTINGS["database"].get("pool_timeout", 30)
+
+# PRAGMA overrides (see cheminf/db/pragmas.py for defaults) and WAL checkpointing
+DB_PRAGMAS = SETTINGS["database"].get("pragmas", {})
+DB_CHECKPOINT_INTERVAL = SETTINGS["database"].get("checkpoint_interval", 300)
+DB_CHECKPOINT_MODE = SETTINGS["database"].get("checkpoint_mode", "PASSIVE")
+
+# Time series ingest queue (see cheminf/time_series/ingest.py)
+INGEST_SETTINGS = SETTINGS.get("ingest", {})
+INGEST_QUEUE_POINTS = INGEST_SETTINGS.get("queue_points", 1000000)   # 429 once this many points are waiting
+INGEST_BATCH_POINTS = INGEST_SETTINGS.get("batch_points", 50000)     # points per write transaction
+INGEST_MAX_REQUEST_POINTS = INGEST_SETTINGS.get("max_request_points", 100000)
+INGEST_WAIT_TIMEOUT = INGEST_SETTINGS.get("wait_timeout", 30)        # seconds a request waits for its commit
+INGEST_STREAM_BATCH_POINTS = INGEST_SETTINGS.get("stream_batch_points", 5000)  # streamed points per submit
+INGEST_STREAM_FLUSH_INTERVAL = INGEST_SETTINGS.get("stream_flush_interval", 1.0)  # max seconds a received point waits to be submitted
+
 # Admin credentials
 ADMIN_USERNAME = SETTINGS["admin"]["username"]
 ADMIN_PASSWORD = SETTINGS["admin"]["password"]
@@ -1,5 +1,8 @@
+import atexit
 import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 # Try to load dotenv, but continue if not available
@@ -9,18 +12,111 @@ try:
 except ImportError:
     pass  # dotenv not available, continue without it
 
+from cheminf.config import DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_PRAGMAS, DB_CHECKPOINT_INTERVAL, DB_CHECKPOINT_MODE
+from cheminf.db.pool import ConnectionPool, PooledConnection
+from cheminf.db.pragmas import CheckpointTask, apply_pragmas, build_profile
+from cheminf.db.indexes import ensure_indexes
+
 # SQLite database configuration
 DB_PATH = Path(__file__).parent.parent.parent / "cheminf_edu.db"
 DB_PREFIX = os.environ.get('DB_PREFIX', 'cheminf3_')
 
 TABLE_NAME = f"{DB_PREFIX}molecules"
 
-def get_db_connection():
-    """Get SQLite database connection with row factory for dictionary-like access."""
-    connection = sqlite3.connect(DB_PATH)
+PRAGMA_PROFILE = build_profile(DB_PRAGMAS)
+
+_pool = None
+_pool_lock = threading.Lock()
+_checkpoint_task = None
+_aggregates = {}
+
+def register_aggregate(name, num_params, aggregate_class):
+    """Register a user-defined SQL aggregate on every connection from get_db_connection()."""
+    _aggregates[name] = (num_params, aggregate_class)
+
+def _register_aggregates(connection):
+    for name, (num_params, aggregate_class) in _aggregates.items():
+        connection.create_aggregate(name, num_params, aggregate_class)
+
+def connect(pooled=True):
+    """Open a new SQLite connection with row factory and the PRAGMA profile applied."""
+    if pooled:
+        connection = sqlite3.connect(DB_PATH, factory=PooledConnection, check_same_thread=False)
+    else:
+        connection = sqlite3.connect(DB_PATH)
     connection.row_factory = sqlite3.Row  # This allows dictionary-like access to rows
+    apply_pragmas(connection, PRAGMA_PROFILE)
+    _register_aggregates(connection)
+    if pooled:
+        connection.aggregate_count = len(_aggregates)
     return connection
 
+def get_pool():
+    """Get the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(connect, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT)
+    return _pool
+
+def close_pool():
+    """Close all pooled connections (called automatically at interpreter exit)."""
+    global _pool
+    stop_checkpoint_task()
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+
+def start_checkpoint_task():
+    """Start the periodic WAL checkpoint thread (no-op if disabled or already running)."""
+    global _checkpoint_task
+    if DB_CHECKPOINT_INTERVAL <= 0 or str(PRAGMA_PROFILE["journal_mode"]).lower() != "wal":
+        return None
+    with _pool_lock:
+        if _checkpoint_task is None:
+            _checkpoint_task = CheckpointTask(
+                lambda: connect(pooled=False),
+                interval=DB_CHECKPOINT_INTERVAL,
+                mode=DB_CHECKPOINT_MODE
+            )
+            _checkpoint_task.start()
+    return _checkpoint_task
+
+def stop_checkpoint_task():
+    """Stop the WAL checkpoint thread if it is running."""
+    global _checkpoint_task
+    with _pool_lock:
+        if _checkpoint_task is not None:
+            _checkpoint_task.stop()
+            _checkpoint_task = None
+
+atexit.register(close_pool)
+
+def get_db_connection():
+    """
+    Get SQLite database connection with row factory for dictionary-like access.
+    Connections come from a shared pool; close() hands them back instead of disconnecting.
+    Setting database.pool_size to 0 in settings.json disables pooling.
+    """
+    if DB_POOL_SIZE <= 0:
+        return connect(pooled=False)
+    connection = get_pool().acquire()
+    if connection.aggregate_count != len(_aggregates):
+        # Aggregates registered after this pooled connection was opened
+        _register_aggregates(connection)
+        connection.aggregate_count = len(_aggregates)
+    return connection
+
+def init_indexes():
+    """Create any missing secondary indexes (safe to call at every startup)."""
+    connection = get_db_connection()
+    try:
+        return ensure_indexes(connection)
+    finally:
+        connection.close()
+
 def get_all_rows():
     """Get all rows from molecules table."""
     connection = get_db_connection()
@@ -51,6 +147,64 @@ def execute_query(query, params=None):
         cursor.close()
         connection.close()
 
+@contextmanager
+def transaction():
+    """
+    Yield one connection for several statements; commit on success, roll back on error.
+    The transaction is opened at once, so its reads share one snapshot. A transaction()
+    nested in another on the same thread runs in a SAVEPOINT of the outer one, and
+    commits made inside (e.g. by execute_query) are left to the outermost block.
+    """
+    connection = get_db_connection()
+    pooled = isinstance(connection, PooledConnection)
+    depth = connection.transaction_depth if pooled else 0
+    savepoint = f"cheminf_tx_{depth}" if depth else None
+    try:
+        if savepoint:
+            connection.execute(f"SAVEPOINT {savepoint}")
+        elif not connection.in_transaction:
+            connection.execute("BEGIN")
+        if pooled:
+            connection.transaction_depth = depth + 1
+        try:
+            yield connection
+        except Exception:
+            if savepoint:
+                connection.execute(f"ROLLBACK TO {savepoint}")
+                connection.execute(f"RELEASE {savepoint}")
+            else:
+                connection.rollback()
+            raise
+        if pooled:
+            connection.transaction_depth = depth
+        if savepoint:
+            connection.execute(f"RELEASE {savepoint}")
+        else:
+            connection.commit()
+    finally:
+        if pooled:
+            connection.transaction_depth = depth
+        connection.close()
+
+def iter_query(query, params=None, batch_size=1000):
+    """
+    Yield SELECT results as dictionaries, fetching batch_size rows at a time.
+    The connection is held until the generator is exhausted or closed.
+    """
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, params or ())
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for row in batch:
+                yield dict(row)
+    finally:
+        cursor.close()
+        connection.close()
+
 def execute_many(query, params_list):
     """Execute a query with multiple parameter sets."""
     connection = get_db_connection()
@@ -0,0 +1,114 @@
+"""
+SQLite Index Management
+Declares the secondary indexes the REST and Dash query paths rely on, creates any that
+are missing at startup, and verifies with EXPLAIN QUERY PLAN that the hot queries use them.
+"""
+
+import re
+
+from cheminf.config import DB_PREFIX
+
+# (index name, table, columns) - table names without prefix
+INDEXES = [
+    # Data/plot queries: WHERE experiment_id = ? AND parameter_name IN (...) ORDER BY parameter_name, time_step
+    ("idx_time_series_exp_param_step", "time_series", ("experiment_id", "parameter_name", "time_step")),
+    # Statistics/series listing: covers the grouped MIN/MAX/AVG over value and timestamp without touching the table
+    ("idx_time_series_exp_param_stats", "time_series",
+     ("experiment_id", "parameter_name", "unit", "series_name", "timestamp", "value")),
+    # Experiments listing: keyset pages on (experiment_name, experiment_id)
+    ("idx_experiments_name", "experiments", ("experiment_name", "experiment_id")),
+    ("idx_samples_experiment", "samples", ("experiment_id",)),
+    ("idx_measurements_sample", "measurements", ("sample_id",)),
+    # Molecules table paging: ORDER BY <column>, id and =/range/prefix filters on name or SMILES
+    ("idx_molecules_name", "molecules", ("MoleculeUpacName", "id")),
+    ("idx_molecules_smiles", "molecules", ("SMILES", "id")),
+]
+
+def plan_checks():
+    """
+    (description, tables, alias, query, params) of the hot queries. Each query comes
+    from the constant or builder its endpoint runs, so a changed query is checked as
+    it is; each must SEARCH the table (by its alias) with an index, never SCAN it.
+    """
+    # Imported here: these modules use cheminf.db.db, which imports this module
+    from cheminf.db.pagination import page_sql
+    from cheminf.lims_experiments.rest_api import EXPERIMENT_SAMPLES_QUERY, SAMPLE_MEASUREMENTS_QUERY
+    from cheminf.molecules.repository import MoleculeRepository
+    from cheminf.time_series.rest_api import (EXPERIMENT_PAGE_QUERY, PARAMETER_NAMES_QUERY, raw_data_query,
+                                              statistics_query)
+
+    molecules_page, _, molecules_params = MoleculeRepository().page_sql(
+        filters=[("MoleculeUpacName", "startswith", "Ac")], sort_column="MoleculeUpacName")
+    return [
+        ("time series data by experiment/parameter", ("time_series",), f"{DB_PREFIX}time_series",
+         raw_data_query(filters=" AND timestamp >= ? AND timestamp <= ?"),
+         (1, "a", "2024-01-01", "2024-12-31", 1000)),
+        ("time series parameter names by experiment", ("time_series",), f"{DB_PREFIX}time_series",
+         PARAMETER_NAMES_QUERY, {"experiment_id": 1}),
+        ("time series statistics by experiment", ("time_series",), f"{DB_PREFIX}time_series",
+         statistics_query(parameter_count=2), (1, "a", "b")),
+        ("time series experiments page after a cursor", ("experiments", "time_series_summary"), "e",
+         page_sql(EXPERIMENT_PAGE_QUERY, ["experiment_name", "experiment_id"], after_cursor=True),
+         ("Exp-001", 1, 101)),
+        ("samples by experiment", ("samples",), "s", EXPERIMENT_SAMPLES_QUERY, (1,)),
+        ("measurements by sample", ("measurements",), "m", SAMPLE_MEASUREMENTS_QUERY, (1,)),
+        ("molecules page by name prefix", ("molecules",), f"{DB_PREFIX}molecules",
+         molecules_page, molecules_params + [25, 0]),
+    ]
+
+def _table_exists(connection, table):
+    row = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+def missing_indexes(connection):
+    """(name, table, columns) of the declared indexes whose table exists but index does not."""
+    missing = []
+    for name, table, columns in INDEXES:
+        full_table = f"{DB_PREFIX}{table}"
+        full_name = f"{DB_PREFIX}{name}"
+        if not _table_exists(connection, full_table):
+            continue
+        exists = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (full_name,)
+        ).fetchone()
+        if not exists:
+            missing.append((full_name, full_table, columns))
+    return missing
+
+def ensure_indexes(connection):
+    """Create any missing indexes; returns the names of indexes that were created."""
+    created = []
+    for full_name, full_table, columns in missing_indexes(connection):
+        connection.execute(f"CREATE INDEX {full_name} ON {full_table} ({', '.join(columns)})")
+        created.append(full_name)
+    if created:
+        connection.commit()
+        connection.execute("PRAGMA optimize")  # Refresh planner statistics for the new indexes
+    return created
+
+def explain(connection, query, params=()):
+    """Return the EXPLAIN QUERY PLAN detail lines for a query."""
+    return [row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()]
+
+def uses_index(plan, alias):
+    """True if the plan searches `alias` through an index and never scans it."""
+    searched = re.compile(rf"SEARCH {re.escape(alias)} USING (COVERING )?INDEX ")
+    scanned = re.compile(rf"SCAN {re.escape(alias)}\b")
+    return (any(searched.match(line) for line in plan)
+            and not any(scanned.match(line) for line in plan))
+
+def check_query_plans(connection):
+    """
+    Run EXPLAIN QUERY PLAN for every plan_checks() entry, as the indexes are now
+    (nothing is created first, so a missing index shows up as a failed check).
+    Returns a list of (description, ok, plan_lines).
+    """
+    results = []
+    for description, tables, alias, query, params in plan_checks():
+        if not all(_table_exists(connection, f"{DB_PREFIX}{table}") for table in tables):
+            continue
+        plan = explain(connection, query, params)
+        results.append((description, uses_index(plan, alias), plan))
+    return results
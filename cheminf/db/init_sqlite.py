@@ -7,15 +7,18 @@ import sqlite3
 import os
 from pathlib import Path
 
+from cheminf.db.indexes import ensure_indexes
+
 # Define database path
 DB_PATH = Path(__file__).parent.parent.parent / "cheminf_edu.db"
 
 def create_database():
     """Create SQLite database and all required tables with sample data."""
     
-    # Remove existing database if it exists
-    if DB_PATH.exists():
-        os.remove(DB_PATH)
+    # Remove existing database (and any WAL/shared-memory files) if it exists
+    for path in (DB_PATH, Path(f"{DB_PATH}-wal"), Path(f"{DB_PATH}-shm")):
+        if path.exists():
+            os.remove(path)
     
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
@@ -29,7 +32,10 @@ def create_database():
             CREATE TABLE cheminf3_molecules (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 MoleculeUpacName CHAR(200) NOT NULL,
-                SMILES VARCHAR(255)
+                SMILES VARCHAR(255),
+                canonical_smiles VARCHAR(255),
+                inchikey CHAR(27),
+                structure_checked INTEGER NOT NULL DEFAULT 0
             )
         """)
         
@@ -281,6 +287,7 @@ def create_database():
         """, measurements_data)
         
         conn.commit()
+        ensure_indexes(conn)
         print(f"[SUCCESS] SQLite database created successfully at: {DB_PATH}")
         print(f"[INFO] Created {len(molecules_data)} molecules")
         print(f"[INFO] Created 1 reaction with 5 participants")
@@ -0,0 +1,107 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is read with WHERE (sort keys) > (keys of the previous page's last row)
+ORDER BY sort keys LIMIT n, so every page is an index seek and page 1000 costs the
+same as page 1. The continuation token is the last row's key values, JSON encoded
+and base64url wrapped; clients pass it back unchanged as ?cursor=.
+"""
+
+import base64
+import binascii
+import json
+from urllib.parse import urlencode
+
+from flask import request, jsonify
+
+from cheminf.db.db import execute_query
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(values):
+    """Encode the sort key values of a row as an opaque continuation token."""
+    raw = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token, key_count):
+    """Decode a continuation token; raises ValueError if it is not a valid cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != key_count:
+        raise ValueError("Invalid cursor")
+    # Only values SQLite can bind; objects or nested lists would fail in the query
+    if not all(value is None or isinstance(value, (str, int, float)) for value in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+def page_args(default_limit=DEFAULT_PAGE_SIZE, max_limit=MAX_PAGE_SIZE):
+    """Read (limit, cursor) from the request's query string."""
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except ValueError:
+        raise ValueError("Limit must be an integer")
+    if limit < 1 or limit > max_limit:
+        raise ValueError(f"Limit must be between 1 and {max_limit}")
+    return limit, request.args.get('cursor') or None
+
+def page_sql(query, key_columns, after_cursor=False, offset=False):
+    """
+    The page query fetch_page() runs; its params are the query's, then the cursor's
+    key values (after_cursor), the row limit and the offset (offset).
+    """
+    keys = ', '.join(key_columns)
+    sql = f"SELECT * FROM ({query})"
+    if after_cursor:
+        sql += f" WHERE ({keys}) > ({', '.join('?' for _ in key_columns)})"
+    sql += f" ORDER BY {keys} LIMIT ?"
+    if offset:
+        sql += " OFFSET ?"
+    return sql
+
+def fetch_page(query, key_columns, limit, cursor=None, params=None, offset=0):
+    """
+    Fetch one page of `query`, a SELECT without ORDER BY/LIMIT whose result
+    columns include key_columns (which together must be unique).
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    offset is for endpoints that accepted ?offset= before cursors existed: it skips
+    rows in the same order (an OFFSET scan) and cannot be combined with a cursor.
+    """
+    if cursor and offset:
+        raise ValueError("Use either cursor or offset, not both")
+    params = list(params or [])
+    if cursor:
+        params.extend(decode_cursor(cursor, len(key_columns)))
+    params.append(limit + 1)  # one extra row tells whether another page exists
+    if offset:
+        params.append(offset)
+
+    rows = execute_query(page_sql(query, key_columns, bool(cursor), bool(offset)), params)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1][column] for column in key_columns)
+
+def set_next_link(response, next_cursor):
+    """Advertise the next page via X-Next-Cursor and a Link: rel="next" header."""
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+    return response
+
+def paginated_response(query, key_columns, params=None, default_limit=DEFAULT_PAGE_SIZE):
+    """
+    JSON array response with one page of `query`; the next page's cursor is
+    returned in the X-Next-Cursor and Link headers. Invalid limit/cursor -> 400.
+    """
+    try:
+        limit, cursor = page_args(default_limit)
+        rows, next_cursor = fetch_page(query, key_columns, limit, cursor, params)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return set_next_link(jsonify(rows), next_cursor)
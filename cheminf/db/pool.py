@@ -0,0 +1,169 @@
+"""
+SQLite Connection Pool
+Keeps a bounded set of open SQLite connections and hands them out per thread, so
+REST handlers and Dash callbacks reuse connections instead of reconnecting per query.
+"""
+
+import sqlite3
+import threading
+import time
+
+
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection whose close() returns it to the owning pool."""
+
+    transaction_depth = 0  # open cheminf.db.db.transaction() blocks using this connection
+
+    def commit(self):
+        # A nested acquire() shares the connection, so a commit from an inner
+        # execute_query() would end the outer transaction() half-way. Inside a
+        # transaction() only the outermost block commits.
+        if self.transaction_depth == 0:
+            super().commit()
+
+    def close(self):
+        pool = getattr(self, "_pool", None)
+        if pool is None:
+            super().close()
+        else:
+            pool.release(self)
+
+    def close_physical(self):
+        """Really close the underlying SQLite handle."""
+        self._pool = None
+        super().close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of PooledConnection objects.
+
+    A thread that already holds a connection gets the same one back on nested
+    acquire() calls (see PooledConnection.commit()), and a thread prefers the connection it used last when it is
+    still idle. Idle connections are health-checked before reuse.
+    """
+
+    def __init__(self, connect, max_size=8, timeout=30.0, health_check_interval=60.0):
+        self._connect = connect  # zero-argument callable returning a PooledConnection
+        self.max_size = max(1, int(max_size))
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    def acquire(self):
+        """Check out a connection for the current thread."""
+        conn = getattr(self._local, "connection", None)
+        if conn is not None and conn._depth > 0:
+            conn._depth += 1
+            return conn
+
+        conn = self._checkout(home=conn)
+        conn._depth = 1
+        self._local.connection = conn
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool once its outermost user closes it."""
+        conn._depth -= 1
+        if conn._depth > 0:
+            return
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()  # Uncommitted work is discarded, as with a real close()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                conn.close_physical()
+            else:
+                conn._last_used = time.monotonic()
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def close_all(self):
+        """Close idle connections and make checked-out ones close on release."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._size -= 1
+                self._idle.pop().close_physical()
+            self._cond.notify_all()
+
+    def stats(self):
+        """Return current pool occupancy."""
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "open": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+            }
+
+    def _checkout(self, home=None):
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise sqlite3.OperationalError("Connection pool is closed")
+                if self._idle:
+                    if home is not None and home in self._idle:
+                        self._idle.remove(home)
+                        conn = home
+                    else:
+                        conn = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError(
+                        f"Connection pool exhausted (max_size={self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+        if conn is not None and self._is_healthy(conn):
+            return conn
+        if conn is not None:
+            conn.close_physical()
+        return self._open()
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        conn._pool = self
+        conn._depth = 0
+        conn._last_used = time.monotonic()
+        return conn
+
+    def _is_healthy(self, conn):
+        if time.monotonic() - conn._last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        try:
+            conn.close_physical()
+        except sqlite3.Error:
+            pass
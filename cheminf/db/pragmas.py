@@ -0,0 +1,69 @@
+"""
+SQLite PRAGMA Profile
+Connection tuning applied to every connection from cheminf.db.db, plus a background
+task that checkpoints the write-ahead log so it stays bounded.
+"""
+
+import re
+import sqlite3
+import threading
+
+# Defaults, overridable from the "pragmas" object in the database section of settings.json.
+# WAL lets readers run concurrently with a writer; synchronous=NORMAL is durable in WAL mode.
+DEFAULT_PRAGMAS = {
+    "busy_timeout": 5000,              # ms to wait for a lock before raising "database is locked"
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "cache_size": -65536,              # negative = KiB, i.e. 64 MiB page cache
+    "mmap_size": 268435456,            # 256 MiB memory-mapped I/O
+    "temp_store": "memory",
+    "journal_size_limit": 67108864,    # truncate the WAL back to 64 MiB after checkpoints
+}
+
+_VALUE_PATTERN = re.compile(r"^-?\d+$|^[A-Za-z_]+$")
+
+def build_profile(overrides=None):
+    """Merge settings overrides into the default profile and validate it."""
+    profile = dict(DEFAULT_PRAGMAS)
+    profile.update(overrides or {})
+    for name, value in profile.items():
+        if name not in DEFAULT_PRAGMAS:
+            raise ValueError(f"Unsupported PRAGMA in settings: {name}")
+        if not _VALUE_PATTERN.match(str(value)):
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value!r}")
+    return profile
+
+def apply_pragmas(connection, profile):
+    """Apply a validated PRAGMA profile to an open connection."""
+    for name, value in profile.items():
+        connection.execute(f"PRAGMA {name} = {value}")
+
+class CheckpointTask(threading.Thread):
+    """Daemon thread running PRAGMA wal_checkpoint at a fixed interval."""
+
+    def __init__(self, connect, interval=300, mode="PASSIVE"):
+        super().__init__(name="sqlite-wal-checkpoint", daemon=True)
+        self._connect = connect  # zero-argument callable returning a dedicated connection
+        self.interval = interval
+        self.mode = mode.upper()
+        self.last_result = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        connection = self._connect()
+        try:
+            while not self._stop_event.wait(self.interval):
+                self.checkpoint(connection)
+        finally:
+            connection.close()
+
+    def checkpoint(self, connection):
+        """Run one checkpoint; returns (busy, wal_pages, checkpointed_pages)."""
+        try:
+            self.last_result = tuple(connection.execute(f"PRAGMA wal_checkpoint({self.mode})").fetchone())
+        except sqlite3.Error as e:
+            print(f"WAL checkpoint failed: {e}")
+        return self.last_result
+
+    def stop(self):
+        self._stop_event.set()
@@ -1,5 +1,6 @@
 from flask import request, jsonify
 from cheminf.db.db import execute_query
+from cheminf.db.pagination import paginated_response
 from cheminf.config import DB_PREFIX
 from cheminf.app_server import server
 
@@ -11,9 +12,9 @@ BASE_API = "/api/inventory"
 
 @server.route(f'{BASE_API}', methods=['GET'])
 def api_get_inventory():
+    """Get inventory entries ordered by id, one page at a time (?limit=, ?cursor=)"""
     try:
-        rows = execute_query(f"SELECT * FROM {INVENTORY_TABLE}")
-        return jsonify(rows)
+        return paginated_response(f"SELECT * FROM {INVENTORY_TABLE}", ["id"])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -3,6 +3,7 @@ import dash
 from cheminf.app_server import server
 from cheminf.db.db import execute_query
 from cheminf.config import DB_PREFIX
+from cheminf.ui_utils import lazy_layout
 
 # Build table name for inventory data
 INVENTORY_TABLE = f"{DB_PREFIX}inventory"
@@ -19,109 +20,113 @@ app = dash.Dash(__name__,
 def get_all_inventory():
     return execute_query(f"SELECT * FROM {INVENTORY_TABLE}")
 
-app.layout = html.Div(
-    className="container",
-    children=[
-        # Home link in white at the top right
-        html.Div(
-            html.A("Home", href="/", style={"color": "white", "textDecoration": "none"}),
-            style={"textAlign": "right", "padding": "10px"}
-        ),
-        html.H1("Inventory"),
-        html.Div(
-            className="card",
-            children=[
-                html.H3("Check Inventory"),
-                dcc.Input(
-                    id='inventory-molecule',
-                    type='text',
-                    placeholder='Enter Molecule Name for Inventory',
-                    style={"color": "black"}  # Added style for better text readability
-                ),
-                html.Button('Check Inventory', id='inventory-btn'),
-                html.Div(id='inventory-output')
-            ]
-        ),
-        html.Hr(),
-        html.Div(
-            className="card",
-            children=[
-                html.H3("Add New Inventory Entry"),
-                dcc.Input(
-                    id='inventory-input-name',
-                    type='text',
-                    placeholder='Enter Molecule UPAC Name',
-                    style={"color": "black"}
-                ),
-                dcc.Input(
-                    id='inventory-input-amount',
-                    type='number',
-                    placeholder='Enter Amount',
-                    style={"color": "black"}
-                ),
-                dcc.Input(
-                    id='inventory-input-unit',
-                    type='text',
-                    placeholder='Enter Unit (e.g., ml)',
-                    style={"color": "black"}
-                ),
-                html.Button('Insert', id='inventory-insert-btn'),
-                html.Div(id='inventory-insert-output')
-            ]
-        ),
-        html.Br(),
-        dash_table.DataTable(
-            id='inventory-table',
-            columns=[
-                {"name": "ID", "id": "id"},
-                {"name": "MoleculeUpacName", "id": "MoleculeUpacName"},
-                {"name": "Amount", "id": "amount"},
-                {"name": "Unit", "id": "unit"}
-            ],
-            data=get_all_inventory(),
-            row_selectable='single',
-            selected_rows=[],
-            style_data={"color": "black"},
-            style_data_conditional=[
-                {
-                    "if": {"state": "selected"},
-                    "color": "white"
+def build_layout(inventory):
+    """Page layout, built per request so the inventory table is current."""
+    return html.Div(
+        className="container",
+        children=[
+            # Home link in white at the top right
+            html.Div(
+                html.A("Home", href="/", style={"color": "white", "textDecoration": "none"}),
+                style={"textAlign": "right", "padding": "10px"}
+            ),
+            html.H1("Inventory"),
+            html.Div(
+                className="card",
+                children=[
+                    html.H3("Check Inventory"),
+                    dcc.Input(
+                        id='inventory-molecule',
+                        type='text',
+                        placeholder='Enter Molecule Name for Inventory',
+                        style={"color": "black"}  # Added style for better text readability
+                    ),
+                    html.Button('Check Inventory', id='inventory-btn'),
+                    html.Div(id='inventory-output')
+                ]
+            ),
+            html.Hr(),
+            html.Div(
+                className="card",
+                children=[
+                    html.H3("Add New Inventory Entry"),
+                    dcc.Input(
+                        id='inventory-input-name',
+                        type='text',
+                        placeholder='Enter Molecule UPAC Name',
+                        style={"color": "black"}
+                    ),
+                    dcc.Input(
+                        id='inventory-input-amount',
+                        type='number',
+                        placeholder='Enter Amount',
+                        style={"color": "black"}
+                    ),
+                    dcc.Input(
+                        id='inventory-input-unit',
+                        type='text',
+                        placeholder='Enter Unit (e.g., ml)',
+                        style={"color": "black"}
+                    ),
+                    html.Button('Insert', id='inventory-insert-btn'),
+                    html.Div(id='inventory-insert-output')
+                ]
+            ),
+            html.Br(),
+            dash_table.DataTable(
+                id='inventory-table',
+                columns=[
+                    {"name": "ID", "id": "id"},
+                    {"name": "MoleculeUpacName", "id": "MoleculeUpacName"},
+                    {"name": "Amount", "id": "amount"},
+                    {"name": "Unit", "id": "unit"}
+                ],
+                data=inventory,
+                row_selectable='single',
+                selected_rows=[],
+                style_data={"color": "black"},
+                style_data_conditional=[
+                    {
+                        "if": {"state": "selected"},
+                        "color": "white"
+                    }
+                ],
+                style_table={
+                    "maxHeight": "300px",  # Approximately 10 rows visible
+                    "overflowY": "scroll"
                 }
-            ],
-            style_table={
-                "maxHeight": "300px",  # Approximately 10 rows visible
-                "overflowY": "scroll"
-            }
-        ),
-        html.Br(),
-        html.Div(
-            className="card",
-            children=[
-                html.Button('Delete Selected', id='inventory-delete-btn'),
-                dcc.Input(
-                    id='inventory-update-name',
-                    type='text',
-                    placeholder='New Molecule UPAC Name',
-                    style={"color": "black"}
-                ),
-                dcc.Input(
-                    id='inventory-update-amount',
-                    type='number',
-                    placeholder='New Amount',
-                    style={"color": "black"}
-                ),
-                dcc.Input(
-                    id='inventory-update-unit',
-                    type='text',
-                    placeholder='New Unit (e.g., ml)',
-                    style={"color": "black"}
-                ),
-                html.Button('Update Selected', id='inventory-update-btn'),
-                html.Div(id='inventory-update-delete-output')
-            ]
-        )
-    ]
-)
+            ),
+            html.Br(),
+            html.Div(
+                className="card",
+                children=[
+                    html.Button('Delete Selected', id='inventory-delete-btn'),
+                    dcc.Input(
+                        id='inventory-update-name',
+                        type='text',
+                        placeholder='New Molecule UPAC Name',
+                        style={"color": "black"}
+                    ),
+                    dcc.Input(
+                        id='inventory-update-amount',
+                        type='number',
+                        placeholder='New Amount',
+                        style={"color": "black"}
+                    ),
+                    dcc.Input(
+                        id='inventory-update-unit',
+                        type='text',
+                        placeholder='New Unit (e.g., ml)',
+                        style={"color": "black"}
+                    ),
+                    html.Button('Update Selected', id='inventory-update-btn'),
+                    html.Div(id='inventory-update-delete-output')
+                ]
+            )
+        ]
+    )
+
+app.layout = lazy_layout(build_layout, inventory=get_all_inventory)
 
 @app.callback(
     Output('inventory-insert-output', 'children'),
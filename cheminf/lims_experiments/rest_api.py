@@ -1,5 +1,6 @@
 from flask import request, jsonify
 from cheminf.db.db import execute_query
+from cheminf.db.pagination import paginated_response
 from cheminf.config import DB_PREFIX
 from cheminf.app_server import server
 
@@ -83,7 +84,7 @@ def delete_sample(sample_id):
 # Measurements API endpoints
 @server.route("/api/lims/measurements", methods=["GET"])
 def get_measurements():
-    """Get all measurements with sample and experiment info"""
+    """Get measurements with sample and experiment info, one page at a time (?limit=, ?cursor=)"""
     try:
         query = f"""
         SELECT m.measurement_id, m.parameter, m.value, m.unit, m.measurement_date,
@@ -91,10 +92,8 @@ def get_measurements():
         FROM {DB_PREFIX}measurements m
         JOIN {DB_PREFIX}samples s ON m.sample_id = s.sample_id
         JOIN {DB_PREFIX}experiments e ON s.experiment_id = e.experiment_id
-        ORDER BY m.measurement_id
         """
-        rows = execute_query(query)
-        return jsonify(rows)
+        return paginated_response(query, ["measurement_id"])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -123,20 +122,32 @@ def delete_measurement(measurement_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Per-experiment / per-sample reads (their index use is checked by cheminf.db.indexes)
+EXPERIMENT_SAMPLES_QUERY = f"""
+SELECT s.sample_id, s.sample_code, s.sample_type, s.collection_date,
+       s.experiment_id, e.experiment_name
+FROM {DB_PREFIX}samples s
+JOIN {DB_PREFIX}experiments e ON s.experiment_id = e.experiment_id
+WHERE s.experiment_id = ?
+ORDER BY s.sample_id
+"""
+
+SAMPLE_MEASUREMENTS_QUERY = f"""
+SELECT m.measurement_id, m.parameter, m.value, m.unit, m.measurement_date,
+       s.sample_code, e.experiment_name, m.sample_id
+FROM {DB_PREFIX}measurements m
+JOIN {DB_PREFIX}samples s ON m.sample_id = s.sample_id
+JOIN {DB_PREFIX}experiments e ON s.experiment_id = e.experiment_id
+WHERE m.sample_id = ?
+ORDER BY m.measurement_id
+"""
+
 # Experiment samples endpoint
 @server.route("/api/lims/experiments/<int:experiment_id>/samples", methods=["GET"])
 def get_experiment_samples(experiment_id):
     """Get all samples for a specific experiment"""
     try:
-        query = f"""
-        SELECT s.sample_id, s.sample_code, s.sample_type, s.collection_date, 
-               s.experiment_id, e.experiment_name
-        FROM {DB_PREFIX}samples s
-        JOIN {DB_PREFIX}experiments e ON s.experiment_id = e.experiment_id
-        WHERE s.experiment_id = ?
-        ORDER BY s.sample_id
-        """
-        rows = execute_query(query, (experiment_id,))
+        rows = execute_query(EXPERIMENT_SAMPLES_QUERY, (experiment_id,))
         return jsonify(rows)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -146,16 +157,7 @@ def get_experiment_samples(experiment_id):
 def get_sample_measurements(sample_id):
     """Get all measurements for a specific sample"""
     try:
-        query = f"""
-        SELECT m.measurement_id, m.parameter, m.value, m.unit, m.measurement_date,
-               s.sample_code, e.experiment_name, m.sample_id
-        FROM {DB_PREFIX}measurements m
-        JOIN {DB_PREFIX}samples s ON m.sample_id = s.sample_id
-        JOIN {DB_PREFIX}experiments e ON s.experiment_id = e.experiment_id
-        WHERE m.sample_id = ?
-        ORDER BY m.measurement_id
-        """
-        rows = execute_query(query, (sample_id,))
+        rows = execute_query(SAMPLE_MEASUREMENTS_QUERY, (sample_id,))
         return jsonify(rows)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -3,6 +3,7 @@ import dash
 from cheminf.app_server import server
 from cheminf.db.db import execute_query
 from cheminf.config import DB_PREFIX
+from cheminf.ui_utils import lazy_layout
 
 external_stylesheets = ['/static/styles.css']
 
@@ -41,75 +42,79 @@ def delete_experiment(experiment_id):
         print(f"Error deleting experiment: {e}")
         return False
 
-app.layout = html.Div([
-    html.Header([
-        html.H1("ChemINF-EDU - LIMS Experiments", style={"color": "white"})
-    ], className="header"),
+def build_layout(experiments):
+    """Page layout, built per request so the experiments table is current."""
+    return html.Div([
+        html.Header([
+            html.H1("ChemINF-EDU - LIMS Experiments", style={"color": "white"})
+        ], className="header"),
     
-    html.Div([
         html.Div([
-            html.H2("Add New Experiment"),
-            dcc.Input(
-                id="exp-name-input",
-                type="text",
-                placeholder="Experiment name...",
-                style={"width": "200px", "marginRight": "10px", "marginBottom": "10px"}
-            ),
-            dcc.Input(
-                id="exp-description-input",
-                type="text",
-                placeholder="Description...",
-                style={"width": "300px", "marginRight": "10px", "marginBottom": "10px"}
-            ),
-            html.Br(),
-            html.Label("Start Date:"),
-            dcc.Input(
-                id="exp-start-date",
-                type="date",
-                style={"marginRight": "10px", "marginBottom": "10px"}
-            ),
-            html.Label("End Date:"),
-            dcc.Input(
-                id="exp-end-date",
-                type="date",
-                style={"marginRight": "10px", "marginBottom": "10px"}
-            ),
-            html.Br(),
-            html.Button("Add Experiment", id="add-exp-btn", n_clicks=0, className="button"),
-            html.Button("Delete Selected", id="delete-exp-btn", n_clicks=0, className="button delete"),
-        ], className="input-section"),
+            html.Div([
+                html.H2("Add New Experiment"),
+                dcc.Input(
+                    id="exp-name-input",
+                    type="text",
+                    placeholder="Experiment name...",
+                    style={"width": "200px", "marginRight": "10px", "marginBottom": "10px"}
+                ),
+                dcc.Input(
+                    id="exp-description-input",
+                    type="text",
+                    placeholder="Description...",
+                    style={"width": "300px", "marginRight": "10px", "marginBottom": "10px"}
+                ),
+                html.Br(),
+                html.Label("Start Date:"),
+                dcc.Input(
+                    id="exp-start-date",
+                    type="date",
+                    style={"marginRight": "10px", "marginBottom": "10px"}
+                ),
+                html.Label("End Date:"),
+                dcc.Input(
+                    id="exp-end-date",
+                    type="date",
+                    style={"marginRight": "10px", "marginBottom": "10px"}
+                ),
+                html.Br(),
+                html.Button("Add Experiment", id="add-exp-btn", n_clicks=0, className="button"),
+                html.Button("Delete Selected", id="delete-exp-btn", n_clicks=0, className="button delete"),
+            ], className="input-section"),
         
-        html.Div([
-            html.H2("Experiments"),
-            html.Button("Refresh", id='load-button', n_clicks=0, className="button"),
-            dash_table.DataTable(
-                id="experiments-table",
-                columns=[
-                    {"name": "ID", "id": "experiment_id"},
-                    {"name": "Name", "id": "experiment_name"},
-                    {"name": "Description", "id": "description"},
-                    {"name": "Start Date", "id": "start_date"},
-                    {"name": "End Date", "id": "end_date"}
-                ],
-                data=get_all_experiments(),
-                row_selectable="single",
-                selected_rows=[],
-                style_cell={'textAlign': 'left'},
-                style_header={'backgroundColor': '#000', 'color': 'white', 'fontWeight': 'bold', 'border': '1px solid #000'},
-                style_data={'backgroundColor': '#fff', 'color': '#000', 'border': '1px solid #000'},
-            )
-        ], className="table-section"),
+            html.Div([
+                html.H2("Experiments"),
+                html.Button("Refresh", id='load-button', n_clicks=0, className="button"),
+                dash_table.DataTable(
+                    id="experiments-table",
+                    columns=[
+                        {"name": "ID", "id": "experiment_id"},
+                        {"name": "Name", "id": "experiment_name"},
+                        {"name": "Description", "id": "description"},
+                        {"name": "Start Date", "id": "start_date"},
+                        {"name": "End Date", "id": "end_date"}
+                    ],
+                    data=experiments,
+                    row_selectable="single",
+                    selected_rows=[],
+                    style_cell={'textAlign': 'left'},
+                    style_header={'backgroundColor': '#000', 'color': 'white', 'fontWeight': 'bold', 'border': '1px solid #000'},
+                    style_data={'backgroundColor': '#fff', 'color': '#000', 'border': '1px solid #000'},
+                )
+            ], className="table-section"),
         
-        html.Div(id="experiments-status", className="status-message"),
+            html.Div(id="experiments-status", className="status-message"),
         
-        html.Div([
-            html.A("← Back to Home", href="/", className="nav-link"),
-            html.A("View Samples →", href="/samples/", className="nav-link", style={"marginLeft": "20px"}),
-            html.A("View Measurements →", href="/measurements/", className="nav-link", style={"marginLeft": "20px"})
-        ], className="navigation")
+            html.Div([
+                html.A("← Back to Home", href="/", className="nav-link"),
+                html.A("View Samples →", href="/samples/", className="nav-link", style={"marginLeft": "20px"}),
+                html.A("View Measurements →", href="/measurements/", className="nav-link", style={"marginLeft": "20px"})
+            ], className="navigation")
         
-    ], className="container")
-])
+        ], className="container")
+    ])
+
+app.layout = lazy_layout(build_layout, experiments=get_all_experiments)
 
 @app.callback(
     [Output("experiments-table", "data"),
@@ -3,6 +3,7 @@ import dash
 from cheminf.app_server import server
 from cheminf.db.db import execute_query
 from cheminf.config import DB_PREFIX
+from cheminf.ui_utils import lazy_layout
 
 external_stylesheets = ['/static/styles.css']
 
@@ -63,86 +64,90 @@ def delete_measurement(measurement_id):
         print(f"Error deleting measurement: {e}")
         return False
 
-app.layout = html.Div([
-    html.Header([
-        html.H1("ChemINF-EDU - LIMS Measurements", style={"color": "white"})
-    ], className="header"),
+def build_layout(measurements, samples):
+    """Page layout, built per request so the sample dropdown and measurements table are current."""
+    return html.Div([
+        html.Header([
+            html.H1("ChemINF-EDU - LIMS Measurements", style={"color": "white"})
+        ], className="header"),
     
-    html.Div([
         html.Div([
-            html.H2("Add New Measurement"),
-            dcc.Dropdown(
-                id="measurement-sample-dropdown",
-                options=[{"label": f"{s['sample_code']} ({s['experiment_name']})", "value": s["sample_id"]} for s in get_all_samples()],
-                placeholder="Select sample...",
-                style={"width": "400px", "marginBottom": "10px"}
-            ),
-            dcc.Input(
-                id="measurement-parameter-input",
-                type="text",
-                placeholder="Parameter (e.g., pH, Temperature)...",
-                style={"width": "200px", "marginRight": "10px", "marginBottom": "10px"}
-            ),
-            dcc.Input(
-                id="measurement-value-input",
-                type="number",
-                placeholder="Value...",
-                style={"width": "150px", "marginRight": "10px", "marginBottom": "10px"}
-            ),
-            dcc.Input(
-                id="measurement-unit-input",
-                type="text",
-                placeholder="Unit (e.g., mg/L, °C)...",
-                style={"width": "100px", "marginRight": "10px", "marginBottom": "10px"}
-            ),
-            html.Br(),
-            html.Label("Measurement Date/Time:"),
-            dcc.Input(
-                id="measurement-datetime",
-                type="datetime-local",
-                style={"marginRight": "10px", "marginBottom": "10px"}
-            ),
-            html.Br(),
-            html.Button("Add Measurement", id="add-measurement-btn", n_clicks=0, className="button"),
-            html.Button("Delete Selected", id="delete-measurement-btn", n_clicks=0, className="button delete"),
-        ], className="input-section"),
+            html.Div([
+                html.H2("Add New Measurement"),
+                dcc.Dropdown(
+                    id="measurement-sample-dropdown",
+                    options=[{"label": f"{s['sample_code']} ({s['experiment_name']})", "value": s["sample_id"]} for s in samples],
+                    placeholder="Select sample...",
+                    style={"width": "400px", "marginBottom": "10px"}
+                ),
+                dcc.Input(
+                    id="measurement-parameter-input",
+                    type="text",
+                    placeholder="Parameter (e.g., pH, Temperature)...",
+                    style={"width": "200px", "marginRight": "10px", "marginBottom": "10px"}
+                ),
+                dcc.Input(
+                    id="measurement-value-input",
+                    type="number",
+                    placeholder="Value...",
+                    style={"width": "150px", "marginRight": "10px", "marginBottom": "10px"}
+                ),
+                dcc.Input(
+                    id="measurement-unit-input",
+                    type="text",
+                    placeholder="Unit (e.g., mg/L, °C)...",
+                    style={"width": "100px", "marginRight": "10px", "marginBottom": "10px"}
+                ),
+                html.Br(),
+                html.Label("Measurement Date/Time:"),
+                dcc.Input(
+                    id="measurement-datetime",
+                    type="datetime-local",
+                    style={"marginRight": "10px", "marginBottom": "10px"}
+                ),
+                html.Br(),
+                html.Button("Add Measurement", id="add-measurement-btn", n_clicks=0, className="button"),
+                html.Button("Delete Selected", id="delete-measurement-btn", n_clicks=0, className="button delete"),
+            ], className="input-section"),
         
-        html.Div([
-            html.H2("Measurements"),
-            html.Button("Refresh", id='load-measurements-btn', n_clicks=0, className="button"),
-            dash_table.DataTable(
-                id="measurements-table",
-                columns=[
-                    {"name": "ID", "id": "measurement_id"},
-                    {"name": "Sample", "id": "sample_code"},
-                    {"name": "Experiment", "id": "experiment_name"},
-                    {"name": "Parameter", "id": "parameter"},
-                    {"name": "Value", "id": "value", "type": "numeric"},
-                    {"name": "Unit", "id": "unit"},
-                    {"name": "Date/Time", "id": "measurement_date"}
-                ],
-                data=get_all_measurements(),
-                row_selectable="single",
-                selected_rows=[],
-                style_cell={'textAlign': 'left'},
-                style_header={'backgroundColor': '#000', 'color': 'white', 'fontWeight': 'bold', 'border': '1px solid #000'},
-                style_data={'backgroundColor': '#fff', 'color': '#000', 'border': '1px solid #000'},
-                style_cell_conditional=[
-                    {'if': {'column_id': 'value'}, 'textAlign': 'right'},
-                ]
-            )
-        ], className="table-section"),
+            html.Div([
+                html.H2("Measurements"),
+                html.Button("Refresh", id='load-measurements-btn', n_clicks=0, className="button"),
+                dash_table.DataTable(
+                    id="measurements-table",
+                    columns=[
+                        {"name": "ID", "id": "measurement_id"},
+                        {"name": "Sample", "id": "sample_code"},
+                        {"name": "Experiment", "id": "experiment_name"},
+                        {"name": "Parameter", "id": "parameter"},
+                        {"name": "Value", "id": "value", "type": "numeric"},
+                        {"name": "Unit", "id": "unit"},
+                        {"name": "Date/Time", "id": "measurement_date"}
+                    ],
+                    data=measurements,
+                    row_selectable="single",
+                    selected_rows=[],
+                    style_cell={'textAlign': 'left'},
+                    style_header={'backgroundColor': '#000', 'color': 'white', 'fontWeight': 'bold', 'border': '1px solid #000'},
+                    style_data={'backgroundColor': '#fff', 'color': '#000', 'border': '1px solid #000'},
+                    style_cell_conditional=[
+                        {'if': {'column_id': 'value'}, 'textAlign': 'right'},
+                    ]
+                )
+            ], className="table-section"),
         
-        html.Div(id="measurements-status", className="status-message"),
+            html.Div(id="measurements-status", className="status-message"),
         
-        html.Div([
-            html.A("← Back to Samples", href="/samples/", className="nav-link"),
-            html.A("← Back to Experiments", href="/experiments/", className="nav-link", style={"marginLeft": "20px"}),
-            html.A("← Back to Home", href="/", className="nav-link", style={"marginLeft": "20px"})
-        ], className="navigation")
+            html.Div([
+                html.A("← Back to Samples", href="/samples/", className="nav-link"),
+                html.A("← Back to Experiments", href="/experiments/", className="nav-link", style={"marginLeft": "20px"}),
+                html.A("← Back to Home", href="/", className="nav-link", style={"marginLeft": "20px"})
+            ], className="navigation")
         
-    ], className="container")
-])
+        ], className="container")
+    ])
+
+app.layout = lazy_layout(build_layout, measurements=get_all_measurements, samples=get_all_samples)
 
 @app.callback(
     [Output("measurements-table", "data"),
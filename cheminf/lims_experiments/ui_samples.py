@@ -3,6 +3,7 @@ import dash
 from cheminf.app_server import server
 from cheminf.db.db import execute_query
 from cheminf.config import DB_PREFIX
+from cheminf.ui_utils import lazy_layout
 
 external_stylesheets = ['/static/styles.css']
 
@@ -56,75 +57,79 @@ def delete_sample(sample_id):
         print(f"Error deleting sample: {e}")
         return False
 
-app.layout = html.Div([
-    html.Header([
-        html.H1("ChemINF-EDU - LIMS Samples", style={"color": "white"})
-    ], className="header"),
+def build_layout(experiments, samples):
+    """Page layout, built per request so the experiment dropdown and samples table are current."""
+    return html.Div([
+        html.Header([
+            html.H1("ChemINF-EDU - LIMS Samples", style={"color": "white"})
+        ], className="header"),
     
-    html.Div([
         html.Div([
-            html.H2("Add New Sample"),
-            dcc.Dropdown(
-                id="sample-experiment-dropdown",
-                options=[{"label": e["experiment_name"], "value": e["experiment_id"]} for e in get_all_experiments()],
-                placeholder="Select experiment...",
-                style={"width": "300px", "marginBottom": "10px"}
-            ),
-            dcc.Input(
-                id="sample-code-input",
-                type="text",
-                placeholder="Sample code...",
-                style={"width": "200px", "marginRight": "10px", "marginBottom": "10px"}
-            ),
-            dcc.Input(
-                id="sample-type-input",
-                type="text",
-                placeholder="Sample type...",
-                style={"width": "200px", "marginRight": "10px", "marginBottom": "10px"}
-            ),
-            html.Br(),
-            html.Label("Collection Date:"),
-            dcc.Input(
-                id="sample-collection-date",
-                type="date",
-                style={"marginRight": "10px", "marginBottom": "10px"}
-            ),
-            html.Br(),
-            html.Button("Add Sample", id="add-sample-btn", n_clicks=0, className="button"),
-            html.Button("Delete Selected", id="delete-sample-btn", n_clicks=0, className="button delete"),
-        ], className="input-section"),
+            html.Div([
+                html.H2("Add New Sample"),
+                dcc.Dropdown(
+                    id="sample-experiment-dropdown",
+                    options=[{"label": e["experiment_name"], "value": e["experiment_id"]} for e in experiments],
+                    placeholder="Select experiment...",
+                    style={"width": "300px", "marginBottom": "10px"}
+                ),
+                dcc.Input(
+                    id="sample-code-input",
+                    type="text",
+                    placeholder="Sample code...",
+                    style={"width": "200px", "marginRight": "10px", "marginBottom": "10px"}
+                ),
+                dcc.Input(
+                    id="sample-type-input",
+                    type="text",
+                    placeholder="Sample type...",
+                    style={"width": "200px", "marginRight": "10px", "marginBottom": "10px"}
+                ),
+                html.Br(),
+                html.Label("Collection Date:"),
+                dcc.Input(
+                    id="sample-collection-date",
+                    type="date",
+                    style={"marginRight": "10px", "marginBottom": "10px"}
+                ),
+                html.Br(),
+                html.Button("Add Sample", id="add-sample-btn", n_clicks=0, className="button"),
+                html.Button("Delete Selected", id="delete-sample-btn", n_clicks=0, className="button delete"),
+            ], className="input-section"),
         
-        html.Div([
-            html.H2("Samples"),
-            html.Button("Refresh", id='load-samples-btn', n_clicks=0, className="button"),
-            dash_table.DataTable(
-                id="samples-table",
-                columns=[
-                    {"name": "Sample ID", "id": "sample_id"},
-                    {"name": "Code", "id": "sample_code"},
-                    {"name": "Type", "id": "sample_type"},
-                    {"name": "Collection Date", "id": "collection_date"},
-                    {"name": "Experiment", "id": "experiment_name"}
-                ],
-                data=get_all_samples(),
-                row_selectable="single",
-                selected_rows=[],
-                style_cell={'textAlign': 'left'},
-                style_header={'backgroundColor': '#000', 'color': 'white', 'fontWeight': 'bold', 'border': '1px solid #000'},
-                style_data={'backgroundColor': '#fff', 'color': '#000', 'border': '1px solid #000'},
-            )
-        ], className="table-section"),
+            html.Div([
+                html.H2("Samples"),
+                html.Button("Refresh", id='load-samples-btn', n_clicks=0, className="button"),
+                dash_table.DataTable(
+                    id="samples-table",
+                    columns=[
+                        {"name": "Sample ID", "id": "sample_id"},
+                        {"name": "Code", "id": "sample_code"},
+                        {"name": "Type", "id": "sample_type"},
+                        {"name": "Collection Date", "id": "collection_date"},
+                        {"name": "Experiment", "id": "experiment_name"}
+                    ],
+                    data=samples,
+                    row_selectable="single",
+                    selected_rows=[],
+                    style_cell={'textAlign': 'left'},
+                    style_header={'backgroundColor': '#000', 'color': 'white', 'fontWeight': 'bold', 'border': '1px solid #000'},
+                    style_data={'backgroundColor': '#fff', 'color': '#000', 'border': '1px solid #000'},
+                )
+            ], className="table-section"),
         
-        html.Div(id="samples-status", className="status-message"),
+            html.Div(id="samples-status", className="status-message"),
         
-        html.Div([
-            html.A("← Back to Experiments", href="/experiments/", className="nav-link"),
-            html.A("View Measurements →", href="/measurements/", className="nav-link", style={"marginLeft": "20px"}),
-            html.A("← Back to Home", href="/", className="nav-link", style={"marginLeft": "20px"})
-        ], className="navigation")
+            html.Div([
+                html.A("← Back to Experiments", href="/experiments/", className="nav-link"),
+                html.A("View Measurements →", href="/measurements/", className="nav-link", style={"marginLeft": "20px"}),
+                html.A("← Back to Home", href="/", className="nav-link", style={"marginLeft": "20px"})
+            ], className="navigation")
         
-    ], className="container")
-])
+        ], className="container")
+    ])
+
+app.layout = lazy_layout(build_layout, experiments=get_all_experiments, samples=get_all_samples)
 
 @app.callback(
     [Output("samples-table", "data"),
@@ -0,0 +1,233 @@
+"""
+Bulk Molecule Import
+Streams .sdf, .smi and .csv files into the molecules table in bounded memory:
+
+- the file is split into raw records lazily and grouped into chunks of CHUNK_SIZE
+- worker processes parse each chunk (ForwardSDMolSupplier for SDF) and compute the
+  canonical SMILES, InChIKey, descriptors and fingerprints of every valid record
+- this process writes one transaction per chunk: molecules, descriptors and
+  fingerprints each with a single executemany
+
+At most MAX_IN_FLIGHT chunks are queued, so memory does not grow with file size.
+Records whose structure is already stored (or repeated in the file) are skipped as
+duplicates; invalid records are counted and the first MAX_REPORTED_ERRORS are listed.
+"""
+
+import csv
+import io
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from rdkit import Chem
+from rdkit.rdBase import BlockLogs
+
+from cheminf.db.db import transaction
+from cheminf.molecules.descriptors import INSERT_DESCRIPTORS, descriptor_row
+from cheminf.molecules.fingerprints import INSERT_FINGERPRINT, fingerprint_row, get_index
+from cheminf.molecules.structure import MOLECULES_TABLE
+
+FORMATS = ("sdf", "smi", "csv")
+CHUNK_SIZE = 2000           # records per worker task and per write transaction
+IMPORT_WORKERS = min(4, os.cpu_count() or 1)
+MAX_IN_FLIGHT = IMPORT_WORKERS * 2
+MAX_REPORTED_ERRORS = 100
+
+SMILES_COLUMNS = ("smiles",)
+NAME_COLUMNS = ("moleculeupacname", "name", "molecule", "title")
+SDF_NAME_PROPS = ("MoleculeUpacName", "NAME", "Name", "name")
+
+def detect_format(filename, fmt=None):
+    """File format from an explicit value or the file extension; raises ValueError if unsupported."""
+    fmt = (fmt or os.path.splitext(filename or "")[1].lstrip(".")).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'; expected one of {', '.join(FORMATS)}")
+    return fmt
+
+# -------------------------------
+# Record readers (main process, no RDKit parsing)
+# -------------------------------
+
+def read_sdf_records(stream):
+    """Yield the raw bytes of each SDF record, including its $$$$ line."""
+    lines = []
+    for line in stream:
+        lines.append(line)
+        if line.strip() == b"$$$$":
+            yield b"".join(lines)
+            lines = []
+    if b"".join(lines).strip():
+        yield b"".join(lines) + b"\n$$$$\n"
+
+def read_smi_records(stream):
+    """Yield (smiles, name) per line of a SMILES file: 'SMILES [name]'."""
+    for line_number, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8", errors="replace"), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split(None, 1)
+        if line_number == 1 and parts[0].lower() == "smiles":
+            continue  # header line
+        yield parts[0], parts[1].strip() if len(parts) > 1 else None
+
+def read_csv_records(stream):
+    """Yield (smiles, name) per CSV row; the header must have a SMILES column."""
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline=""))
+    header = [column.strip().lower() for column in next(reader, [])]
+    smiles_index = next((header.index(c) for c in SMILES_COLUMNS if c in header), None)
+    if smiles_index is None:
+        raise ValueError("CSV header has no SMILES column")
+    name_index = next((header.index(c) for c in NAME_COLUMNS if c in header), None)
+    for row in reader:
+        if not row:
+            continue
+        smiles = row[smiles_index].strip() if smiles_index < len(row) else ""
+        name = row[name_index].strip() if name_index is not None and name_index < len(row) else None
+        yield smiles, name
+
+READERS = {"sdf": read_sdf_records, "smi": read_smi_records, "csv": read_csv_records}
+
+# -------------------------------
+# Worker side
+# -------------------------------
+
+def _prepare(record_number, mol, smiles, name):
+    if mol is None or mol.GetNumAtoms() == 0:
+        return (record_number, None, "Invalid structure")
+    canonical = Chem.MolToSmiles(mol)
+    smiles = smiles or canonical
+    molecule = (name or canonical, smiles, canonical, Chem.MolToInchiKey(mol) or None)
+    return (record_number, molecule, descriptor_row(None, smiles, mol)[2:], fingerprint_row(None, smiles, mol)[2:])
+
+def prepare_chunk(fmt, first_record, records):
+    """
+    Parse and canonicalize one chunk of raw records (runs in a worker process).
+    Returns [(record_number, molecule, descriptors, fingerprints) or (record_number, None, error)].
+    """
+    prepared = []
+    block_logs = BlockLogs()  # invalid records are reported, not logged one by one
+    if fmt == "sdf":
+        supplier = Chem.ForwardSDMolSupplier(io.BytesIO(b"".join(records)))
+        for record_number, mol in enumerate(supplier, first_record):
+            name = None
+            if mol is not None:
+                name = mol.GetProp("_Name").strip() if mol.HasProp("_Name") else None
+                name = name or next((mol.GetProp(p).strip() for p in SDF_NAME_PROPS if mol.HasProp(p)), None)
+            prepared.append(_prepare(record_number, mol, None, name))
+    else:
+        for record_number, (smiles, name) in enumerate(records, first_record):
+            mol = Chem.MolFromSmiles(smiles) if smiles else None
+            prepared.append(_prepare(record_number, mol, smiles, name))
+    del block_logs
+    return prepared
+
+def _prepare_args(args):
+    return prepare_chunk(*args)
+
+# -------------------------------
+# Writer side
+# -------------------------------
+
+def _existing_structures(connection, column, values):
+    if not values:
+        return set()
+    rows = connection.execute(f"SELECT {column} FROM {MOLECULES_TABLE} "
+                              f"WHERE {column} IN ({','.join('?' for _ in values)})", values)
+    return {row[0] for row in rows}
+
+def write_chunk(prepared, report):
+    """Insert one prepared chunk in a single transaction and update the report counters."""
+    valid = []
+    for item in prepared:
+        if item[1] is None:
+            report["invalid"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"record": item[0], "error": item[2]})
+        else:
+            valid.append(item)
+
+    with transaction() as connection:
+        taken = _existing_structures(connection, "canonical_smiles", [item[1][2] for item in valid])
+        taken |= _existing_structures(connection, "inchikey", [item[1][3] for item in valid if item[1][3]])
+        new = []
+        for item in valid:
+            _, (_, _, canonical, inchikey), _, _ = item
+            if canonical in taken or (inchikey and inchikey in taken):
+                report["duplicates"] += 1
+                continue
+            taken.add(canonical)
+            if inchikey:
+                taken.add(inchikey)
+            new.append(item)
+        if not new:
+            return
+
+        connection.executemany(
+            f"INSERT OR IGNORE INTO {MOLECULES_TABLE} (MoleculeUpacName, SMILES, canonical_smiles, inchikey) "
+            f"VALUES (?, ?, ?, ?)",
+            [item[1] for item in new]
+        )
+        canonicals = [item[1][2] for item in new]
+        ids = dict(connection.execute(
+            f"SELECT canonical_smiles, id FROM {MOLECULES_TABLE} "
+            f"WHERE canonical_smiles IN ({','.join('?' for _ in canonicals)})", canonicals
+        ).fetchall())
+        connection.executemany(INSERT_DESCRIPTORS,
+                               [(ids[item[1][2]], item[1][1]) + tuple(item[2]) for item in new])
+        connection.executemany(INSERT_FINGERPRINT,
+                               [(ids[item[1][2]], item[1][1]) + tuple(item[3]) for item in new])
+        report["inserted"] += len(new)
+
+def _chunks(records, fmt):
+    first_record = 1
+    while True:
+        chunk = list(islice(records, CHUNK_SIZE))
+        if not chunk:
+            return
+        yield (fmt, first_record, chunk)
+        first_record += len(chunk)
+
+def import_molecules(stream, fmt, workers=IMPORT_WORKERS, progress=None):
+    """
+    Import molecules from a binary stream in format fmt ('sdf', 'smi' or 'csv').
+    progress(report) is called after every chunk. Returns the final report:
+    records, inserted, duplicates, invalid, errors (first MAX_REPORTED_ERRORS), elapsed_s.
+    Raises ValueError if the file cannot be read as fmt (e.g. no SMILES column).
+    """
+    started = time.perf_counter()
+    report = {"format": fmt, "records": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "errors": []}
+
+    def done(prepared):
+        report["records"] += len(prepared)
+        write_chunk(prepared, report)
+        report["elapsed_s"] = round(time.perf_counter() - started, 3)
+        if progress:
+            progress(report)
+
+    chunks = _chunks(READERS[fmt](stream), fmt)
+    first = next(chunks, None)
+    second = next(chunks, None) if first else None
+    if second is None or workers <= 1:
+        # Small file (or no pool wanted): not worth starting worker processes
+        for args in filter(None, (first, second)):
+            done(prepare_chunk(*args))
+        for args in chunks:
+            done(prepare_chunk(*args))
+    else:
+        # spawn: forking a threaded server process can deadlock the children
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pending = deque(pool.submit(_prepare_args, args) for args in (first, second))
+            for args in chunks:
+                if len(pending) >= MAX_IN_FLIGHT:
+                    done(pending.popleft().result())
+                pending.append(pool.submit(_prepare_args, args))
+            while pending:
+                done(pending.popleft().result())
+
+    get_index().reload()
+    report["errors_truncated"] = report["invalid"] > len(report["errors"])
+    report["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return report
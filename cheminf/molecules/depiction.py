@@ -0,0 +1,242 @@
+"""
+Molecule Depiction Cache
+PNG depictions keyed by canonical SMILES plus image size, in two tiers:
+- an in-memory LRU of PNG bytes (per process)
+- the {prefix}molecule_depictions blob table (shared, survives restarts)
+
+Only a miss in both tiers renders with RDKit. The cache key doubles as the HTTP
+ETag of /api/molecules/<id>/image.png. Call invalidate_smiles() when a molecule's
+SMILES changes so the old depiction does not linger in either tier.
+
+get_depictions() serves whole batches: one blob-table lookup for all keys, and the
+misses are rendered in parallel in a process pool (RDKit drawing holds the GIL).
+"""
+
+import atexit
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+from rdkit import Chem
+from rdkit.Chem import Draw
+
+from cheminf.config import DB_PREFIX
+from cheminf.db.db import execute_query, execute_many
+from cheminf.molecules.structure import canonical_smiles
+
+DEPICTION_TABLE = f"{DB_PREFIX}molecule_depictions"
+
+DEFAULT_SIZE = 150
+MIN_SIZE = 50
+MAX_SIZE = 1000
+MAX_SPRITE_PIXELS = 25_000_000  # ~75 MB as an RGB sheet, e.g. 1000 tiles of 150 px
+MEMORY_CACHE_SIZE = 512  # PNGs of ~5-20 KB each
+
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+POOL_THRESHOLD = 8       # fewer misses than this are rendered in-process
+LOOKUP_CHUNK = 500       # keys per blob-table IN (...) lookup
+
+CREATE_DEPICTION_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {DEPICTION_TABLE} (
+    cache_key CHAR(40) PRIMARY KEY,
+    canonical_smiles TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    png BLOB NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+class LRUCache:
+    """Thread-safe least-recently-used mapping with a fixed number of entries."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard_where(self, predicate):
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+_memory = LRUCache(MEMORY_CACHE_SIZE)
+_executor = None
+_executor_lock = threading.Lock()
+
+def ensure_depiction_table(connection):
+    """Create the depiction blob table if needed."""
+    connection.execute(CREATE_DEPICTION_TABLE)
+    connection.execute(f"CREATE INDEX IF NOT EXISTS {DB_PREFIX}idx_molecule_depictions_smiles "
+                       f"ON {DEPICTION_TABLE} (canonical_smiles)")
+
+def depiction_key(canonical, width, height):
+    """Stable cache key / ETag for a depiction."""
+    return hashlib.sha1(f"{canonical}|{width}x{height}".encode("utf-8")).hexdigest()
+
+def render_png(canonical, width, height):
+    """Render a depiction with RDKit and return PNG bytes."""
+    img = Draw.MolToImage(Chem.MolFromSmiles(canonical), size=(width, height))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+def get_depiction(smiles, width=DEFAULT_SIZE, height=DEFAULT_SIZE):
+    """
+    Return (key, png_bytes) for a SMILES string, or (None, None) if it does not parse.
+    Looks in memory, then the blob table, and renders only on a miss in both.
+    """
+    canonical = canonical_smiles(smiles)
+    if canonical is None:
+        return None, None
+    key = depiction_key(canonical, width, height)
+    memory_key = (canonical, width, height)
+
+    png = _memory.get(memory_key)
+    if png is not None:
+        return key, png
+
+    rows = execute_query(f"SELECT png FROM {DEPICTION_TABLE} WHERE cache_key = ?", (key,))
+    if rows:
+        png = rows[0]['png']
+    else:
+        png = render_png(canonical, width, height)
+        execute_query(
+            f"INSERT OR REPLACE INTO {DEPICTION_TABLE} (cache_key, canonical_smiles, width, height, png) "
+            f"VALUES (?, ?, ?, ?, ?)",
+            (key, canonical, width, height, png)
+        )
+    _memory.put(memory_key, png)
+    return key, png
+
+def _render_args(args):
+    return render_png(*args)
+
+def get_render_pool():
+    """Process pool for batch rendering, started on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a threaded server process can deadlock the children
+            _executor = ProcessPoolExecutor(max_workers=RENDER_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(shutdown_render_pool)
+        return _executor
+
+def shutdown_render_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def get_depictions(smiles_list, width=DEFAULT_SIZE, height=DEFAULT_SIZE):
+    """
+    Batch version of get_depiction(): returns ([(key, png) or (None, None), ...], stats)
+    in input order. stats has memory_hits, blob_hits, rendered and per-phase timings in ms.
+    """
+    started = time.perf_counter()
+    results = [(None, None)] * len(smiles_list)
+    stats = {"memory_hits": 0, "blob_hits": 0, "rendered": 0}
+
+    # Memory tier; remember which positions still need each missing depiction
+    missing = OrderedDict()  # key -> (canonical, [positions])
+    for position, smiles in enumerate(smiles_list):
+        canonical = canonical_smiles(smiles)
+        if canonical is None:
+            continue
+        key = depiction_key(canonical, width, height)
+        png = _memory.get((canonical, width, height))
+        if png is not None:
+            results[position] = (key, png)
+            stats["memory_hits"] += 1
+        else:
+            missing.setdefault(key, (canonical, []))[1].append(position)
+
+    def resolve(key, png):
+        canonical, positions = missing.pop(key)
+        _memory.put((canonical, width, height), png)
+        for position in positions:
+            results[position] = (key, png)
+
+    # Blob tier, a few large IN (...) lookups
+    keys = list(missing)
+    for i in range(0, len(keys), LOOKUP_CHUNK):
+        chunk = keys[i:i + LOOKUP_CHUNK]
+        rows = execute_query(
+            f"SELECT cache_key, png FROM {DEPICTION_TABLE} WHERE cache_key IN ({','.join('?' for _ in chunk)})",
+            chunk
+        )
+        for row in rows:
+            resolve(row['cache_key'], row['png'])
+            stats["blob_hits"] += 1
+    lookup_done = time.perf_counter()
+
+    # Render what is left, in parallel when it is worth the IPC
+    jobs = [(key, canonical) for key, (canonical, _) in missing.items()]
+    args = [(canonical, width, height) for _, canonical in jobs]
+    if len(jobs) >= POOL_THRESHOLD:
+        chunksize = max(1, len(jobs) // (RENDER_WORKERS * 4))
+        pngs = list(get_render_pool().map(_render_args, args, chunksize=chunksize))
+    else:
+        pngs = [_render_args(arg) for arg in args]
+    if jobs:
+        execute_many(
+            f"INSERT OR REPLACE INTO {DEPICTION_TABLE} (cache_key, canonical_smiles, width, height, png) "
+            f"VALUES (?, ?, ?, ?, ?)",
+            [(key, canonical, width, height, png) for (key, canonical), png in zip(jobs, pngs)]
+        )
+        for (key, _), png in zip(jobs, pngs):
+            resolve(key, png)
+    stats["rendered"] = len(jobs)
+    render_done = time.perf_counter()
+
+    stats["lookup_ms"] = round((lookup_done - started) * 1000, 2)
+    stats["render_ms"] = round((render_done - lookup_done) * 1000, 2)
+    return results, stats
+
+def compose_sprite(pngs, size, columns):
+    """Paste square PNG tiles row by row into one sprite sheet; None tiles stay blank."""
+    rows = max(1, -(-len(pngs) // columns))
+    sheet = Image.new("RGB", (columns * size, rows * size), "white")
+    for index, png in enumerate(pngs):
+        if png is not None:
+            sheet.paste(Image.open(io.BytesIO(png)), ((index % columns) * size, (index // columns) * size))
+    buf = io.BytesIO()
+    sheet.save(buf, format="PNG")
+    return buf.getvalue()
+
+def depiction_url(molecule_id, smiles, size=DEFAULT_SIZE):
+    """Image route URL versioned by the depiction key, so it can be cached as immutable."""
+    canonical = canonical_smiles(smiles)
+    if canonical is None:
+        return None
+    return f"/api/molecules/{molecule_id}/image.png?size={size}&v={depiction_key(canonical, size, size)}"
+
+def invalidate_smiles(smiles):
+    """Drop every cached size of a SMILES from both tiers (call after its molecule changes)."""
+    canonical = canonical_smiles(smiles)
+    if canonical is None:
+        return
+    _memory.discard_where(lambda key: key[0] == canonical)
+    execute_query(f"DELETE FROM {DEPICTION_TABLE} WHERE canonical_smiles = ?", (canonical,))
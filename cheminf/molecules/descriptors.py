@@ -0,0 +1,154 @@
+"""
+Molecular Descriptor Cache
+RDKit descriptors (MW, logP, TPSA, H-bond donors/acceptors, rotatable bonds, ring
+counts) of every molecule, stored in the typed {prefix}molecule_descriptors table with
+one index per descriptor. Range filters such as mw < 300 are then index range scans
+instead of RDKit calls per request.
+
+update_descriptors() is called from the molecules write paths, so a new or edited
+molecule is computed right away; a trigger drops the row when its molecule is deleted.
+sync_descriptors() catches up on rows written by other means (bulk imports, older
+databases). It computes large backlogs in a process pool.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from rdkit import Chem
+from rdkit.Chem import Crippen, Descriptors, Lipinski, rdMolDescriptors
+
+from cheminf.config import DB_PREFIX
+from cheminf.db.db import execute_query, execute_many
+
+DESCRIPTOR_TABLE = f"{DB_PREFIX}molecule_descriptors"
+MOLECULES_TABLE = f"{DB_PREFIX}molecules"
+
+# name -> (SQL type, RDKit function)
+DESCRIPTORS = {
+    "mw": ("REAL", Descriptors.MolWt),
+    "logp": ("REAL", Crippen.MolLogP),
+    "tpsa": ("REAL", rdMolDescriptors.CalcTPSA),
+    "hbd": ("INTEGER", Lipinski.NumHDonors),
+    "hba": ("INTEGER", Lipinski.NumHAcceptors),
+    "rotatable_bonds": ("INTEGER", rdMolDescriptors.CalcNumRotatableBonds),
+    "ring_count": ("INTEGER", rdMolDescriptors.CalcNumRings),
+    "aromatic_ring_count": ("INTEGER", rdMolDescriptors.CalcNumAromaticRings),
+}
+
+COMPUTE_WORKERS = min(4, os.cpu_count() or 1)
+POOL_THRESHOLD = 200    # fewer stale molecules than this are computed in-process
+SYNC_BATCH = 5000       # rows per executemany while backfilling
+
+CREATE_DESCRIPTOR_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {DESCRIPTOR_TABLE} (
+    molecule_id INTEGER PRIMARY KEY,
+    smiles VARCHAR(255),
+    {', '.join(f'{name} {sql_type}' for name, (sql_type, _) in DESCRIPTORS.items())}
+)
+"""
+
+INSERT_DESCRIPTORS = (
+    f"INSERT OR REPLACE INTO {DESCRIPTOR_TABLE} (molecule_id, smiles, {', '.join(DESCRIPTORS)}) "
+    f"VALUES ({', '.join('?' for _ in range(len(DESCRIPTORS) + 2))})"
+)
+
+_synced = False
+_sync_lock = threading.Lock()
+
+def ensure_descriptor_table(connection):
+    """Create the descriptor table, its per-descriptor indexes and the delete trigger."""
+    connection.execute(CREATE_DESCRIPTOR_TABLE)
+    for name in DESCRIPTORS:
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {DB_PREFIX}idx_molecule_descriptors_{name} "
+                           f"ON {DESCRIPTOR_TABLE} ({name})")
+    connection.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {DESCRIPTOR_TABLE}_molecule_delete
+        AFTER DELETE ON {MOLECULES_TABLE}
+        BEGIN DELETE FROM {DESCRIPTOR_TABLE} WHERE molecule_id = old.id; END
+    """)
+
+def compute_descriptors(smiles, mol=None):
+    """Descriptor values in DESCRIPTORS order, or None if the SMILES does not parse."""
+    if mol is None and smiles:
+        mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        return None
+    return tuple(function(mol) for _, function in DESCRIPTORS.values())
+
+def descriptor_row(molecule_id, smiles, mol=None):
+    """Parameters for INSERT_DESCRIPTORS; unparseable SMILES get NULL descriptors."""
+    values = compute_descriptors(smiles, mol) or (None,) * len(DESCRIPTORS)
+    return (molecule_id, smiles) + tuple(values)
+
+def _descriptor_rows(batch):
+    return [descriptor_row(molecule_id, smiles) for molecule_id, smiles in batch]
+
+def update_descriptors(molecule_id, smiles):
+    """Call after a molecule is inserted or its SMILES changes."""
+    execute_query(INSERT_DESCRIPTORS, descriptor_row(molecule_id, smiles))
+
+def sync_descriptors(workers=COMPUTE_WORKERS):
+    """
+    Compute descriptors for molecules that have none or whose SMILES changed.
+    Returns the number of molecules computed.
+    """
+    stale = execute_query(f"""
+        SELECT m.id, m.SMILES FROM {MOLECULES_TABLE} m
+        LEFT JOIN {DESCRIPTOR_TABLE} d ON d.molecule_id = m.id
+        WHERE d.molecule_id IS NULL OR d.smiles IS NOT m.SMILES
+    """)
+    pairs = [(row['id'], row['SMILES']) for row in stale]
+    if len(pairs) < POOL_THRESHOLD or workers <= 1:
+        for i in range(0, len(pairs), SYNC_BATCH):
+            execute_many(INSERT_DESCRIPTORS, _descriptor_rows(pairs[i:i + SYNC_BATCH]))
+        return len(pairs)
+
+    # Bulk backfill: workers compute chunks, this process writes them as they arrive
+    chunk = max(1, min(SYNC_BATCH, len(pairs) // (workers * 4)))
+    batches = [pairs[i:i + chunk] for i in range(0, len(pairs), chunk)]
+    # spawn: forking a threaded server process can deadlock the children
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for rows in pool.map(_descriptor_rows, batches):
+            execute_many(INSERT_DESCRIPTORS, rows)
+    return len(pairs)
+
+def ensure_synced():
+    """Run sync_descriptors() once per process before the first descriptor query."""
+    global _synced
+    with _sync_lock:
+        if not _synced:
+            sync_descriptors()
+            _synced = True
+
+def descriptor_filters(args):
+    """
+    Build a WHERE clause from <name>_min / <name>_max arguments (inclusive bounds).
+    Returns (sql, params); other arguments are ignored, non-numeric bounds raise ValueError.
+    """
+    clauses, params = [], []
+    for key, value in args.items():
+        name, _, bound = key.rpartition('_')
+        if bound not in ('min', 'max') or name not in DESCRIPTORS:
+            continue
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"{key} must be a number")
+        clauses.append(f"d.{name} {'>=' if bound == 'min' else '<='} ?")
+        params.append(number)
+    return ' AND '.join(clauses), params
+
+def get_descriptors(molecule_id):
+    """Descriptor row of one molecule, computing it if it is missing or stale; None if no molecule."""
+    rows = execute_query(f"""
+        SELECT m.SMILES, d.molecule_id, d.smiles FROM {MOLECULES_TABLE} m
+        LEFT JOIN {DESCRIPTOR_TABLE} d ON d.molecule_id = m.id
+        WHERE m.id = ?
+    """, (molecule_id,))
+    if not rows:
+        return None
+    if rows[0]['molecule_id'] is None or rows[0]['smiles'] != rows[0]['SMILES']:
+        update_descriptors(molecule_id, rows[0]['SMILES'])
+    return execute_query(f"SELECT * FROM {DESCRIPTOR_TABLE} WHERE molecule_id = ?", (molecule_id,))[0]
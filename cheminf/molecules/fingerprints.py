@@ -0,0 +1,334 @@
+"""
+Molecule Fingerprint Index
+RDKit pattern fingerprints of every molecule, persisted in {prefix}molecule_fingerprints
+and held in memory as a packed NumPy bit matrix (one row per molecule).
+
+A substructure query first screens all rows with bit operations (a molecule can only
+contain the query if it has every bit of the query's pattern fingerprint set) and runs
+the expensive HasSubstructMatch only on the surviving candidates.
+
+Similarity search uses Morgan fingerprints. They are exported from the table into a
+.npy matrix next to the database, sorted by bit count, and memory-mapped: a query
+only scores the slice of rows whose bit count can reach the Tanimoto threshold,
+using vectorised popcounts. Triggers bump a version number on every fingerprint
+change, and the matrix file is re-exported when its version is out of date.
+
+The index is kept current by index_molecule()/remove_molecule(), called from the
+molecules REST and Dash write paths; on first use it is synced against the molecules
+table, so rows written by other means are picked up too.
+"""
+
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from rdkit import Chem, DataStructs
+from rdkit.Chem import rdFingerprintGenerator
+
+from cheminf.config import DB_PREFIX
+from cheminf.db import db
+from cheminf.db.db import execute_query, execute_many, transaction
+
+FINGERPRINT_TABLE = f"{DB_PREFIX}molecule_fingerprints"
+MOLECULES_TABLE = f"{DB_PREFIX}molecules"
+
+FINGERPRINT_META_TABLE = f"{DB_PREFIX}molecule_fingerprint_meta"
+
+PATTERN_FP_SIZE = 2048  # bits; stored packed as PATTERN_FP_SIZE / 8 bytes
+MORGAN_RADIUS = 2
+MORGAN_FP_SIZE = 2048
+MORGAN_WORDS = MORGAN_FP_SIZE // 64
+LOOKUP_CHUNK = 500      # ids per IN (...) lookup
+
+CREATE_FINGERPRINT_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {FINGERPRINT_TABLE} (
+    molecule_id INTEGER PRIMARY KEY,
+    smiles VARCHAR(255),
+    pattern_fp BLOB,
+    morgan_fp BLOB,
+    morgan_bits INTEGER
+)
+"""
+
+_morgan_generator = rdFingerprintGenerator.GetMorganGenerator(radius=MORGAN_RADIUS, fpSize=MORGAN_FP_SIZE)
+
+def ensure_fingerprint_table(connection):
+    """Create the fingerprint tables and change-tracking triggers if needed."""
+    connection.execute(CREATE_FINGERPRINT_TABLE)
+    columns = {row[1] for row in connection.execute(f"PRAGMA table_info({FINGERPRINT_TABLE})")}
+    for column, column_type in (("morgan_fp", "BLOB"), ("morgan_bits", "INTEGER")):
+        if column not in columns:  # table created before similarity search existed
+            connection.execute(f"ALTER TABLE {FINGERPRINT_TABLE} ADD COLUMN {column} {column_type}")
+
+    connection.execute(f"CREATE TABLE IF NOT EXISTS {FINGERPRINT_META_TABLE} (version INTEGER NOT NULL)")
+    if connection.execute(f"SELECT COUNT(*) FROM {FINGERPRINT_META_TABLE}").fetchone()[0] == 0:
+        connection.execute(f"INSERT INTO {FINGERPRINT_META_TABLE} (version) VALUES (0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        connection.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {FINGERPRINT_TABLE}_{event.lower()}_version
+            AFTER {event} ON {FINGERPRINT_TABLE}
+            BEGIN UPDATE {FINGERPRINT_META_TABLE} SET version = version + 1; END
+        """)
+
+def fingerprint_version():
+    """Counter bumped by triggers on every fingerprint table change."""
+    return execute_query(f"SELECT version FROM {FINGERPRINT_META_TABLE}")[0]['version']
+
+def pack_fingerprint(fp):
+    """ExplicitBitVect -> packed uint8 array."""
+    return np.frombuffer(bytes.fromhex(DataStructs.BitVectToFPSText(fp)), dtype=np.uint8)
+
+def pattern_fingerprint(mol):
+    """Packed pattern fingerprint of a molecule or SMARTS query."""
+    return pack_fingerprint(Chem.PatternFingerprint(mol, fpSize=PATTERN_FP_SIZE))
+
+def morgan_fingerprint(mol):
+    """Morgan fingerprint as MORGAN_WORDS uint64 words."""
+    return pack_fingerprint(_morgan_generator.GetFingerprint(mol)).view(np.uint64)
+
+# Set bits of every byte value, for NumPy < 2.0 (no np.bitwise_count)
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def popcount(words):
+    """Set bits per row of a uint64 matrix (or of a single word vector)."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _BYTE_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+def morgan_matrix_path(version):
+    return Path(f"{db.DB_PATH}.morgan-v{version}.npy")
+
+class FingerprintIndex:
+    """In-memory fingerprint matrix mirroring the fingerprint table."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.ids = np.empty(0, dtype=np.int64)
+        self.patterns = np.empty((0, PATTERN_FP_SIZE // 8), dtype=np.uint8)
+        self._mols = {}  # molecule_id -> parsed Mol, filled lazily by the match step
+        # Memory-mapped Morgan matrix: rows [molecule_id, bit count, fingerprint words...]
+        self._morgan = None
+        self._morgan_version = None
+        self._morgan_ids = None
+        self._morgan_bits = None
+
+    def ensure_loaded(self):
+        with self._lock:
+            if not self._loaded:
+                self.sync()
+                self._load()
+                self._loaded = True
+
+    def sync(self):
+        """Fingerprint molecules that are new or whose SMILES changed; drop deleted ones."""
+        stale = execute_query(f"""
+            SELECT m.id, m.SMILES FROM {MOLECULES_TABLE} m
+            LEFT JOIN {FINGERPRINT_TABLE} f ON f.molecule_id = m.id
+            WHERE f.molecule_id IS NULL OR f.smiles IS NOT m.SMILES
+               OR (f.pattern_fp IS NOT NULL AND f.morgan_fp IS NULL)
+        """)
+        if stale:
+            execute_many(INSERT_FINGERPRINT, [self._fingerprint_row(row['id'], row['SMILES']) for row in stale])
+        removed = execute_query(f"SELECT molecule_id FROM {FINGERPRINT_TABLE} "
+                                f"WHERE molecule_id NOT IN (SELECT id FROM {MOLECULES_TABLE})")
+        if removed:
+            execute_query(f"DELETE FROM {FINGERPRINT_TABLE} WHERE molecule_id NOT IN (SELECT id FROM {MOLECULES_TABLE})")
+        return len(stale) + len(removed)
+
+    def _load(self):
+        rows = execute_query(f"SELECT molecule_id, pattern_fp FROM {FINGERPRINT_TABLE} "
+                             f"WHERE pattern_fp IS NOT NULL ORDER BY molecule_id")
+        self.ids = np.array([row['molecule_id'] for row in rows], dtype=np.int64)
+        self.patterns = np.frombuffer(b''.join(row['pattern_fp'] for row in rows), dtype=np.uint8)
+        self.patterns = self.patterns.reshape(len(rows), PATTERN_FP_SIZE // 8)
+        self._mols = {}
+
+    @staticmethod
+    def _fingerprint_row(molecule_id, smiles, mol=None):
+        if mol is None and smiles:
+            mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            return (molecule_id, smiles, None, None, None)
+        morgan = morgan_fingerprint(mol)
+        return (molecule_id, smiles, pattern_fingerprint(mol).tobytes(), morgan.tobytes(), int(popcount(morgan)))
+
+    def update(self, molecule_id, smiles):
+        """Insert or refresh one molecule in the table and, if loaded, the matrix."""
+        row = self._fingerprint_row(molecule_id, smiles)
+        execute_query(INSERT_FINGERPRINT, row)
+        with self._lock:
+            if not self._loaded:
+                return
+            self._drop_row(molecule_id)
+            if row[2] is not None:
+                position = int(np.searchsorted(self.ids, molecule_id))
+                self.ids = np.insert(self.ids, position, molecule_id)
+                self.patterns = np.insert(self.patterns, position, np.frombuffer(row[2], dtype=np.uint8), axis=0)
+
+    def reload(self):
+        """Re-read the matrix after rows were written to the table directly (bulk import)."""
+        with self._lock:
+            if self._loaded:
+                self._load()
+
+    def remove(self, molecule_id):
+        execute_query(f"DELETE FROM {FINGERPRINT_TABLE} WHERE molecule_id = ?", (molecule_id,))
+        with self._lock:
+            if self._loaded:
+                self._drop_row(molecule_id)
+
+    def _drop_row(self, molecule_id):
+        self._mols.pop(molecule_id, None)
+        matches = np.flatnonzero(self.ids == molecule_id)
+        if len(matches):
+            self.ids = np.delete(self.ids, matches)
+            self.patterns = np.delete(self.patterns, matches, axis=0)
+
+    def screen(self, query_fp):
+        """Ids of molecules whose pattern fingerprint contains every bit of query_fp."""
+        self.ensure_loaded()
+        with self._lock:
+            ids, patterns = self.ids, self.patterns
+        return ids[np.all((patterns & query_fp) == query_fp, axis=1)]
+
+    def substructure_search(self, query, limit=100):
+        """
+        Molecule ids matching a SMARTS query mol, in id order, plus screening statistics.
+        """
+        started = time.perf_counter()
+        candidates = self.screen(pattern_fingerprint(query))
+        screened = time.perf_counter()
+
+        # Parse candidates once; parsed mols are kept for later queries
+        missing = [molecule_id for molecule_id in candidates.tolist() if molecule_id not in self._mols]
+        for i in range(0, len(missing), LOOKUP_CHUNK):
+            chunk = missing[i:i + LOOKUP_CHUNK]
+            rows = execute_query(
+                f"SELECT id, SMILES FROM {MOLECULES_TABLE} WHERE id IN ({','.join('?' for _ in chunk)})", chunk
+            )
+            for row in rows:
+                self._mols[row['id']] = Chem.MolFromSmiles(row['SMILES']) if row['SMILES'] else None
+
+        matches = []
+        for molecule_id in candidates.tolist():
+            mol = self._mols.get(molecule_id)
+            if mol is not None and mol.HasSubstructMatch(query):
+                matches.append(molecule_id)
+                if len(matches) >= limit:
+                    break
+        stats = {
+            "molecules": len(self.ids),
+            "candidates": len(candidates),
+            "matches": len(matches),
+            "screen_ms": round((screened - started) * 1000, 2),
+            "match_ms": round((time.perf_counter() - screened) * 1000, 2),
+        }
+        return matches, stats
+
+    def _morgan_matrix(self):
+        """(ids, bit counts, mapped matrix), re-exported if the table changed since the last export."""
+        self.ensure_loaded()
+        version = fingerprint_version()
+        with self._lock:
+            if self._morgan_version != version:
+                version, path = export_morgan_matrix()
+                self._morgan = np.load(path, mmap_mode='r')
+                self._morgan_ids = np.array(self._morgan[:, 0], dtype=np.int64)
+                self._morgan_bits = np.array(self._morgan[:, 1], dtype=np.int64)
+                self._morgan_version = version
+                for old in path.parent.glob(f"{Path(db.DB_PATH).name}.morgan-v*.npy"):
+                    if old != path:
+                        try:
+                            old.unlink()
+                        except OSError:
+                            pass  # still mapped by another process
+            return self._morgan_ids, self._morgan_bits, self._morgan
+
+    def similarity_search(self, mol, threshold=0.7, top_k=50):
+        """
+        [(molecule_id, tanimoto), ...] best first, for molecules with Tanimoto >= threshold,
+        plus screening statistics.
+        """
+        started = time.perf_counter()
+        ids, bits, matrix = self._morgan_matrix()
+        query = morgan_fingerprint(mol)
+        query_bits = int(popcount(query))
+
+        # Tanimoto(a, b) <= min(|a|, |b|) / max(|a|, |b|): only rows with a bit count in
+        # [t * |q|, |q| / t] can reach the threshold, a contiguous slice of the sorted matrix
+        if threshold > 0:
+            lo = int(np.searchsorted(bits, math.ceil(threshold * query_bits - 1e-9), side='left'))
+            hi = int(np.searchsorted(bits, math.floor(query_bits / threshold + 1e-9), side='right'))
+        else:
+            lo, hi = 0, len(ids)
+        screened = time.perf_counter()
+
+        common = popcount(matrix[lo:hi, 2:] & query)
+        union = bits[lo:hi] + query_bits - common
+        scores = np.divide(common, union, out=np.zeros(len(common)), where=union > 0)
+        hits = np.flatnonzero(scores >= threshold)
+        if len(hits) > top_k:
+            # Keep everything scoring at least the k-th best, so ties at the cut are decided by id below
+            kth_score = np.partition(scores[hits], len(hits) - top_k)[len(hits) - top_k]
+            hits = hits[scores[hits] >= kth_score]
+        hits = hits[np.lexsort((ids[lo:hi][hits], -scores[hits]))][:top_k]
+        results = [(int(ids[lo + i]), round(float(scores[i]), 4)) for i in hits]
+
+        stats = {
+            "molecules": len(ids),
+            "scored": hi - lo,
+            "matches": len(results),
+            "screen_ms": round((screened - started) * 1000, 2),
+            "score_ms": round((time.perf_counter() - screened) * 1000, 2),
+        }
+        return results, stats
+
+INSERT_FINGERPRINT = (f"INSERT OR REPLACE INTO {FINGERPRINT_TABLE} "
+                      f"(molecule_id, smiles, pattern_fp, morgan_fp, morgan_bits) VALUES (?, ?, ?, ?, ?)")
+
+def export_morgan_matrix():
+    """
+    Write all Morgan fingerprints, sorted by bit count, to the .npy matrix of the current
+    fingerprint version (unless it already exists); returns (version, path).
+    """
+    with transaction() as connection:  # one read snapshot for the version, the count and the rows
+        version = connection.execute(f"SELECT version FROM {FINGERPRINT_META_TABLE}").fetchone()[0]
+        path = morgan_matrix_path(version)
+        if path.exists():
+            return version, path
+        count = connection.execute(
+            f"SELECT COUNT(*) FROM {FINGERPRINT_TABLE} WHERE morgan_fp IS NOT NULL"
+        ).fetchone()[0]
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint64, shape=(count, 2 + MORGAN_WORDS))
+        rows = connection.execute(f"SELECT molecule_id, morgan_bits, morgan_fp FROM {FINGERPRINT_TABLE} "
+                                  f"WHERE morgan_fp IS NOT NULL ORDER BY morgan_bits, molecule_id")
+        for i, (molecule_id, bits, fp) in enumerate(rows):
+            matrix[i, 0] = molecule_id
+            matrix[i, 1] = bits
+            matrix[i, 2:] = np.frombuffer(fp, dtype=np.uint64)
+        matrix.flush()
+        del matrix
+    os.replace(tmp_path, path)
+    return version, path
+
+_index = FingerprintIndex()
+
+def get_index():
+    return _index
+
+def index_molecule(molecule_id, smiles):
+    """Call after a molecule is inserted or its SMILES changes."""
+    _index.update(molecule_id, smiles)
+
+def remove_molecule(molecule_id):
+    """Call after a molecule is deleted."""
+    _index.remove(molecule_id)
+
+def fingerprint_row(molecule_id, smiles, mol=None):
+    """Parameters for INSERT_FINGERPRINT; pass mol to skip re-parsing the SMILES."""
+    return FingerprintIndex._fingerprint_row(molecule_id, smiles, mol)
@@ -3,10 +3,9 @@ from dash import dcc, html, Input, Output, State, dash_table, exceptions
 from flask import Flask, request, jsonify
 
 # Import database functions from our SQLite module
-from ..db.db import get_db_connection, execute_query
-
-# Define the table name using the prefix.
-TABLE_NAME = "cheminf3_molecules"
+from ..db.pagination import paginated_response
+from .repository import molecules
+from ..ui_utils import lazy_layout
 
 # -------------------------------
 # Database functions
@@ -14,28 +13,19 @@ TABLE_NAME = "cheminf3_molecules"
 
 def get_all_rows():
     """Retrieve all rows from the molecules table."""
-    return execute_query(f"SELECT * FROM {TABLE_NAME}")
+    return molecules.all(("id", "MoleculeUpacName"))
 
 def insert_molecule(molecule_name):
     """Insert a new molecule."""
-    return execute_query(
-        f"INSERT INTO {TABLE_NAME} (MoleculeUpacName) VALUES (?)", 
-        (molecule_name,)
-    )
+    return molecules.create(molecule_name)
 
 def update_molecule(molecule_id, molecule_name):
     """Update an existing molecule."""
-    return execute_query(
-        f"UPDATE {TABLE_NAME} SET MoleculeUpacName = ? WHERE id = ?", 
-        (molecule_name, molecule_id)
-    )
+    return molecules.update(molecule_id, molecule_name)
 
 def delete_molecule(molecule_id):
     """Delete a molecule by ID."""
-    return execute_query(
-        f"DELETE FROM {TABLE_NAME} WHERE id = ?", 
-        (molecule_id,)
-    )
+    return molecules.delete(molecule_id)
 
 # -------------------------------
 # Create Flask server and Dash app
@@ -48,40 +38,44 @@ app = dash.Dash(__name__, server=server, title="ChemINF-EDU")
 # Dash app layout
 # -------------------------------
 
-app.layout = html.Div([
-    html.H1("ChemINF-EDU"),
+def build_layout(rows):
+    """Layout for the given table rows; lazy_layout reads them on each page load."""
+    return html.Div([
+        html.H1("ChemINF-EDU"),
     
-    # Insertion area
-    html.Div([
-        dcc.Input(id='input-name', type='text', placeholder='Enter Molecule UPAC Name'),
-        html.Button('Insert', id='insert-btn'),
-        html.Div(id='insert-output')
-    ]),
+        # Insertion area
+        html.Div([
+            dcc.Input(id='input-name', type='text', placeholder='Enter Molecule UPAC Name'),
+            html.Button('Insert', id='insert-btn'),
+            html.Div(id='insert-output')
+        ]),
     
-    html.Hr(),
+        html.Hr(),
     
-    # Data table with selectable rows (for delete/update)
-    dash_table.DataTable(
-        id='data-table',
-        columns=[
-            {"name": "ID", "id": "id"},
-            {"name": "MoleculeUpacName", "id": "MoleculeUpacName"}
-        ],
-        data=get_all_rows(),
-        row_selectable='single',
-        selected_rows=[]
-    ),
+        # Data table with selectable rows (for delete/update)
+        dash_table.DataTable(
+            id='data-table',
+            columns=[
+                {"name": "ID", "id": "id"},
+                {"name": "MoleculeUpacName", "id": "MoleculeUpacName"}
+            ],
+            data=rows,
+            row_selectable='single',
+            selected_rows=[]
+        ),
     
-    html.Br(),
+        html.Br(),
     
-    # Delete and update controls
-    html.Div([
-        html.Button('Delete Selected', id='delete-btn'),
-        dcc.Input(id='update-name', type='text', placeholder='New Molecule UPAC Name'),
-        html.Button('Update Selected', id='update-btn'),
-        html.Div(id='update-delete-output')
+        # Delete and update controls
+        html.Div([
+            html.Button('Delete Selected', id='delete-btn'),
+            dcc.Input(id='update-name', type='text', placeholder='New Molecule UPAC Name'),
+            html.Button('Update Selected', id='update-btn'),
+            html.Div(id='update-delete-output')
+        ])
     ])
-])
+
+app.layout = lazy_layout(build_layout, rows=get_all_rows)
 
 # -------------------------------
 # Combined callback to manage insert, delete, and update
@@ -159,8 +153,7 @@ def manage_molecule(insert_clicks, delete_clicks, update_clicks, input_name, sel
 @server.route('/api/molecules', methods=['GET'])
 def api_get_molecules():
     try:
-        rows = get_all_rows()
-        return jsonify(rows)
+        return paginated_response(molecules.select_sql(), ["id"])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -0,0 +1,225 @@
+"""
+Molecule Repository
+The one data access layer for the molecules table, shared by the REST API, the Dash
+UI and the standalone molecules app.
+
+- Every statement is a fixed, parameterized SQL string. sqlite3 keeps prepared
+  statements per connection keyed by SQL text, so with pooled connections each one
+  is compiled once and reused.
+- Reads name their columns; callers pass a narrower projection when they need less.
+- Batch methods read with chunked IN (...) lookups and write in a single
+  transaction, with executemany wherever no ids are needed back.
+- Writes keep the structure keys, depiction cache, fingerprint index and descriptor
+  table in step, so callers do not have to.
+"""
+
+from cheminf.db.db import execute_query, transaction
+from cheminf.molecules.depiction import invalidate_smiles
+from cheminf.molecules.descriptors import INSERT_DESCRIPTORS, descriptor_row, update_descriptors
+from cheminf.molecules.fingerprints import (FINGERPRINT_TABLE, INSERT_FINGERPRINT, fingerprint_row, get_index,
+                                            index_molecule, remove_molecule)
+from cheminf.molecules.structure import (MOLECULES_TABLE, DuplicateStructureError, canonical_smiles,
+                                         check_unique_structure, structure_keys)
+
+MOLECULE_COLUMNS = ("id", "MoleculeUpacName", "SMILES", "canonical_smiles", "inchikey")
+TABLE_COLUMNS = ("id", "MoleculeUpacName", "SMILES")  # what the molecule tables display
+LOOKUP_CHUNK = 500  # ids per IN (...) lookup
+COMPARISONS = ('=', '!=', '<', '<=', '>', '>=')
+
+_UNCHANGED = object()
+
+class MoleculeRepository:
+    """CRUD for molecules; all methods return plain dicts / ids."""
+
+    INSERT = (f"INSERT INTO {MOLECULES_TABLE} (MoleculeUpacName, SMILES, canonical_smiles, inchikey) "
+              f"VALUES (?, ?, ?, ?)")
+    RENAME = f"UPDATE {MOLECULES_TABLE} SET MoleculeUpacName = ? WHERE id = ?"
+    UPDATE = (f"UPDATE {MOLECULES_TABLE} SET MoleculeUpacName = ?, SMILES = ?, canonical_smiles = ?, inchikey = ? "
+              f"WHERE id = ?")
+    DELETE = f"DELETE FROM {MOLECULES_TABLE} WHERE id = ?"
+    SELECT_SMILES = f"SELECT SMILES FROM {MOLECULES_TABLE} WHERE id = ?"
+
+    @staticmethod
+    def _columns(columns):
+        unknown = set(columns) - set(MOLECULE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown molecule columns: {', '.join(sorted(unknown))}")
+        return ', '.join(columns)
+
+    def select_sql(self, columns=MOLECULE_COLUMNS):
+        """SELECT of the whole table (no ORDER BY), e.g. for paginated_response()."""
+        return f"SELECT {self._columns(columns)} FROM {MOLECULES_TABLE}"
+
+    # -------------------------------
+    # Reads
+    # -------------------------------
+
+    def get(self, molecule_id, columns=MOLECULE_COLUMNS):
+        rows = execute_query(f"{self.select_sql(columns)} WHERE id = ?", (molecule_id,))
+        return rows[0] if rows else None
+
+    def get_many(self, ids, columns=MOLECULE_COLUMNS):
+        """Rows for the given ids in the order given; unknown ids are left out."""
+        if 'id' not in columns:
+            columns = ('id',) + tuple(columns)
+        ids = list(dict.fromkeys(ids))
+        rows_by_id = {}
+        for i in range(0, len(ids), LOOKUP_CHUNK):
+            chunk = ids[i:i + LOOKUP_CHUNK]
+            for row in execute_query(f"{self.select_sql(columns)} WHERE id IN ({','.join('?' for _ in chunk)})", chunk):
+                rows_by_id[row['id']] = row
+        return [rows_by_id[molecule_id] for molecule_id in ids if molecule_id in rows_by_id]
+
+    def all(self, columns=MOLECULE_COLUMNS):
+        return execute_query(f"{self.select_sql(columns)} ORDER BY id")
+
+    def _where(self, filters):
+        clauses, params = [], []
+        for column, operator, value in filters:
+            self._columns((column,))
+            if operator in COMPARISONS:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+            elif operator == 'contains':  # case-sensitive substring (LIKE ignores ASCII case)
+                clauses.append(f"instr({column}, ?) > 0")
+                params.append(str(value))
+            elif operator == 'icontains':  # case-insensitive substring, cannot use an index
+                clauses.append(f"{column} LIKE ? ESCAPE '\\'")
+                params.append('%' + str(value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+            elif operator == 'startswith':  # prefix as an index range
+                value = str(value)
+                if value:
+                    clauses.append(f"{column} >= ? AND {column} < ?")
+                    params.extend([value, value[:-1] + chr(ord(value[-1]) + 1)])
+            else:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def page(self, columns=TABLE_COLUMNS, filters=(), sort_column='id', descending=False, limit=25, offset=0):
+        """
+        One page of molecules for a paged table: returns (rows, total matching rows).
+        filters are (column, operator, value) with operator one of =, !=, <, <=, >, >=,
+        contains (case-sensitive, as in Dash), icontains (case-insensitive) or startswith.
+        Rows are ordered by sort_column, then id, which the molecules indexes serve directly.
+        """
+        query, count_query, params = self.page_sql(columns, filters, sort_column, descending)
+        rows = execute_query(query, params + [limit, offset])
+        total = execute_query(count_query, params)[0]['total']
+        return rows, total
+
+    def page_sql(self, columns=TABLE_COLUMNS, filters=(), sort_column='id', descending=False):
+        """(page query, count query, filter params) of page(); the page query also takes LIMIT and OFFSET."""
+        self._columns((sort_column,))
+        where, params = self._where(filters)
+        direction = 'DESC' if descending else 'ASC'
+        order = f"{sort_column} {direction}, id {direction}" if sort_column != 'id' else f"id {direction}"
+        return (f"{self.select_sql(columns)}{where} ORDER BY {order} LIMIT ? OFFSET ?",
+                f"SELECT COUNT(*) AS total FROM {MOLECULES_TABLE}{where}", params)
+
+    # -------------------------------
+    # Writes
+    # -------------------------------
+
+    @staticmethod
+    def _keys(smiles, exclude_id=None):
+        if smiles and canonical_smiles(smiles) is None:
+            raise ValueError("Invalid SMILES")
+        return check_unique_structure(smiles, exclude_id)
+
+    def create(self, name, smiles=None):
+        """
+        Insert one molecule and return its id. Raises ValueError for an invalid SMILES and
+        DuplicateStructureError if the structure is already stored.
+        """
+        canonical, inchikey = self._keys(smiles)
+        with transaction() as connection:
+            molecule_id = connection.execute(self.INSERT, (name, smiles, canonical, inchikey)).lastrowid
+        if smiles:
+            index_molecule(molecule_id, smiles)
+            update_descriptors(molecule_id, smiles)
+        return molecule_id
+
+    def create_many(self, molecules):
+        """
+        Insert (name, smiles) pairs in one transaction and return their ids in order.
+        All or nothing: an invalid or duplicate structure raises before anything is written.
+        """
+        rows, seen = [], {}
+        for name, smiles in molecules:
+            if smiles and canonical_smiles(smiles) is None:
+                raise ValueError(f"Invalid SMILES: {smiles}")
+            canonical, inchikey = structure_keys(smiles) if smiles else (None, None)
+            if canonical is not None:
+                if canonical in seen:
+                    raise ValueError(f"{name} repeats the structure of {seen[canonical]}")
+                seen[canonical] = name
+            rows.append((name, smiles, canonical, inchikey))
+        self._check_unique_many([row[2] for row in rows if row[2]])
+
+        with transaction() as connection:
+            ids = [connection.execute(self.INSERT, row).lastrowid for row in rows]
+            structures = [(molecule_id, row[1]) for molecule_id, row in zip(ids, rows) if row[2]]
+            if structures:
+                connection.executemany(INSERT_DESCRIPTORS, [descriptor_row(*pair) for pair in structures])
+                connection.executemany(INSERT_FINGERPRINT, [fingerprint_row(*pair) for pair in structures])
+        if structures:
+            get_index().reload()
+        return ids
+
+    def _check_unique_many(self, canonicals):
+        for i in range(0, len(canonicals), LOOKUP_CHUNK):
+            chunk = canonicals[i:i + LOOKUP_CHUNK]
+            rows = execute_query(f"SELECT id, MoleculeUpacName FROM {MOLECULES_TABLE} "
+                                 f"WHERE canonical_smiles IN ({','.join('?' for _ in chunk)}) LIMIT 1", chunk)
+            if rows:
+                raise DuplicateStructureError(rows[0])
+
+    def update(self, molecule_id, name, smiles=_UNCHANGED):
+        """
+        Rename a molecule, and change its structure if smiles is given.
+        Returns False if there is no such molecule. Raises like create().
+        """
+        if smiles is _UNCHANGED:
+            return execute_query(self.RENAME, (name, molecule_id)) > 0
+
+        smiles = smiles or None
+        canonical, inchikey = self._keys(smiles, exclude_id=molecule_id)
+        with transaction() as connection:
+            old = connection.execute(self.SELECT_SMILES, (molecule_id,)).fetchone()
+            if old is None:
+                return False
+            connection.execute(self.UPDATE, (name, smiles, canonical, inchikey, molecule_id))
+        invalidate_smiles(old['SMILES'])
+        index_molecule(molecule_id, smiles)
+        update_descriptors(molecule_id, smiles)
+        return True
+
+    def rename_many(self, names):
+        """Rename many molecules in one transaction: names is {id: new name}."""
+        with transaction() as connection:
+            connection.executemany(self.RENAME, [(name, molecule_id) for molecule_id, name in names.items()])
+
+    def delete(self, molecule_id):
+        """Delete one molecule; returns False if there is no such molecule."""
+        with transaction() as connection:
+            old = connection.execute(self.SELECT_SMILES, (molecule_id,)).fetchone()
+            if old is None:
+                return False
+            connection.execute(self.DELETE, (molecule_id,))
+        invalidate_smiles(old['SMILES'])
+        remove_molecule(molecule_id)  # descriptors go with the row (trigger)
+        return True
+
+    def delete_many(self, ids):
+        """Delete many molecules in one transaction; returns the number deleted."""
+        old = self.get_many(ids, ('id', 'SMILES'))
+        with transaction() as connection:
+            connection.executemany(self.DELETE, [(row['id'],) for row in old])
+            connection.executemany(f"DELETE FROM {FINGERPRINT_TABLE} WHERE molecule_id = ?",
+                                   [(row['id'],) for row in old])
+        for row in old:
+            invalidate_smiles(row['SMILES'])
+        get_index().reload()
+        return len(old)
+
+molecules = MoleculeRepository()
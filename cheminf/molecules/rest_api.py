@@ -1,19 +1,36 @@
-from flask import request, jsonify
-from cheminf.db.db import get_db_connection, get_all_rows
-from cheminf.config import DB_NAME, DB_PREFIX
+from flask import request, jsonify, Response
+from cheminf.db.pagination import paginated_response
+from cheminf.molecules.bulk_import import detect_format, import_molecules
+from cheminf.molecules.descriptors import (DESCRIPTORS, DESCRIPTOR_TABLE, descriptor_filters, ensure_synced,
+                                           get_descriptors)
+from cheminf.molecules.depiction import (DEFAULT_SIZE, MIN_SIZE, MAX_SIZE, MAX_SPRITE_PIXELS, compose_sprite,
+                                         depiction_key, get_depiction, get_depictions)
+from cheminf.molecules.fingerprints import get_index
+from cheminf.molecules.repository import molecules
+from cheminf.molecules.structure import DuplicateStructureError, canonical_smiles, find_by_structure
+from cheminf.config import DB_PREFIX
 from cheminf.app_server import server  # Use the published Flask server
+from rdkit import Chem
+import io, json, sqlite3, time, zipfile
 
-# Build the full table name with database name and prefix
-TABLE_NAME = f"{DB_NAME}.{DB_PREFIX}molecules"
+# Build the table name with prefix (SQLite has no database name qualifier)
+TABLE_NAME = f"{DB_PREFIX}molecules"
 
 # Define base API route as a constant
 BASE_API = "/api/molecules"
 
+# Versioned image URLs (?v=<etag>) never change content; unversioned ones must revalidate
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "public, max-age=0, must-revalidate"
+
+MAX_BATCH_IMAGES = 1000
+MAX_SEARCH_RESULTS = 1000
+
 @server.route(f'{BASE_API}', methods=['GET'])
 def api_get_molecules():
+    """Get molecules ordered by id, one page at a time (?limit=, ?cursor=)"""
     try:
-        rows = get_all_rows()
-        return jsonify(rows)
+        return paginated_response(molecules.select_sql(), ["id"])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -23,14 +40,143 @@ def api_create_molecule():
     if not data or 'MoleculeUpacName' not in data:
         return jsonify({"error": "Invalid request payload"}), 400
     molecule_name = data['MoleculeUpacName']
+    smiles = data.get('SMILES') or None
+    if smiles and canonical_smiles(smiles) is None:
+        return jsonify({"error": "Invalid SMILES"}), 400
+    try:
+        molecule_id = molecules.create(molecule_name, smiles)
+        return jsonify({"message": "Molecule created successfully", "id": molecule_id}), 201
+    except DuplicateStructureError as e:
+        return jsonify({"error": str(e), "existing_id": e.existing['id']}), 409
+    except sqlite3.IntegrityError as e:  # lost a race against a concurrent insert of the same structure
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@server.route(f'{BASE_API}/import', methods=['POST'])
+def api_import_molecules():
+    """
+    Bulk import from an uploaded .sdf, .smi or .csv file (multipart field 'file').
+    The format comes from ?format= or the file extension. Returns the import report.
+    """
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({"error": "Upload a file in the 'file' form field"}), 400
+    try:
+        fmt = detect_format(upload.filename, request.args.get('format'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        report = import_molecules(upload.stream, fmt)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify(report), 200
+
+@server.route(f'{BASE_API}/lookup', methods=['GET'])
+def api_lookup_molecule():
+    """Exact-structure lookup by ?smiles= (any valid SMILES) or ?inchikey= (unique index seek)"""
+    smiles = request.args.get('smiles', '').strip()
+    inchikey = request.args.get('inchikey', '').strip()
+    if not smiles and not inchikey:
+        return jsonify({"error": "smiles or inchikey query parameter is required"}), 400
+    if smiles and canonical_smiles(smiles) is None:
+        return jsonify({"error": "Invalid SMILES"}), 400
+    try:
+        row = find_by_structure(smiles=smiles or None, inchikey=inchikey or None)
+        if row is None:
+            return jsonify({"error": "Molecule not found"}), 404
+        return jsonify(row)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@server.route(f'{BASE_API}/search', methods=['GET'])
+def api_search_molecules():
+    """
+    Substructure search: ?substructure=<SMARTS>&limit=100
+    Candidates are screened with pattern fingerprints before HasSubstructMatch.
+    """
+    smarts = request.args.get('substructure', '').strip()
+    if not smarts:
+        return jsonify({"error": "substructure query parameter is required"}), 400
+    try:
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if limit < 1 or limit > MAX_SEARCH_RESULTS:
+        return jsonify({"error": f"limit must be between 1 and {MAX_SEARCH_RESULTS}"}), 400
+    query = Chem.MolFromSmarts(smarts)
+    if query is None:
+        return jsonify({"error": "Invalid SMARTS pattern"}), 400
+
+    try:
+        matches, stats = get_index().substructure_search(query, limit)
+        rows = molecules.get_many(sorted(matches))
+        return jsonify({"substructure": smarts, "results": rows, "stats": stats})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@server.route(f'{BASE_API}/similar', methods=['GET'])
+def api_similar_molecules():
+    """
+    Tanimoto similarity search on Morgan fingerprints: ?smiles=<SMILES>&threshold=0.7&top_k=50
+    Results are ordered by similarity, best first.
+    """
+    smiles = request.args.get('smiles', '').strip()
+    if not smiles:
+        return jsonify({"error": "smiles query parameter is required"}), 400
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        cursor.execute(f"INSERT INTO {TABLE_NAME} (MoleculeUpacName) VALUES (%s)", (molecule_name,))
-        connection.commit()
-        cursor.close()
-        connection.close()
-        return jsonify({"message": "Molecule created successfully"}), 201
+        threshold = float(request.args.get('threshold', 0.7))
+        top_k = int(request.args.get('top_k', 50))
+    except ValueError:
+        return jsonify({"error": "threshold must be a number and top_k an integer"}), 400
+    if not 0 <= threshold <= 1:
+        return jsonify({"error": "threshold must be between 0 and 1"}), 400
+    if top_k < 1 or top_k > MAX_SEARCH_RESULTS:
+        return jsonify({"error": f"top_k must be between 1 and {MAX_SEARCH_RESULTS}"}), 400
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        return jsonify({"error": "Invalid SMILES"}), 400
+
+    try:
+        hits, stats = get_index().similarity_search(mol, threshold, top_k)
+        rows_by_id = {row['id']: row for row in molecules.get_many([molecule_id for molecule_id, _ in hits])}
+        results = [dict(rows_by_id[molecule_id], similarity=score)
+                   for molecule_id, score in hits if molecule_id in rows_by_id]
+        return jsonify({"smiles": smiles, "threshold": threshold, "results": results, "stats": stats})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@server.route(f'{BASE_API}/descriptors', methods=['GET'])
+def api_filter_by_descriptors():
+    """
+    Molecules with their descriptors, filtered by inclusive ranges such as
+    ?mw_max=300&logp_min=1 (<descriptor>_min / <descriptor>_max), paged by id.
+    """
+    try:
+        where, params = descriptor_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        ensure_synced()
+        columns = ', '.join(f"d.{name}" for name in DESCRIPTORS)
+        query = (f"SELECT m.id, m.MoleculeUpacName, m.SMILES, {columns} FROM {TABLE_NAME} m "
+                 f"JOIN {DESCRIPTOR_TABLE} d ON d.molecule_id = m.id")
+        if where:
+            query += f" WHERE {where}"
+        return paginated_response(query, ["id"], params)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@server.route(f'{BASE_API}/<int:id>/descriptors', methods=['GET'])
+def api_get_descriptors(id):
+    """Descriptors of one molecule (computed on the fly if missing)"""
+    try:
+        row = get_descriptors(id)
+        if row is None:
+            return jsonify({"error": "Molecule not found"}), 404
+        return jsonify(row)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -40,29 +186,127 @@ def api_update_molecule(id):
     if not data or 'MoleculeUpacName' not in data:
         return jsonify({"error": "Invalid request payload"}), 400
     molecule_name = data['MoleculeUpacName']
+    smiles = data.get('SMILES') or None
+    if smiles and canonical_smiles(smiles) is None:
+        return jsonify({"error": "Invalid SMILES"}), 400
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        cursor.execute(f"UPDATE {TABLE_NAME} SET MoleculeUpacName = %s WHERE id = %s", (molecule_name, id))
-        connection.commit()
-        cursor.close()
-        connection.close()
+        if 'SMILES' in data:
+            molecules.update(id, molecule_name, smiles)
+        else:
+            molecules.update(id, molecule_name)
         return jsonify({"message": "Molecule updated successfully"}), 200
+    except DuplicateStructureError as e:
+        return jsonify({"error": str(e), "existing_id": e.existing['id']}), 409
+    except sqlite3.IntegrityError as e:
+        return jsonify({"error": str(e)}), 409
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @server.route(f'{BASE_API}/<int:id>', methods=['DELETE'])
 def api_delete_molecule(id):
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE id = %s", (id,))
-        connection.commit()
-        cursor.close()
-        connection.close()
+        molecules.delete(id)
         return jsonify({"message": "Molecule deleted successfully"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@server.route(f'{BASE_API}/<int:id>/image.png', methods=['GET'])
+def api_get_molecule_image(id):
+    """PNG depiction of a molecule (?size= in pixels), served from the depiction cache"""
+    try:
+        size = int(request.args.get('size', DEFAULT_SIZE))
+    except ValueError:
+        return jsonify({"error": "size must be an integer"}), 400
+    if size < MIN_SIZE or size > MAX_SIZE:
+        return jsonify({"error": f"size must be between {MIN_SIZE} and {MAX_SIZE}"}), 400
+    try:
+        row = molecules.get(id, ('SMILES',))
+        if row is None:
+            return jsonify({"error": "Molecule not found"}), 404
+        canonical = canonical_smiles(row['SMILES'])
+        if canonical is None:
+            return jsonify({"error": "Molecule has no valid SMILES"}), 404
+
+        etag = depiction_key(canonical, size, size)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)  # client copy is current, skip loading the PNG
+        else:
+            _, png = get_depiction(canonical, size, size)
+            response = Response(png, mimetype='image/png')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE if request.args.get('v') == etag else REVALIDATE_CACHE
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@server.route(f'{BASE_API}/images', methods=['POST'])
+def api_batch_molecule_images():
+    """
+    Render many depictions in one request, cache misses in parallel.
+
+    Body: {"ids": [1, 2, ...], "size": 150, "format": "zip" | "sprite", "columns": 10}
+    - zip: one <id>.png per molecule (ids without a valid SMILES are listed in X-Missing-Ids)
+    - sprite: one PNG grid, tiles in request order (X-Sprite-Ids, X-Sprite-Columns, X-Sprite-Tile-Size)
+    Timing is reported in the Server-Timing header, cache statistics in X-Batch-Stats.
+    """
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data.get('ids'), list) or not data['ids']:
+        return jsonify({"error": "Request must contain a non-empty 'ids' array"}), 400
+    try:
+        ids = [int(molecule_id) for molecule_id in data['ids']]
+        size = int(data.get('size', DEFAULT_SIZE))
+        columns = int(data.get('columns', 10))
+    except (TypeError, ValueError):
+        return jsonify({"error": "ids, size and columns must be integers"}), 400
+    output_format = data.get('format', 'zip')
+    if len(ids) > MAX_BATCH_IMAGES:
+        return jsonify({"error": f"At most {MAX_BATCH_IMAGES} ids per request"}), 400
+    if size < MIN_SIZE or size > MAX_SIZE:
+        return jsonify({"error": f"size must be between {MIN_SIZE} and {MAX_SIZE}"}), 400
+    if columns < 1:
+        return jsonify({"error": "columns must be positive"}), 400
+    if output_format not in ('zip', 'sprite'):
+        return jsonify({"error": "format must be zip or sprite"}), 400
+    if output_format == 'sprite':
+        # The sheet is allocated whole: bound it before anything is rendered
+        columns = min(columns, len(ids))
+        rows = -(-len(ids) // columns)
+        if columns * rows * size * size > MAX_SPRITE_PIXELS:
+            return jsonify({"error": f"Sprite of {columns}x{rows} tiles of {size} px exceeds "
+                                     f"{MAX_SPRITE_PIXELS} pixels; request fewer ids or a smaller size"}), 400
+
+    try:
+        started = time.perf_counter()
+        smiles_by_id = {row['id']: row['SMILES'] for row in molecules.get_many(ids, ('id', 'SMILES'))}
+        depictions, stats = get_depictions([smiles_by_id.get(molecule_id) for molecule_id in ids], size, size)
+        pack_started = time.perf_counter()
+
+        missing = [molecule_id for molecule_id, (key, _) in zip(ids, depictions) if key is None]
+        if output_format == 'sprite':
+            body = compose_sprite([png for _, png in depictions], size, columns)
+            response = Response(body, mimetype='image/png')
+            response.headers['X-Sprite-Ids'] = ','.join(str(molecule_id) for molecule_id in ids)
+            response.headers['X-Sprite-Columns'] = str(columns)
+            response.headers['X-Sprite-Tile-Size'] = str(size)
+        else:
+            buf = io.BytesIO()
+            with zipfile.ZipFile(buf, 'w', zipfile.ZIP_STORED) as archive:  # PNGs are already compressed
+                for molecule_id, (key, png) in zip(ids, depictions):
+                    if key is not None:
+                        archive.writestr(f"{molecule_id}.png", png)
+            response = Response(buf.getvalue(), mimetype='application/zip',
+                                headers={'Content-Disposition': 'attachment; filename=molecule_images.zip'})
+        stats["pack_ms"] = round((time.perf_counter() - pack_started) * 1000, 2)
+        stats["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        response.headers['Server-Timing'] = (f"lookup;dur={stats['lookup_ms']}, render;dur={stats['render_ms']}, "
+                                             f"pack;dur={stats['pack_ms']}, total;dur={stats['total_ms']}")
+        response.headers['X-Batch-Stats'] = json.dumps(stats)
+        if missing:
+            response.headers['X-Missing-Ids'] = ','.join(str(molecule_id) for molecule_id in missing)
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 if __name__ == '__main__':
     server.run(debug=True)
\ No newline at end of file
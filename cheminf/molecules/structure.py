@@ -0,0 +1,119 @@
+"""
+Molecule Structure Identity
+Every molecule with a parseable SMILES stores its RDKit canonical SMILES and InChIKey,
+each under a unique index, so exact-structure lookups and duplicate checks are index
+seeks. Molecules without a (valid) SMILES keep NULL in both columns.
+
+Databases created before these columns existed are migrated by ensure_structure_columns()
+at startup. Duplicates that are already in the table are reported there; the oldest
+molecule keeps the keys and the later copies are left with NULL keys. Every row the
+backfill has looked at gets structure_checked = 1, so duplicates and unparseable
+SMILES are reported once, not on every start.
+"""
+
+from functools import lru_cache
+
+from rdkit import Chem
+
+from cheminf.config import DB_PREFIX
+from cheminf.db.db import execute_query
+
+MOLECULES_TABLE = f"{DB_PREFIX}molecules"
+
+STRUCTURE_COLUMNS = (("canonical_smiles", "VARCHAR(255)"), ("inchikey", "CHAR(27)"),
+                     ("structure_checked", "INTEGER NOT NULL DEFAULT 0"))
+
+# Columns of a molecule returned by find_by_structure (not the backfill bookkeeping)
+STRUCTURE_ROW = "id, MoleculeUpacName, SMILES, canonical_smiles, inchikey"
+
+class DuplicateStructureError(ValueError):
+    """Raised when a structure is already stored under another molecule."""
+
+    def __init__(self, existing):
+        self.existing = existing
+        super().__init__(f"Structure already exists as molecule {existing['id']} ({existing['MoleculeUpacName']})")
+
+@lru_cache(maxsize=4096)
+def canonical_smiles(smiles):
+    """RDKit canonical SMILES, or None if the SMILES does not parse."""
+    if not smiles:
+        return None
+    mol = Chem.MolFromSmiles(smiles)
+    return Chem.MolToSmiles(mol) if mol is not None else None
+
+@lru_cache(maxsize=4096)
+def structure_keys(smiles):
+    """(canonical SMILES, InChIKey) for a SMILES string; (None, None) if it does not parse."""
+    canonical = canonical_smiles(smiles)
+    if canonical is None:
+        return None, None
+    return canonical, Chem.MolToInchiKey(Chem.MolFromSmiles(canonical)) or None
+
+def ensure_structure_columns(connection):
+    """Add and backfill canonical_smiles/inchikey, then create their unique indexes."""
+    columns = {row[1] for row in connection.execute(f"PRAGMA table_info({MOLECULES_TABLE})")}
+    if not columns:
+        return
+    for column, column_type in STRUCTURE_COLUMNS:
+        if column not in columns:
+            connection.execute(f"ALTER TABLE {MOLECULES_TABLE} ADD COLUMN {column} {column_type}")
+
+    taken = {}  # canonical SMILES / InChIKey -> id of the molecule holding it
+    for molecule_id, canonical, inchikey in connection.execute(
+            f"SELECT id, canonical_smiles, inchikey FROM {MOLECULES_TABLE} WHERE canonical_smiles IS NOT NULL"):
+        taken[canonical] = molecule_id
+        if inchikey:
+            taken[inchikey] = molecule_id
+    missing = connection.execute(f"SELECT id, MoleculeUpacName, SMILES FROM {MOLECULES_TABLE} "
+                                 f"WHERE canonical_smiles IS NULL AND SMILES IS NOT NULL "
+                                 f"AND structure_checked = 0 ORDER BY id").fetchall()
+    updates = []
+    for molecule_id, name, smiles in missing:
+        canonical, inchikey = structure_keys(smiles)
+        duplicate_of = None
+        if canonical is not None:
+            duplicate_of = taken.get(canonical) or (taken.get(inchikey) if inchikey else None)
+        if duplicate_of is not None:
+            print(f"Warning: molecule {molecule_id} ({name}) duplicates the structure of molecule {duplicate_of}")
+        if canonical is None or duplicate_of is not None:
+            updates.append((None, None, molecule_id))  # checked; keeps NULL keys
+            continue
+        taken[canonical] = molecule_id
+        if inchikey:
+            taken[inchikey] = molecule_id
+        updates.append((canonical, inchikey, molecule_id))
+    connection.executemany(f"UPDATE {MOLECULES_TABLE} SET canonical_smiles = ?, inchikey = ?, structure_checked = 1 "
+                           f"WHERE id = ?", updates)
+
+    connection.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {DB_PREFIX}idx_molecules_canonical_smiles "
+                       f"ON {MOLECULES_TABLE} (canonical_smiles)")
+    connection.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {DB_PREFIX}idx_molecules_inchikey "
+                       f"ON {MOLECULES_TABLE} (inchikey)")
+
+def find_by_structure(smiles=None, inchikey=None, exclude_id=None):
+    """Molecule row with the same structure (by canonical SMILES or InChIKey), or None."""
+    if smiles is not None:
+        canonical, inchikey = structure_keys(smiles)
+        if canonical is None:
+            return None
+        query = f"SELECT {STRUCTURE_ROW} FROM {MOLECULES_TABLE} WHERE canonical_smiles = ? OR inchikey = ?"
+        params = [canonical, inchikey]
+    elif inchikey is not None:
+        query, params = f"SELECT {STRUCTURE_ROW} FROM {MOLECULES_TABLE} WHERE inchikey = ?", [inchikey]
+    else:
+        return None
+    rows = execute_query(query, params)
+    rows = [row for row in rows if row['id'] != exclude_id]
+    return rows[0] if rows else None
+
+def check_unique_structure(smiles, exclude_id=None):
+    """
+    Return (canonical SMILES, InChIKey) for a molecule about to be written.
+    Raises DuplicateStructureError if another molecule already has this structure.
+    """
+    canonical, inchikey = structure_keys(smiles)
+    if canonical is not None:
+        existing = find_by_structure(smiles, exclude_id=exclude_id)
+        if existing is not None:
+            raise DuplicateStructureError(existing)
+    return canonical, inchikey
@@ -1,17 +1,44 @@
 from dash import dcc, html, Input, Output, State, dash_table, exceptions
 import dash
+import re
 from cheminf.app_server import server  # Use the shared Flask server
-from cheminf.db.db import get_all_rows, get_db_connection
-from cheminf.config import DB_NAME, DB_PREFIX
+from cheminf.molecules.depiction import depiction_url
+from cheminf.molecules.repository import TABLE_COLUMNS, molecules
+from cheminf.molecules.structure import DuplicateStructureError
 
-# Import RDKit and required modules for image generation
-from rdkit import Chem
-from rdkit.Chem import Draw
-import io
-import base64
+PAGE_SIZE = 25
 
-# Full table name
-TABLE_NAME = f"{DB_NAME}.{DB_PREFIX}molecules"
+# One clause of a DataTable filter_query, e.g. {MoleculeUpacName} icontains acid, and the
+# && that joins it to the next one. A quoted value is read to its closing quote, so
+# quotes, spaces and && inside it are part of the value.
+FILTER_CLAUSE = re.compile(r"""
+    \s*\{(?P<column>[^}]+)\}\s+(?P<operator>\S+)\s+
+    (?P<value>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|`(?:[^`\\]|\\.)*`|.+?)
+    \s*(?:&&|$)""", re.VERBOSE | re.DOTALL)
+# DataTable operator -> MoleculeRepository operator; contains is case-sensitive in Dash
+FILTER_OPERATORS = {"=": "=", "eq": "=", "!=": "!=", "ne": "!=", "<": "<", "lt": "<", "<=": "<=", "le": "<=",
+                    ">": ">", "gt": ">", ">=": ">=", "ge": ">=", "contains": "contains",
+                    "icontains": "icontains", "scontains": "contains", "datestartswith": "startswith"}
+
+def parse_filter_query(filter_query):
+    """DataTable filter_query -> [(column, operator, value)] for MoleculeRepository.page()."""
+    filters = []
+    position = 0
+    while filter_query and position < len(filter_query):
+        match = FILTER_CLAUSE.match(filter_query, position)
+        operator = match and match['operator']
+        if operator and operator not in FILTER_OPERATORS and operator[0] in 'is':
+            operator = operator[1:]  # case-sensitivity prefix (s=, ine, ...)
+        if not match or operator not in FILTER_OPERATORS or match['column'] not in TABLE_COLUMNS:
+            raise ValueError(f"Unsupported filter: {filter_query[position:].strip()}")
+        position = match.end()
+        value = match['value']
+        if value[0] in '"\'`' and len(value) > 1 and value[-1] == value[0]:
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])  # drop the quotes and backslash escapes
+        if match['column'] == 'id':
+            value = int(float(value))
+        filters.append((match['column'], FILTER_OPERATORS[operator], value))
+    return filters
 
 # Use the shared CSS from /static
 external_stylesheets = ['/static/styles.css']
@@ -24,19 +51,6 @@ app = dash.Dash(
     external_stylesheets=external_stylesheets
 )
 
-def get_img_src(smiles):
-    """
-    Generate the base64 image src directly for html.Img.
-    """
-    mol = Chem.MolFromSmiles(smiles)
-    if mol is None:
-        return ""
-    img = Draw.MolToImage(mol, size=(150, 150))
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    encoded = base64.b64encode(buf.getvalue()).decode("utf-8")
-    return f"data:image/png;base64,{encoded}"
-
 app.layout = html.Div(
     className="container",
     children=[
@@ -67,14 +81,24 @@ app.layout = html.Div(
             ]
         ),
         html.Hr(),
+        dcc.Store(id='table-version', data=0),
+        # Paged, sorted and filtered in SQL: the browser only ever holds the current page
         dash_table.DataTable(
             id='data-table',
             columns=[
-                {"name": "ID", "id": "id"},
+                {"name": "ID", "id": "id", "type": "numeric"},
                 {"name": "MoleculeUpacName", "id": "MoleculeUpacName"},
                 {"name": "SMILES", "id": "SMILES"}
             ],
-            data=get_all_rows(),
+            data=[],
+            page_action='custom',
+            page_current=0,
+            page_size=PAGE_SIZE,
+            sort_action='custom',
+            sort_mode='single',
+            sort_by=[],
+            filter_action='custom',
+            filter_query='',
             row_selectable='single',
             selected_rows=[],
             style_data={"color": "black"},
@@ -86,6 +110,7 @@ app.layout = html.Div(
                 "overflowY": "scroll"
             }
         ),
+        html.Div(id='table-output'),
         # Div to display the molecule image for the selected row
         html.Div(id='image-display', style={"padding": "20px", "textAlign": "center"}),
         html.Br(),
@@ -115,7 +140,7 @@ app.layout = html.Div(
 @app.callback(
     Output('insert-output', 'children'),
     Output('update-delete-output', 'children'),
-    Output('data-table', 'data'),
+    Output('table-version', 'data'),
     Input('insert-btn', 'n_clicks'),
     Input('delete-btn', 'n_clicks'),
     Input('update-btn', 'n_clicks'),
@@ -124,10 +149,11 @@ app.layout = html.Div(
     State('data-table', 'selected_rows'),
     State('data-table', 'data'),
     State('update-name', 'value'),
-    State('update-smiles', 'value')
+    State('update-smiles', 'value'),
+    State('table-version', 'data')
 )
 def manage_molecule(insert_clicks, delete_clicks, update_clicks,
-                    input_name, input_smiles, selected_rows, current_data, update_name, update_smiles):
+                    input_name, input_smiles, selected_rows, current_data, update_name, update_smiles, version):
     ctx = dash.callback_context
     if not ctx.triggered:
         raise exceptions.PreventUpdate
@@ -141,16 +167,10 @@ def manage_molecule(insert_clicks, delete_clicks, update_clicks,
             insert_msg = "Please provide both a molecule name and a SMILES string."
         else:
             try:
-                connection = get_db_connection()
-                cursor = connection.cursor()
-                cursor.execute(
-                    f"INSERT INTO {TABLE_NAME} (MoleculeUpacName, SMILES) VALUES (%s, %s)",
-                    (input_name, input_smiles)
-                )
-                connection.commit()
-                cursor.close()
-                connection.close()
+                molecules.create(input_name, input_smiles)
                 insert_msg = f"Inserted: {input_name} with SMILES {input_smiles}"
+            except DuplicateStructureError as e:
+                insert_msg = f"Not inserted: {str(e)}"
             except Exception as e:
                 insert_msg = f"Error inserting: {str(e)}"
     elif button_id == 'delete-btn':
@@ -162,12 +182,7 @@ def manage_molecule(insert_clicks, delete_clicks, update_clicks,
                 selected_row = current_data[row_index]
                 id_to_delete = selected_row['id']
 
-                connection = get_db_connection()
-                cursor = connection.cursor()
-                cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE id = %s", (id_to_delete,))
-                connection.commit()
-                cursor.close()
-                connection.close()
+                molecules.delete(id_to_delete)
                 update_delete_msg = f"Deleted row with ID: {id_to_delete}"
             except Exception as e:
                 update_delete_msg = f"Error deleting: {str(e)}"
@@ -182,21 +197,44 @@ def manage_molecule(insert_clicks, delete_clicks, update_clicks,
                 selected_row = current_data[row_index]
                 id_to_update = selected_row['id']
 
-                connection = get_db_connection()
-                cursor = connection.cursor()
-                cursor.execute(
-                    f"UPDATE {TABLE_NAME} SET MoleculeUpacName = %s, SMILES = %s WHERE id = %s",
-                    (update_name, update_smiles, id_to_update)
-                )
-                connection.commit()
-                cursor.close()
-                connection.close()
+                molecules.update(id_to_update, update_name, update_smiles)
                 update_delete_msg = f"Updated row with ID: {id_to_update} to {update_name} and SMILES {update_smiles}"
+            except DuplicateStructureError as e:
+                update_delete_msg = f"Not updated: {str(e)}"
             except Exception as e:
                 update_delete_msg = f"Error updating: {str(e)}"
 
-    updated_data = get_all_rows()
-    return insert_msg, update_delete_msg, updated_data
+    # Bumping the version makes load_page() re-read the current page
+    return insert_msg, update_delete_msg, (version or 0) + 1
+
+@app.callback(
+    Output('data-table', 'data'),
+    Output('data-table', 'page_count'),
+    Output('data-table', 'selected_rows'),
+    Output('table-output', 'children'),
+    Input('data-table', 'page_current'),
+    Input('data-table', 'page_size'),
+    Input('data-table', 'sort_by'),
+    Input('data-table', 'filter_query'),
+    Input('table-version', 'data')
+)
+def load_page(page_current, page_size, sort_by, filter_query, version):
+    """Fetch only the visible page, with sorting and filtering done by indexed SQL."""
+    try:
+        filters = parse_filter_query(filter_query)
+    except ValueError as e:
+        return [], 0, [], str(e)
+    sort_column, descending = 'id', False
+    if sort_by:
+        sort_column, descending = sort_by[0]['column_id'], sort_by[0]['direction'] == 'desc'
+    page_size = page_size or PAGE_SIZE
+    try:
+        rows, total = molecules.page(TABLE_COLUMNS, filters, sort_column, descending,
+                                     limit=page_size, offset=(page_current or 0) * page_size)
+    except Exception as e:
+        return [], 0, [], f"Error loading molecules: {str(e)}"
+    return rows, max(1, -(-total // page_size)), [], f"{total} molecules"
+
 
 # Callback to display the image from the selected row using html.Img
 @app.callback(
@@ -211,7 +249,10 @@ def display_image(selected_rows, data):
     smiles = row.get("SMILES", "")
     if not smiles:
         return "No SMILES available."
-    return html.Img(src=get_img_src(smiles), style={"width": "150px"})
+    src = depiction_url(row["id"], smiles)
+    if src is None:
+        return "Invalid SMILES."
+    return html.Img(src=src, style={"width": "150px"})
 
 if __name__ == '__main__':
     app.run_server(debug=True)
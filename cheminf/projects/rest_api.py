@@ -1,5 +1,6 @@
 from flask import request, jsonify
 from cheminf.db.db import execute_query
+from cheminf.db.pagination import paginated_response
 from cheminf.app_server import server
 from cheminf.config import DB_PREFIX
 
@@ -52,16 +53,14 @@ def api_delete_project(project_id):
 # Tasks API endpoints
 @server.route('/api/tasks', methods=['GET'])
 def api_get_tasks():
-    """Get all tasks with project information"""
+    """Get tasks with project information, one page at a time (?limit=, ?cursor=)"""
     try:
         query = f"""
         SELECT t.id, t.description, t.content, t.project_id, p.name as project_name
         FROM {DB_PREFIX}task t
         JOIN {DB_PREFIX}project p ON t.project_id = p.id
-        ORDER BY t.id
         """
-        rows = execute_query(query)
-        return jsonify(rows)
+        return paginated_response(query, ["id"])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
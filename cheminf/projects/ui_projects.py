@@ -3,6 +3,7 @@ import dash
 from cheminf.app_server import server
 from cheminf.db.db import execute_query
 from cheminf.config import DB_PREFIX
+from cheminf.ui_utils import lazy_layout
 
 external_stylesheets = ['/static/styles.css']
 
@@ -48,61 +49,65 @@ def delete_project(project_id):
         return False
 
 # Layout
-app.layout = html.Div([
-    html.Header([
-        html.H1("ChemINF-EDU - Projects Management", style={"color": "white"})
-    ], className="header"),
+def build_layout(projects):
+    """Page layout, built per request so the projects table is current."""
+    return html.Div([
+        html.Header([
+            html.H1("ChemINF-EDU - Projects Management", style={"color": "white"})
+        ], className="header"),
     
-    html.Div([
         html.Div([
-            html.H2("Add New Project"),
-            dcc.Input(
-                id="project-name-input",
-                type="text",
-                placeholder="Enter project name...",
-                style={"width": "300px", "marginRight": "10px"}
-            ),
-            html.Button("Add Project", id="add-project-btn", n_clicks=0, className="button"),
-        ], className="input-section"),
+            html.Div([
+                html.H2("Add New Project"),
+                dcc.Input(
+                    id="project-name-input",
+                    type="text",
+                    placeholder="Enter project name...",
+                    style={"width": "300px", "marginRight": "10px"}
+                ),
+                html.Button("Add Project", id="add-project-btn", n_clicks=0, className="button"),
+            ], className="input-section"),
         
-        html.Div([
-            html.H2("Update Project"),
-            dcc.Input(
-                id="update-project-name",
-                type="text", 
-                placeholder="New project name...",
-                style={"width": "300px", "marginRight": "10px"}
-            ),
-            html.Button("Update Selected", id="update-project-btn", n_clicks=0, className="button"),
-            html.Button("Delete Selected", id="delete-project-btn", n_clicks=0, className="button delete"),
-        ], className="input-section"),
+            html.Div([
+                html.H2("Update Project"),
+                dcc.Input(
+                    id="update-project-name",
+                    type="text", 
+                    placeholder="New project name...",
+                    style={"width": "300px", "marginRight": "10px"}
+                ),
+                html.Button("Update Selected", id="update-project-btn", n_clicks=0, className="button"),
+                html.Button("Delete Selected", id="delete-project-btn", n_clicks=0, className="button delete"),
+            ], className="input-section"),
         
-        html.Div([
-            html.H2("Projects Table"),
-            dash_table.DataTable(
-                id="projects-table",
-                columns=[
-                    {"name": "ID", "id": "id"},
-                    {"name": "Project Name", "id": "name"}
-                ],
-                data=get_all_projects(),
-                row_selectable="single",
-                selected_rows=[],
-                style_cell={'textAlign': 'left'},
-                style_header={'backgroundColor': '#000', 'color': 'white', 'fontWeight': 'bold', 'border': '1px solid #000'},
-                style_data={'backgroundColor': '#fff', 'color': '#000', 'border': '1px solid #000'},
-            )
-        ], className="table-section"),
+            html.Div([
+                html.H2("Projects Table"),
+                dash_table.DataTable(
+                    id="projects-table",
+                    columns=[
+                        {"name": "ID", "id": "id"},
+                        {"name": "Project Name", "id": "name"}
+                    ],
+                    data=projects,
+                    row_selectable="single",
+                    selected_rows=[],
+                    style_cell={'textAlign': 'left'},
+                    style_header={'backgroundColor': '#000', 'color': 'white', 'fontWeight': 'bold', 'border': '1px solid #000'},
+                    style_data={'backgroundColor': '#fff', 'color': '#000', 'border': '1px solid #000'},
+                )
+            ], className="table-section"),
         
-        html.Div(id="projects-status", className="status-message"),
+            html.Div(id="projects-status", className="status-message"),
         
-        html.Div([
-            html.A("← Back to Home", href="/", className="nav-link"),
-            html.A("View Tasks →", href="/tasks/", className="nav-link", style={"marginLeft": "20px"})
-        ], className="navigation")
+            html.Div([
+                html.A("← Back to Home", href="/", className="nav-link"),
+                html.A("View Tasks →", href="/tasks/", className="nav-link", style={"marginLeft": "20px"})
+            ], className="navigation")
         
-    ], className="container")
-])
+        ], className="container")
+    ])
+
+app.layout = lazy_layout(build_layout, projects=get_all_projects)
 
 @app.callback(
     [Output("projects-table", "data"),
@@ -3,6 +3,7 @@ import dash
 from cheminf.app_server import server
 from cheminf.db.db import execute_query
 from cheminf.config import DB_PREFIX
+from cheminf.ui_utils import lazy_layout
 
 external_stylesheets = ['/static/styles.css']
 
@@ -68,91 +69,95 @@ def delete_task(task_id):
         return False
 
 # Layout
-app.layout = html.Div([
-    html.Header([
-        html.H1("ChemINF-EDU - Tasks Management", style={"color": "white"})
-    ], className="header"),
+def build_layout(projects, tasks):
+    """Page layout, built per request so the project dropdowns and tasks table are current."""
+    return html.Div([
+        html.Header([
+            html.H1("ChemINF-EDU - Tasks Management", style={"color": "white"})
+        ], className="header"),
     
-    html.Div([
         html.Div([
-            html.H2("Add New Task"),
-            dcc.Dropdown(
-                id="project-dropdown",
-                options=[{"label": p["name"], "value": p["id"]} for p in get_all_projects()],
-                placeholder="Select project...",
-                style={"width": "300px", "marginBottom": "10px"}
-            ),
-            dcc.Input(
-                id="task-description-input",
-                type="text",
-                placeholder="Enter task description...",
-                style={"width": "300px", "marginRight": "10px", "marginBottom": "10px"}
-            ),
-            dcc.Textarea(
-                id="task-content-input",
-                placeholder="Enter task content/details...",
-                style={"width": "300px", "height": "100px", "marginRight": "10px"}
-            ),
-            html.Br(),
-            html.Button("Add Task", id="add-task-btn", n_clicks=0, className="button"),
-        ], className="input-section"),
+            html.Div([
+                html.H2("Add New Task"),
+                dcc.Dropdown(
+                    id="project-dropdown",
+                    options=[{"label": p["name"], "value": p["id"]} for p in projects],
+                    placeholder="Select project...",
+                    style={"width": "300px", "marginBottom": "10px"}
+                ),
+                dcc.Input(
+                    id="task-description-input",
+                    type="text",
+                    placeholder="Enter task description...",
+                    style={"width": "300px", "marginRight": "10px", "marginBottom": "10px"}
+                ),
+                dcc.Textarea(
+                    id="task-content-input",
+                    placeholder="Enter task content/details...",
+                    style={"width": "300px", "height": "100px", "marginRight": "10px"}
+                ),
+                html.Br(),
+                html.Button("Add Task", id="add-task-btn", n_clicks=0, className="button"),
+            ], className="input-section"),
         
-        html.Div([
-            html.H2("Update Task"),
-            dcc.Dropdown(
-                id="update-project-dropdown",
-                options=[{"label": p["name"], "value": p["id"]} for p in get_all_projects()],
-                placeholder="Select new project...",
-                style={"width": "300px", "marginBottom": "10px"}
-            ),
-            dcc.Input(
-                id="update-task-description",
-                type="text",
-                placeholder="New task description...",
-                style={"width": "300px", "marginRight": "10px", "marginBottom": "10px"}
-            ),
-            dcc.Textarea(
-                id="update-task-content",
-                placeholder="New task content...",
-                style={"width": "300px", "height": "100px", "marginRight": "10px"}
-            ),
-            html.Br(),
-            html.Button("Update Selected", id="update-task-btn", n_clicks=0, className="button"),
-            html.Button("Delete Selected", id="delete-task-btn", n_clicks=0, className="button delete"),
-        ], className="input-section"),
+            html.Div([
+                html.H2("Update Task"),
+                dcc.Dropdown(
+                    id="update-project-dropdown",
+                    options=[{"label": p["name"], "value": p["id"]} for p in projects],
+                    placeholder="Select new project...",
+                    style={"width": "300px", "marginBottom": "10px"}
+                ),
+                dcc.Input(
+                    id="update-task-description",
+                    type="text",
+                    placeholder="New task description...",
+                    style={"width": "300px", "marginRight": "10px", "marginBottom": "10px"}
+                ),
+                dcc.Textarea(
+                    id="update-task-content",
+                    placeholder="New task content...",
+                    style={"width": "300px", "height": "100px", "marginRight": "10px"}
+                ),
+                html.Br(),
+                html.Button("Update Selected", id="update-task-btn", n_clicks=0, className="button"),
+                html.Button("Delete Selected", id="delete-task-btn", n_clicks=0, className="button delete"),
+            ], className="input-section"),
         
-        html.Div([
-            html.H2("Tasks Table"),
-            dash_table.DataTable(
-                id="tasks-table",
-                columns=[
-                    {"name": "ID", "id": "id"},
-                    {"name": "Project", "id": "project_name"},
-                    {"name": "Description", "id": "description"},
-                    {"name": "Content", "id": "content"}
-                ],
-                data=get_all_tasks(),
-                row_selectable="single",
-                selected_rows=[],
-                style_cell={'textAlign': 'left'},
-                style_header={'backgroundColor': '#000', 'color': 'white', 'fontWeight': 'bold', 'border': '1px solid #000'},
-                style_data={'backgroundColor': '#fff', 'color': '#000', 'border': '1px solid #000'},
-                style_cell_conditional=[
-                    {'if': {'column_id': 'content'}, 'width': '40%'},
-                    {'if': {'column_id': 'description'}, 'width': '30%'},
-                ]
-            )
-        ], className="table-section"),
+            html.Div([
+                html.H2("Tasks Table"),
+                dash_table.DataTable(
+                    id="tasks-table",
+                    columns=[
+                        {"name": "ID", "id": "id"},
+                        {"name": "Project", "id": "project_name"},
+                        {"name": "Description", "id": "description"},
+                        {"name": "Content", "id": "content"}
+                    ],
+                    data=tasks,
+                    row_selectable="single",
+                    selected_rows=[],
+                    style_cell={'textAlign': 'left'},
+                    style_header={'backgroundColor': '#000', 'color': 'white', 'fontWeight': 'bold', 'border': '1px solid #000'},
+                    style_data={'backgroundColor': '#fff', 'color': '#000', 'border': '1px solid #000'},
+                    style_cell_conditional=[
+                        {'if': {'column_id': 'content'}, 'width': '40%'},
+                        {'if': {'column_id': 'description'}, 'width': '30%'},
+                    ]
+                )
+            ], className="table-section"),
         
-        html.Div(id="tasks-status", className="status-message"),
+            html.Div(id="tasks-status", className="status-message"),
         
-        html.Div([
-            html.A("← Back to Projects", href="/projects/", className="nav-link"),
-            html.A("← Back to Home", href="/", className="nav-link", style={"marginLeft": "20px"})
-        ], className="navigation")
+            html.Div([
+                html.A("← Back to Projects", href="/projects/", className="nav-link"),
+                html.A("← Back to Home", href="/", className="nav-link", style={"marginLeft": "20px"})
+            ], className="navigation")
         
-    ], className="container")
-])
+        ], className="container")
+    ])
+
+app.layout = lazy_layout(build_layout, projects=get_all_projects, tasks=get_all_tasks)
 
 @app.callback(
     [Output("tasks-table", "data"),
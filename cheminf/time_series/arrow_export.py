@@ -0,0 +1,188 @@
+"""
+Arrow / Parquet Export
+format=arrow (Arrow IPC stream) and format=parquet for the time series data and export
+endpoints. Rows are fetched from the SQLite cursor as plain tuples in BATCH_ROWS
+batches; each batch becomes one Arrow record batch (Parquet: one row group) and is
+sent as soon as it is written, so memory stays bounded.
+
+Repetitive text columns (experiment_name, series_name, parameter_name, unit) are
+dictionary-encoded. Their dictionaries grow across batches, so the IPC stream only
+sends the new entries (dictionary deltas), and pandas reads them as categoricals.
+Both formats are zstd-compressed (IPC buffer compression, which pyarrow readers
+decode transparently).
+
+pyarrow is in requirements.txt, but the import stays guarded: an install without it
+only loses these two formats, which then answer 400.
+"""
+
+import io
+
+from flask import Response
+
+from cheminf.config import DB_PREFIX
+from cheminf.db.db import get_db_connection
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # optional: only format=arrow / format=parquet need it
+    pa = None
+
+ARROW_FORMATS = ('arrow', 'parquet')
+BATCH_ROWS = 64 * 1024  # rows per record batch / Parquet row group
+
+MIMETYPES = {'arrow': 'application/vnd.apache.arrow.stream', 'parquet': 'application/vnd.apache.parquet'}
+EXTENSIONS = {'arrow': 'arrows', 'parquet': 'parquet'}
+
+DICTIONARY_COLUMNS = ('experiment_name', 'series_name', 'parameter_name', 'unit')
+# Exported columns are named after the columns of these tables, whose declared types fix the Arrow schema
+SOURCE_TABLES = (f"{DB_PREFIX}time_series", f"{DB_PREFIX}experiments", f"{DB_PREFIX}time_series_rollup")
+
+def require_pyarrow(format_type):
+    if pa is None:
+        raise ValueError(f"format={format_type} needs the optional pyarrow package (pip install pyarrow)")
+
+def cursor_batches(queries, batch_rows=BATCH_ROWS):
+    """
+    Run (query, params) pairs in turn on one pooled connection and yield
+    (column names, list of row tuples) per fetchmany() batch.
+    """
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.row_factory = None  # tuples, no per-row dicts
+    try:
+        for query, params in queries:
+            cursor.execute(query, params)
+            names = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                yield names, rows
+    finally:
+        cursor.close()
+        connection.close()
+
+def dict_batches(rows, batch_rows=BATCH_ROWS):
+    """The same (column names, row tuples) batches from an iterable of row dicts."""
+    names, batch = None, []
+    for row in rows:
+        if names is None:
+            names = list(row)
+        batch.append(tuple(row.values()))
+        if len(batch) >= batch_rows:
+            yield names, batch
+            batch = []
+    if batch:
+        yield names, batch
+
+def declared_types():
+    """Column name -> declared SQLite type of the SOURCE_TABLES columns."""
+    connection = get_db_connection()
+    try:
+        return {row[1]: row[2] for table in reversed(SOURCE_TABLES)
+                for row in connection.execute(f"PRAGMA table_info({table})").fetchall()}
+    finally:
+        connection.close()
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_int(value):
+    if isinstance(value, int):
+        return value
+    number = _to_float(value)
+    return int(number) if number is not None and number.is_integer() else None
+
+def _column_type(name, declared):
+    """
+    (Arrow type, cast applied to every value) of a column. SQLite stores whatever is
+    inserted, whatever the declared type, so values are cast instead of trusted: a value
+    that does not fit an integer or real column becomes null, everything else is text.
+    """
+    if name in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string()), str
+    # SQLite's column affinity rules (https://sqlite.org/datatype3.html)
+    declared = (declared or '').upper()
+    if 'INT' in declared:
+        return pa.int64(), _to_int
+    if any(word in declared for word in ('CHAR', 'CLOB', 'TEXT')):
+        return pa.string(), str
+    if any(word in declared for word in ('REAL', 'FLOA', 'DOUB')):
+        return pa.float64(), _to_float
+    return pa.string(), str  # NUMERIC affinity (dates, timestamps), BLOB or no declared type
+
+class _Dictionary:
+    """Value -> index map kept across batches, so each batch only extends the dictionary."""
+
+    def __init__(self):
+        self.index = {}
+
+    def encode(self, values):
+        index = self.index
+        indices = pa.array([None if value is None else index.setdefault(str(value), len(index)) for value in values],
+                           pa.int32())
+        return pa.DictionaryArray.from_arrays(indices, pa.array(list(index), pa.string()))
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last drain()."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position  # Parquet needs absolute offsets, not the drained buffer's
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def stream_arrow(batches, format_type, column_types=None):
+    """
+    Yield an Arrow IPC stream or a Parquet file, one record batch / row group at a time.
+    The schema comes from the declared column types, overridden by column_types
+    ({name: SQLite type}), never from the values of the first batch.
+    """
+    sink = _Sink()
+    writer, schema, casts, dictionaries = None, None, None, {}
+    try:
+        for names, rows in batches:
+            columns = list(zip(*rows))
+            if writer is None:
+                declared = {**declared_types(), **(column_types or {})}
+                types = [_column_type(name, declared.get(name)) for name in names]
+                schema = pa.schema([(name, arrow_type) for name, (arrow_type, _) in zip(names, types)])
+                casts = [cast for _, cast in types]
+                dictionaries = {name: _Dictionary() for name in names if name in DICTIONARY_COLUMNS}
+                if format_type == 'parquet':
+                    writer = pa.parquet.ParquetWriter(pa.PythonFile(sink, mode='w'), schema, compression='zstd')
+                else:
+                    options = pa.ipc.IpcWriteOptions(compression='zstd', emit_dictionary_deltas=True)
+                    writer = pa.ipc.new_stream(pa.PythonFile(sink, mode='w'), schema, options=options)
+            arrays = [dictionaries[field.name].encode(values) if field.name in dictionaries
+                      else pa.array([None if value is None else cast(value) for value in values], field.type)
+                      for field, cast, values in zip(schema, casts, columns)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.drain()
+
+def arrow_response(batches, format_type, filename, column_types=None):
+    return Response(stream_arrow(batches, format_type, column_types), mimetype=MIMETYPES[format_type],
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
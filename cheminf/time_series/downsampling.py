@@ -0,0 +1,139 @@
+"""
+Time Series Downsampling
+Reduces a series to at most N points that still look like the original when plotted.
+
+Methods:
+- lttb:   Largest-Triangle-Three-Buckets, keeps the visually most significant point per bucket
+- minmax: keeps the minimum and the maximum of every bucket, so peaks are never lost
+- mean:   replaces every bucket by its mean x/y (smooths noise)
+"""
+
+import numpy as np
+
+METHODS = ('lttb', 'minmax', 'mean')
+MIN_POINTS = {'lttb': 3, 'minmax': 2, 'mean': 1}  # smallest max_points each method can reduce to
+
+def _check_max_points(max_points, method):
+    if max_points < MIN_POINTS[method]:
+        raise ValueError(f"{method} downsampling needs max_points of at least {MIN_POINTS[method]}, got {max_points}")
+
+def _bucket_edges(start, stop, buckets):
+    """Integer edges splitting [start, stop) into `buckets` non-empty, near-equal ranges."""
+    return np.linspace(start, stop, buckets + 1).astype(np.int64)
+
+def lttb_indices(x, y, max_points):
+    """Return the indices selected by Largest-Triangle-Three-Buckets (max_points >= 3)."""
+    _check_max_points(max_points, 'lttb')
+    n = len(x)
+    if max_points >= n:
+        return np.arange(n)
+
+    # First and last point are always kept; the rest are split into max_points - 2 buckets
+    edges = _bucket_edges(1, n - 1, max_points - 2)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    avg_x = np.add.reduceat(x[:n - 1], starts) / counts
+    avg_y = np.add.reduceat(y[:n - 1], starts) / counts
+    # The "next bucket" of the last bucket is the final point
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        bx = x[starts[i]:ends[i]]
+        by = y[starts[i]:ends[i]]
+        # Twice the triangle area between the previous pick, each candidate and the next bucket average
+        area = np.abs((x[a] - next_x[i]) * (by - y[a]) - (x[a] - bx) * (next_y[i] - y[a]))
+        a = starts[i] + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def minmax_indices(x, y, max_points):
+    """Return the indices of the minimum and maximum value in each of max_points // 2 buckets."""
+    _check_max_points(max_points, 'minmax')
+    n = len(y)
+    buckets = max_points // 2
+    if max_points >= n:
+        return np.arange(n)
+
+    edges = _bucket_edges(0, n, buckets)
+    starts = edges[:-1]
+    bucket_of = np.repeat(np.arange(buckets), np.diff(edges))
+
+    def first_match(bucket_values):
+        positions = np.flatnonzero(y == bucket_values[bucket_of])
+        _, first = np.unique(bucket_of[positions], return_index=True)
+        return positions[first]
+
+    min_idx = first_match(np.minimum.reduceat(y, starts))
+    max_idx = first_match(np.maximum.reduceat(y, starts))
+    return np.unique(np.concatenate([min_idx, max_idx]))  # sorted, min == max collapses to one point
+
+def mean_buckets(x, y, max_points):
+    """Return (x_mean, y_mean, first_index) for max_points equal-count buckets."""
+    _check_max_points(max_points, 'mean')
+    n = len(x)
+    if max_points >= n:
+        return x, y, np.arange(n)
+
+    edges = _bucket_edges(0, n, max_points)
+    starts = edges[:-1]
+    counts = np.diff(edges)
+    return np.add.reduceat(x, starts) / counts, np.add.reduceat(y, starts) / counts, starts
+
+def downsample(x, y, max_points, method='lttb'):
+    """
+    Downsample one series (x sorted ascending) to at most max_points points.
+
+    Returns (x_out, y_out, source_index) where source_index[i] is the input row that
+    output point i was taken from (for 'mean', the first row of its bucket).
+    Points with a missing/non-finite value are dropped before downsampling.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Downsampling method must be one of: {', '.join(METHODS)}")
+    _check_max_points(max_points, method)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(valid) < len(x):
+        x, y = x[valid], y[valid]
+    else:
+        valid = None
+
+    if method == 'mean':
+        x_out, y_out, idx = mean_buckets(x, y, max_points)
+    else:
+        idx = lttb_indices(x, y, max_points) if method == 'lttb' else minmax_indices(x, y, max_points)
+        x_out, y_out = x[idx], y[idx]
+
+    if valid is not None:
+        idx = valid[idx]
+    return x_out, y_out, idx
+
+def downsample_rows(rows, max_points, method='lttb', x_key='time_step', y_key='value'):
+    """
+    Downsample a list of row dicts for a single parameter, returning a new list of rows.
+    Rows of the 'mean' method carry the bucket mean in x_key/y_key.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Downsampling method must be one of: {', '.join(METHODS)}")
+    _check_max_points(max_points, method)
+    if len(rows) <= max_points:
+        return rows
+    x = np.fromiter((row[x_key] for row in rows), dtype=np.float64, count=len(rows))
+    y = np.fromiter((np.nan if row[y_key] is None else row[y_key] for row in rows), dtype=np.float64, count=len(rows))
+    x_out, y_out, idx = downsample(x, y, max_points, method)
+
+    if method != 'mean':
+        return [rows[i] for i in idx]
+    result = []
+    for i, xv, yv in zip(idx.tolist(), x_out.tolist(), y_out.tolist()):
+        row = dict(rows[i])
+        row[x_key] = xv
+        row[y_key] = yv
+        result.append(row)
+    return result
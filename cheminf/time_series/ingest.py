@@ -0,0 +1,255 @@
+"""
+Time Series Ingest Pipeline
+POSTed data points go into a bounded in-memory queue; a single writer thread drains
+it and coalesces whatever is waiting (up to INGEST_BATCH_POINTS) into one transaction:
+executemany into time_series, then the summary and rollup updates once per batch.
+Many instruments posting small batches therefore cost one commit per batch, not
+one per request, and only one connection ever writes time series data.
+
+- The queue is bounded in points. submit() raises IngestQueueFull when a request
+  does not fit, and the API answers 429 with Retry-After.
+- submit() returns an IngestTicket; waiting on it gives the number of points
+  committed (or re-raises the write error).
+- If a coalesced transaction fails, its requests are retried one by one, so a bad
+  request does not fail the others.
+- metrics() reports queue depth, throughput and ingest lag (enqueue to commit).
+"""
+
+import atexit
+import json
+import threading
+import time
+from collections import deque
+
+from cheminf.config import DB_PREFIX, INGEST_BATCH_POINTS, INGEST_QUEUE_POINTS
+from cheminf.db.db import transaction
+from cheminf.time_series.rollups import update_rollups
+from cheminf.time_series.summary import update_summary
+
+try:
+    import orjson
+except ImportError:  # standard library parser fallback
+    orjson = None
+
+INSERT_POINTS = f"""
+INSERT INTO {DB_PREFIX}time_series
+(experiment_id, series_name, parameter_name, time_step, timestamp, value, unit, notes)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+REQUIRED_FIELDS = ('parameter_name', 'value', 'timestamp')
+LAG_WINDOW = 1000  # recent requests kept for the lag percentiles
+
+class IngestQueueFull(Exception):
+    """The ingest queue has no room for a request; the client should retry later."""
+
+def loads(body):
+    """Parse a JSON request body (orjson when installed)."""
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+def point_row(experiment_id, point, time_step):
+    """Insert tuple of one data point dict; time_step is used when the point has none."""
+    return (
+        experiment_id,
+        point.get('series_name', f"{point['parameter_name']}-Series"),
+        point['parameter_name'],
+        point.get('time_step', time_step),
+        point['timestamp'],
+        float(point['value']),
+        point.get('unit', ''),
+        point.get('notes', '')
+    )
+
+def check_point(point):
+    """Raise ValueError saying why point_row() rejects a data point."""
+    if not isinstance(point, dict):
+        raise ValueError("must be an object")
+    for field in REQUIRED_FIELDS:
+        if field not in point:
+            raise ValueError(f"missing required field: {field}")
+    try:
+        float(point['value'])
+    except (TypeError, ValueError):
+        raise ValueError(f"has a non-numeric value: {point['value']!r}")
+
+def prepare_points(experiment_id, data_points):
+    """
+    Insert tuples for a list of data point dicts (see post_timeseries_data).
+    Raises ValueError naming the first invalid point.
+    """
+    try:
+        return [point_row(experiment_id, point, i) for i, point in enumerate(data_points, 1)]
+    except (KeyError, TypeError, ValueError, AttributeError):
+        pass
+    # Slow path, only to name the offending point
+    for i, point in enumerate(data_points, 1):
+        try:
+            check_point(point)
+        except ValueError as e:
+            raise ValueError(f"Data point {i} {e}")
+    raise ValueError("Invalid data points")
+
+class IngestTicket:
+    """Completion handle of one submitted request."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.enqueued_at = time.monotonic()
+        self._done = threading.Event()
+        self._error = None
+
+    def _finish(self, error=None):
+        self._error = error
+        self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until committed; returns the point count. Raises TimeoutError or the write error."""
+        if not self._done.wait(timeout):
+            raise TimeoutError("Timed out waiting for the ingest writer")
+        if self._error is not None:
+            raise self._error
+        return len(self.rows)
+
+class IngestWriter(threading.Thread):
+    """Daemon thread owning the ingest queue and all time series inserts."""
+
+    def __init__(self, max_points=INGEST_QUEUE_POINTS, batch_points=INGEST_BATCH_POINTS):
+        super().__init__(name="timeseries-ingest", daemon=True)
+        self.max_points = max_points
+        self.batch_points = batch_points
+        self._queue = deque()
+        self._queued_points = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._started_at = time.monotonic()
+        self._lags = deque(maxlen=LAG_WINDOW)
+        self._stats = {
+            "accepted_requests": 0, "rejected_requests": 0, "failed_requests": 0,
+            "written_points": 0, "written_batches": 0,
+            "last_batch_points": 0, "last_batch_requests": 0, "last_commit_ms": None,
+        }
+
+    def submit(self, rows):
+        """Queue insert tuples (from prepare_points) and return an IngestTicket."""
+        ticket = IngestTicket(rows)
+        with self._cond:
+            if self._stopping:
+                raise IngestQueueFull("Ingest writer is shutting down")
+            # An empty queue takes any request, so one larger than max_points is never stuck
+            if self._queued_points + len(rows) > self.max_points and self._queue:
+                self._stats["rejected_requests"] += 1
+                raise IngestQueueFull(f"Ingest queue is full ({self._queued_points} points waiting)")
+            self._queue.append(ticket)
+            self._queued_points += len(rows)
+            self._stats["accepted_requests"] += 1
+            self._cond.notify()
+        return ticket
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if not self._queue:
+                    return  # stopping and drained
+                batch, points = [], 0
+                # Whole requests only; the first one always fits even if it is larger than batch_points
+                while self._queue and (not batch or points + len(self._queue[0].rows) <= self.batch_points):
+                    ticket = self._queue.popleft()
+                    batch.append(ticket)
+                    points += len(ticket.rows)
+                self._queued_points -= points
+            self._write(batch, points)
+
+    def _write(self, batch, points):
+        started = time.monotonic()
+        try:
+            self._commit([row for ticket in batch for row in ticket.rows])
+            finished = [(ticket, None) for ticket in batch]
+        except Exception as e:
+            if len(batch) == 1:
+                finished = [(batch[0], e)]
+            else:
+                # Find the bad request(s) without failing the rest of the batch
+                finished = []
+                for ticket in batch:
+                    try:
+                        self._commit(ticket.rows)
+                        finished.append((ticket, None))
+                    except Exception as error:
+                        finished.append((ticket, error))
+        committed = time.monotonic()
+
+        with self._cond:
+            written = sum(len(ticket.rows) for ticket, error in finished if error is None)
+            self._stats["written_points"] += written
+            self._stats["written_batches"] += 1
+            self._stats["failed_requests"] += sum(1 for _, error in finished if error is not None)
+            self._stats["last_batch_points"] = points
+            self._stats["last_batch_requests"] = len(batch)
+            self._stats["last_commit_ms"] = round((committed - started) * 1000, 2)
+            self._lags.extend(committed - ticket.enqueued_at for ticket in batch)
+        for ticket, error in finished:
+            ticket._finish(error)
+
+    @staticmethod
+    def _commit(rows):
+        with transaction() as connection:
+            connection.executemany(INSERT_POINTS, rows)
+            update_summary(connection, len(rows))
+            update_rollups(connection, len(rows))
+
+    def metrics(self):
+        """Queue depth, throughput and lag (seconds from enqueue to commit) of recent requests."""
+        with self._cond:
+            now = time.monotonic()
+            lags = sorted(self._lags)
+            oldest = self._queue[0].enqueued_at if self._queue else None
+            uptime = now - self._started_at
+            return dict(
+                self._stats,
+                queued_points=self._queued_points,
+                queued_requests=len(self._queue),
+                queue_capacity_points=self.max_points,
+                queue_fill=round(self._queued_points / self.max_points, 4),
+                batch_points=self.batch_points,
+                oldest_queued_age_s=round(now - oldest, 4) if oldest is not None else 0.0,
+                lag_p50_s=round(lags[len(lags) // 2], 4) if lags else None,
+                lag_p99_s=round(lags[min(len(lags) - 1, int(len(lags) * 0.99))], 4) if lags else None,
+                lag_max_s=round(lags[-1], 4) if lags else None,
+                points_per_second=round(self._stats["written_points"] / uptime, 1) if uptime else 0.0,
+                uptime_s=round(uptime, 1),
+            )
+
+    def stop(self, timeout=None):
+        """Write everything still queued, then end the thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self.join(timeout)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer():
+    """The process-wide ingest writer, started on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = IngestWriter()
+                _writer.start()
+    return _writer
+
+def stop_writer(timeout=30):
+    """Flush and stop the ingest writer (called automatically at interpreter exit)."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.stop(timeout)
+            _writer = None
+
+atexit.register(stop_writer)
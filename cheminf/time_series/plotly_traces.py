@@ -0,0 +1,94 @@
+"""
+Columnar Plotly Traces
+The plotly_json format reads (time_step, value) of each parameter straight from the
+cursor into NumPy arrays, with no row dicts and no per-point list appends, and
+encodes the response with orjson, which serializes NumPy arrays natively.
+
+With encoding=base64 every x/y array is sent as a Plotly typed array,
+{"dtype": "f8", "bdata": "<base64>"}, which Plotly.js (>= 2.28) and plotly.py
+decode directly: 8 bytes per value instead of its decimal text.
+
+orjson is optional; without it the standard json module is used.
+"""
+
+import base64
+import json
+import math
+from datetime import datetime
+
+import numpy as np
+from flask import Response
+
+from cheminf.db.db import get_db_connection
+
+try:
+    import orjson
+except ImportError:  # slower standard library fallback
+    orjson = None
+
+ENCODINGS = ('json', 'base64')
+
+# NumPy dtype -> Plotly typed array dtype (little-endian)
+TYPED_ARRAY_DTYPES = {np.dtype(np.float64): 'f8', np.dtype(np.int32): 'i4'}
+
+def fetch_xy(query, params):
+    """(x, y) float64 arrays of a query that selects two numeric columns; NULL becomes NaN."""
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.row_factory = None  # plain tuples: NumPy converts the whole result in C
+    try:
+        rows = cursor.execute(query, params).fetchall()
+    finally:
+        cursor.close()
+        connection.close()
+    x, y = np.ascontiguousarray(np.array(rows, dtype=np.float64).reshape(-1, 2).T)
+    return x, y
+
+def _compact(values):
+    # Whole-number x (time steps) as int32, so it encodes as 1, 2, 3 rather than 1.0, 2.0, 3.0
+    if len(values) and np.isfinite(values).all() and (values == np.rint(values)).all() \
+            and np.abs(values).max() < 2 ** 31:
+        return values.astype(np.int32)
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+def typed_array(values):
+    """Plotly typed array spec ({"dtype", "bdata"}) of an int32 or float64 array."""
+    dtype = TYPED_ARRAY_DTYPES[values.dtype]
+    data = values.astype(values.dtype.newbyteorder('<'), copy=False).tobytes()
+    return {"dtype": dtype, "bdata": base64.b64encode(data).decode('ascii')}
+
+def plotly_trace(parameter_name, unit, x, y, encoding='json'):
+    """Scatter trace of one parameter, with x/y as arrays (json) or typed arrays (base64)."""
+    x, y = _compact(x), _compact(y)
+    if encoding == 'base64':
+        x, y = typed_array(x), typed_array(y)
+    return {
+        'x': x,
+        'y': y,
+        'name': f"{parameter_name} ({unit})",
+        'type': 'scatter',
+        'mode': 'lines+markers',
+        'unit': unit
+    }
+
+def _to_list(value):
+    if isinstance(value, np.ndarray):
+        return [v if math.isfinite(v) else None for v in value.tolist()]
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(obj):
+    """JSON bytes of obj, which may contain NumPy arrays; NaN/inf are written as null."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_to_list).encode('utf-8')
+
+def plotly_response(traces, layout_suggestions, message):
+    """api_response()-shaped success body with plotly_traces, encoded by dumps()."""
+    body = {
+        "success": True,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "data": {"plotly_traces": traces, "layout_suggestions": layout_suggestions},
+        "message": message,
+        "error": None
+    }
+    return Response(dumps(body), mimetype='application/json')
@@ -1,11 +1,21 @@
-from flask import request, jsonify, send_file
-from cheminf.db.db import execute_query
-from cheminf.config import DB_PREFIX
+from flask import request, jsonify
+from cheminf.db.db import execute_query, iter_query, register_aggregate
+from cheminf.db.pagination import fetch_page, set_next_link
+from cheminf.config import DB_PREFIX, INGEST_MAX_REQUEST_POINTS, INGEST_WAIT_TIMEOUT
 from cheminf.app_server import server
+from cheminf.time_series.downsampling import METHODS as DOWNSAMPLING_METHODS, downsample, downsample_rows
+from cheminf.time_series.arrow_export import (ARROW_FORMATS, EXTENSIONS, arrow_response, cursor_batches,
+                                               dict_batches, require_pyarrow)
+from cheminf.time_series.ingest import IngestQueueFull, get_writer, loads, prepare_points
+from cheminf.time_series.stream_ingest import STREAM_FORMATS, StreamIngest, stream_format
+from cheminf.time_series.plotly_traces import ENCODINGS, fetch_xy, plotly_response, plotly_trace
+from cheminf.time_series.streaming_stats import StatsAggregate
+from cheminf.time_series.summary import SUMMARY_TABLE, SUMMARY_COLUMNS
+from cheminf.time_series.rollups import AGGREGATIONS, choose_resolution, rollup_query
+from cheminf.time_series.serializers import csv_response, json_response, peek, xml_response
 from datetime import datetime
+from itertools import chain, groupby
 import json
-import csv
-import io
 from functools import wraps
 
 # API Response wrapper for consistent formatting
@@ -32,6 +42,21 @@ def handle_api_errors(f):
             return api_response(success=False, error=f"Internal server error: {str(e)}", status_code=500)
     return decorated_function
 
+# ts_stats(value): one-pass variance and quantiles, replacing GROUP_CONCAT of every value
+register_aggregate("ts_stats", 1, StatsAggregate)
+
+DEFAULT_MAX_POINTS = 1000  # Points per parameter for lttb/minmax/mean sampling
+
+def export_filename(name, extension):
+    return f'{name}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+
+# Experiments with time series data, paged by fetch_page() before anything is aggregated
+EXPERIMENT_PAGE_QUERY = f"""
+SELECT e.experiment_id, e.experiment_name
+FROM {DB_PREFIX}experiments e
+WHERE EXISTS (SELECT 1 FROM {SUMMARY_TABLE} s WHERE s.experiment_id = e.experiment_id)
+"""
+
 # Time Series API endpoints
 @server.route("/api/v1/timeseries/experiments", methods=["GET"])
 @handle_api_errors
@@ -43,89 +68,78 @@ def get_timeseries_experiments():
     - format: json (default), csv, xml
     - include_metadata: true/false (default: true)
     - limit: maximum number of results (default: 100)
-    - offset: pagination offset (default: 0)
+    - cursor: continuation token from the previous page's metadata.next_cursor
+    - offset: legacy pagination offset (default: 0); prefer cursor
     """
     # Parse query parameters
     format_type = request.args.get('format', 'json').lower()
     include_metadata = request.args.get('include_metadata', 'true').lower() == 'true'
     limit = int(request.args.get('limit', 100))
+    cursor = request.args.get('cursor') or None
     offset = int(request.args.get('offset', 0))
     
     # Validate parameters
-    if limit > 1000:
-        raise ValueError("Limit cannot exceed 1000")
+    if limit < 1 or limit > 1000:
+        raise ValueError("Limit must be between 1 and 1000")
     if offset < 0:
-        raise ValueError("Offset cannot be negative")
+        raise ValueError("Offset must be non-negative")
     if format_type not in ['json', 'csv', 'xml']:
         raise ValueError("Format must be json, csv, or xml")
     
-    # Build query with metadata
+    # Keyset page of the experiments that have time series, on (name, id): a seek on
+    # idx_experiments_name with one summary lookup per row, so page 1000 costs the
+    # same as page 1. Only the experiments on the page are aggregated below.
+    page, next_cursor = fetch_page(EXPERIMENT_PAGE_QUERY, ["experiment_name", "experiment_id"], limit, cursor,
+                                   offset=offset)
+    ids = [row['experiment_id'] for row in page]
+    
+    # Build query with metadata (from the per-series summary table, not the raw points)
+    placeholders = ','.join('?' for _ in ids)
     if include_metadata:
         query = f"""
-        SELECT DISTINCT e.experiment_id, e.experiment_name, e.description,
+        SELECT e.experiment_id, e.experiment_name, e.description,
                e.start_date, e.end_date,
-               COUNT(ts.series_id) as series_count,
-               COUNT(DISTINCT ts.parameter_name) as parameter_count,
-               MIN(ts.timestamp) as data_start_time,
-               MAX(ts.timestamp) as data_end_time
+               SUM(s.data_points) as series_count,
+               COUNT(DISTINCT s.parameter_name) as parameter_count,
+               MIN(s.start_time) as data_start_time,
+               MAX(s.end_time) as data_end_time
         FROM {DB_PREFIX}experiments e
-        JOIN {DB_PREFIX}time_series ts ON e.experiment_id = ts.experiment_id
+        JOIN {SUMMARY_TABLE} s ON e.experiment_id = s.experiment_id
+        WHERE e.experiment_id IN ({placeholders})
         GROUP BY e.experiment_id, e.experiment_name, e.description, e.start_date, e.end_date
-        ORDER BY e.experiment_name
-        LIMIT ? OFFSET ?
         """
     else:
         query = f"""
-        SELECT DISTINCT e.experiment_id, e.experiment_name, e.description,
-               COUNT(ts.series_id) as series_count
+        SELECT e.experiment_id, e.experiment_name, e.description,
+               SUM(s.data_points) as series_count
         FROM {DB_PREFIX}experiments e
-        JOIN {DB_PREFIX}time_series ts ON e.experiment_id = ts.experiment_id
+        JOIN {SUMMARY_TABLE} s ON e.experiment_id = s.experiment_id
+        WHERE e.experiment_id IN ({placeholders})
         GROUP BY e.experiment_id, e.experiment_name, e.description
-        ORDER BY e.experiment_name
-        LIMIT ? OFFSET ?
         """
     
-    rows = execute_query(query, (limit, offset))
+    aggregated = {row['experiment_id']: row for row in execute_query(query, ids)} if ids else {}
+    rows = [aggregated[experiment_id] for experiment_id in ids if experiment_id in aggregated]
     
     # Handle different output formats
     if format_type == 'csv':
-        output = io.StringIO()
-        if rows:
-            writer = csv.DictWriter(output, fieldnames=rows[0].keys())
-            writer.writeheader()
-            writer.writerows(rows)
-        
-        csv_data = io.BytesIO(output.getvalue().encode('utf-8'))
-        return send_file(csv_data, 
-                        mimetype='text/csv',
-                        as_attachment=True,
-                        download_name=f'experiments_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
+        return set_next_link(csv_response(rows, export_filename('experiments', 'csv')), next_cursor)
     
     elif format_type == 'xml':
-        xml_data = "<experiments>\n"
-        for row in rows:
-            xml_data += "  <experiment>\n"
-            for key, value in row.items():
-                xml_data += f"    <{key}>{value}</{key}>\n"
-            xml_data += "  </experiment>\n"
-        xml_data += "</experiments>"
-        
-        return xml_data, 200, {'Content-Type': 'application/xml'}
+        return set_next_link(xml_response('experiments', 'experiment', rows), next_cursor)
     
     # Default JSON response
-    return api_response(
-        success=True,
-        data={
-            "experiments": rows,
-            "metadata": {
-                "total_returned": len(rows),
-                "limit": limit,
-                "offset": offset,
-                "include_metadata": include_metadata
-            }
+    return set_next_link(json_response(
+        "experiments", rows,
+        metadata={
+            "total_returned": len(rows),
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+            "include_metadata": include_metadata
         },
         message=f"Retrieved {len(rows)} experiments with time series data"
-    )
+    ), next_cursor)
 
 @server.route("/api/v1/timeseries/experiments/<int:experiment_id>/series", methods=["GET"])
 @handle_api_errors
@@ -148,50 +162,35 @@ def get_experiment_series(experiment_id):
     if format_type not in ['json', 'csv', 'xml']:
         raise ValueError("Format must be json, csv, or xml")
     
-    # Build query with optional parameter filtering
+    # Build query with optional parameter filtering (one summary row per series)
     if include_statistics:
         if filter_parameters:
             placeholders = ','.join(['?' for _ in filter_parameters])
             query = f"""
-            SELECT DISTINCT series_name, parameter_name, unit,
-                   COUNT(*) as data_points,
-                   MIN(timestamp) as start_time,
-                   MAX(timestamp) as end_time,
-                   MIN(value) as min_value,
-                   MAX(value) as max_value,
-                   AVG(value) as avg_value,
-                   ROUND((MAX(value) - MIN(value)) / COUNT(*), 4) as value_range_per_point
-            FROM {DB_PREFIX}time_series
+            SELECT {SUMMARY_COLUMNS},
+                   ROUND((max_value - min_value) / data_points, 4) as value_range_per_point
+            FROM {SUMMARY_TABLE}
             WHERE experiment_id = ? AND parameter_name IN ({placeholders})
-            GROUP BY series_name, parameter_name, unit
             ORDER BY parameter_name
             """
             params = [experiment_id] + filter_parameters
         else:
             query = f"""
-            SELECT DISTINCT series_name, parameter_name, unit,
-                   COUNT(*) as data_points,
-                   MIN(timestamp) as start_time,
-                   MAX(timestamp) as end_time,
-                   MIN(value) as min_value,
-                   MAX(value) as max_value,
-                   AVG(value) as avg_value,
-                   ROUND((MAX(value) - MIN(value)) / COUNT(*), 4) as value_range_per_point
-            FROM {DB_PREFIX}time_series
+            SELECT {SUMMARY_COLUMNS},
+                   ROUND((max_value - min_value) / data_points, 4) as value_range_per_point
+            FROM {SUMMARY_TABLE}
             WHERE experiment_id = ?
-            GROUP BY series_name, parameter_name, unit
             ORDER BY parameter_name
             """
             params = [experiment_id]
     else:
         query = f"""
-        SELECT DISTINCT series_name, parameter_name, unit,
-               COUNT(*) as data_points,
-               MIN(timestamp) as start_time,
-               MAX(timestamp) as end_time
-        FROM {DB_PREFIX}time_series
+        SELECT series_name, parameter_name, unit,
+               data_points,
+               start_time,
+               end_time
+        FROM {SUMMARY_TABLE}
         WHERE experiment_id = ?
-        GROUP BY series_name, parameter_name, unit
         ORDER BY parameter_name
         """
         params = [experiment_id]
@@ -207,39 +206,19 @@ def get_experiment_series(experiment_id):
     
     # Handle different output formats
     if format_type == 'csv':
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=rows[0].keys())
-        writer.writeheader()
-        writer.writerows(rows)
-        
-        csv_data = io.BytesIO(output.getvalue().encode('utf-8'))
-        return send_file(csv_data,
-                        mimetype='text/csv',
-                        as_attachment=True,
-                        download_name=f'experiment_{experiment_id}_series_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
+        return csv_response(rows, export_filename(f'experiment_{experiment_id}_series', 'csv'))
     
     elif format_type == 'xml':
-        xml_data = f"<experiment_series experiment_id=\"{experiment_id}\">\n"
-        for row in rows:
-            xml_data += "  <series>\n"
-            for key, value in row.items():
-                xml_data += f"    <{key}>{value}</{key}>\n"
-            xml_data += "  </series>\n"
-        xml_data += "</experiment_series>"
-        
-        return xml_data, 200, {'Content-Type': 'application/xml'}
+        return xml_response('experiment_series', 'series', rows, {'experiment_id': experiment_id})
     
     # Default JSON response
-    return api_response(
-        success=True,
-        data={
-            "experiment_id": experiment_id,
-            "series": rows,
-            "metadata": {
-                "series_count": len(rows),
-                "include_statistics": include_statistics,
-                "filtered_parameters": filter_parameters if filter_parameters else None
-            }
+    return json_response(
+        "series", rows,
+        data={"experiment_id": experiment_id},
+        metadata={
+            "series_count": len(rows),
+            "include_statistics": include_statistics,
+            "filtered_parameters": filter_parameters if filter_parameters else None
         },
         message=f"Retrieved {len(rows)} time series for experiment {experiment_id}"
     )
@@ -255,13 +234,15 @@ def get_timeseries_data(experiment_id):
     
     Query Parameters:
     - parameters: comma-separated list of parameter names to include
-    - format: json (default), csv, xml, plotly_json
+    - format: json (default), csv, xml, plotly_json, arrow (Arrow IPC stream), parquet
     - time_range_start: ISO timestamp for start time filter
     - time_range_end: ISO timestamp for end time filter
-    - sampling: all (default), every_nth, time_interval
-    - sampling_value: used with sampling parameter
-    - aggregation: none (default), hourly, daily, custom
+    - sampling: all (default), every_nth, time_interval, lttb, minmax, mean
+    - sampling_value: used with sampling parameter (for lttb/minmax/mean: max points per parameter, default 1000)
+    - aggregation: none (default), minute, hourly, daily, custom
+      (custom picks the finest rollup resolution that fits `limit` points per parameter)
     - limit: maximum data points per parameter (default: 10000)
+    - encoding: json (default) or base64 - plotly_json only; base64 sends x/y as Plotly typed arrays
     """
     # Parse parameters
     parameters_str = request.args.get('parameters', '')
@@ -271,151 +252,237 @@ def get_timeseries_data(experiment_id):
     time_start = request.args.get('time_range_start')
     time_end = request.args.get('time_range_end')
     sampling = request.args.get('sampling', 'all').lower()
-    sampling_value = request.args.get('sampling_value', '1')
+    sampling_value = request.args.get('sampling_value')
     aggregation = request.args.get('aggregation', 'none').lower()
     limit = int(request.args.get('limit', 10000))
+    encoding = request.args.get('encoding', 'json').lower()
     
     # Validation
-    if format_type not in ['json', 'csv', 'xml', 'plotly_json']:
-        raise ValueError("Format must be json, csv, xml, or plotly_json")
+    if format_type not in ['json', 'csv', 'xml', 'plotly_json'] + list(ARROW_FORMATS):
+        raise ValueError("Format must be json, csv, xml, plotly_json, arrow, or parquet")
+    if format_type in ARROW_FORMATS:
+        require_pyarrow(format_type)
     if limit > 50000:
         raise ValueError("Limit cannot exceed 50000 data points per parameter")
-    if sampling not in ['all', 'every_nth', 'time_interval']:
-        raise ValueError("Sampling must be all, every_nth, or time_interval")
-    
-    # Build base query
-    base_query = f"""
-    SELECT series_name, parameter_name, time_step, timestamp, value, unit, notes
-    FROM {DB_PREFIX}time_series
-    WHERE experiment_id = ?
-    """
-    
-    params = [experiment_id]
-    
-    # Add parameter filtering
-    if parameters:
-        placeholders = ','.join(['?' for _ in parameters])
-        base_query += f" AND parameter_name IN ({placeholders})"
-        params.extend(parameters)
-    
-    # Add time range filtering
-    if time_start:
-        base_query += " AND timestamp >= ?"
-        params.append(time_start)
-    if time_end:
-        base_query += " AND timestamp <= ?"
-        params.append(time_end)
-    
-    # Add sampling
-    if sampling == 'every_nth':
-        nth = int(sampling_value)
-        base_query += f" AND (time_step - 1) % {nth} = 0"
-    elif sampling == 'time_interval':
-        # For time interval sampling, we would need more complex logic
-        pass
-    
-    # Add ordering and limit
-    base_query += " ORDER BY parameter_name, time_step"
-    
-    # Execute query
-    rows = execute_query(base_query, params)
-    
-    if not rows:
+    if sampling not in ['all', 'every_nth', 'time_interval'] + list(DOWNSAMPLING_METHODS):
+        raise ValueError("Sampling must be all, every_nth, time_interval, lttb, minmax, or mean")
+    if sampling in DOWNSAMPLING_METHODS:
+        max_points = int(sampling_value or DEFAULT_MAX_POINTS)
+        if max_points < 3:
+            raise ValueError("sampling_value must be at least 3 points for downsampling")
+    if aggregation not in ['none', 'custom'] + list(AGGREGATIONS):
+        raise ValueError("Aggregation must be none, minute, hourly, daily, or custom")
+    if encoding not in ENCODINGS:
+        raise ValueError("Encoding must be json or base64")
+    
+    # Resolve the rollup resolution to read from (None = raw points)
+    if aggregation == 'custom':
+        resolution = choose_resolution(experiment_id, limit, parameters, time_start, time_end)
+    else:
+        resolution = AGGREGATIONS.get(aggregation)
+    
+    # Downsampling needs every raw point; otherwise each parameter is capped at `limit` in SQL
+    cap_in_sql = sampling not in DOWNSAMPLING_METHODS
+    
+    # plotly_json reads (time_step, value) columns with one query per parameter: (name, query, params)
+    series_queries = []
+    
+    if resolution and format_type == 'plotly_json':
+        for parameter_name in sorted(set(parameters)) if parameters else get_parameter_names(experiment_id):
+            query, params = rollup_query(experiment_id, resolution, [parameter_name], time_start, time_end)
+            query = f"SELECT time_step, value FROM ({query})"
+            if cap_in_sql:
+                query += " WHERE time_step <= ?"
+                params.append(limit)
+            series_queries.append((parameter_name, query + " ORDER BY time_step", params))
+    elif resolution:
+        # One row per bucket with mean value plus min/max/count
+        base_query, params = rollup_query(experiment_id, resolution, parameters, time_start, time_end)
+        if cap_in_sql:
+            # time_step is ROW_NUMBER() OVER (PARTITION BY parameter_name ORDER BY bucket_start)
+            base_query = f"SELECT * FROM ({base_query}) WHERE time_step <= ? ORDER BY parameter_name, time_step"
+            params.append(limit)
+        row_queries = [(base_query, params)]
+    else:
+        # Filters shared by the per-parameter queries
+        filters = ""
+        filter_params = []
+        
+        # Add time range filtering
+        if time_start:
+            filters += " AND timestamp >= ?"
+            filter_params.append(time_start)
+        if time_end:
+            filters += " AND timestamp <= ?"
+            filter_params.append(time_end)
+        
+        # Add sampling
+        if sampling == 'every_nth':
+            nth = int(sampling_value or 1)
+            filters += f" AND (time_step - 1) % {nth} = 0"
+        elif sampling == 'time_interval':
+            # For time interval sampling, we would need more complex logic
+            pass
+        
+        # One bounded query per parameter: the (experiment_id, parameter_name, time_step)
+        # index walk stops after `limit` rows, so trimmed points are never read
+        parameter_names = sorted(set(parameters)) if parameters else get_parameter_names(experiment_id)
+        
+        columns = PLOTLY_COLUMNS if format_type == 'plotly_json' else RAW_COLUMNS
+        base_query = raw_data_query(columns, filters, cap_in_sql)
+        
+        series_queries = [
+            (parameter_name, base_query,
+             [experiment_id, parameter_name] + filter_params + ([limit] if cap_in_sql else []))
+            for parameter_name in parameter_names
+        ]
+        row_queries = [(query, params) for _, query, params in series_queries]
+    
+    if format_type == 'plotly_json':
+        return plotly_data_response(experiment_id, series_queries, sampling,
+                                    max_points if not cap_in_sql else None, limit, encoding)
+    
+    # Read lazily, one query's cursor at a time, so streamed formats never hold every row
+    if format_type in ARROW_FORMATS and cap_in_sql:
+        first_row, rows = peek(cursor_batches(row_queries))  # tuple batches straight into record batches
+    else:
+        first_row, rows = peek(chain.from_iterable(iter_query(query, params) for query, params in row_queries))
+    if first_row is None:
         return api_response(
             success=False,
             error=f"No time series data found for experiment {experiment_id}",
             status_code=404
         )
     
-    # Apply limit per parameter if needed
-    if limit < len(rows):
-        # Group by parameter and limit each
-        parameter_data = {}
-        for row in rows:
-            param = row['parameter_name']
-            if param not in parameter_data:
-                parameter_data[param] = []
-            if len(parameter_data[param]) < limit:
-                parameter_data[param].append(row)
-        
-        # Flatten back to list
-        rows = []
-        for param_rows in parameter_data.values():
-            rows.extend(param_rows)
+    # Downsample each parameter to at most max_points visually faithful points, then cap at limit
+    if sampling in DOWNSAMPLING_METHODS:
+        rows = chain.from_iterable(
+            downsample_rows(list(param_rows), max_points, sampling)[:limit]
+            for _, param_rows in groupby(rows, key=lambda row: row['parameter_name'])
+        )
     
     # Handle different output formats
     if format_type == 'csv':
-        output = io.StringIO()
-        if rows:
-            writer = csv.DictWriter(output, fieldnames=rows[0].keys())
-            writer.writeheader()
-            writer.writerows(rows)
-        
-        csv_data = io.BytesIO(output.getvalue().encode('utf-8'))
-        return send_file(csv_data,
-                        mimetype='text/csv',
-                        as_attachment=True,
-                        download_name=f'experiment_{experiment_id}_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
+        return csv_response(rows, export_filename(f'experiment_{experiment_id}_data', 'csv'))
     
     elif format_type == 'xml':
-        xml_data = f"<timeseries_data experiment_id=\"{experiment_id}\">\n"
-        for row in rows:
-            xml_data += "  <datapoint>\n"
-            for key, value in row.items():
-                xml_data += f"    <{key}>{value}</{key}>\n"
-            xml_data += "  </datapoint>\n"
-        xml_data += "</timeseries_data>"
-        
-        return xml_data, 200, {'Content-Type': 'application/xml'}
+        return xml_response('timeseries_data', 'datapoint', rows, {'experiment_id': experiment_id})
     
-    elif format_type == 'plotly_json':
-        # Format for direct use with Plotly
-        plotly_data = {}
-        for row in rows:
-            param = row['parameter_name']
-            if param not in plotly_data:
-                plotly_data[param] = {
-                    'x': [],
-                    'y': [],
-                    'name': f"{param} ({row['unit']})",
-                    'type': 'scatter',
-                    'mode': 'lines+markers',
-                    'unit': row['unit']
-                }
-            plotly_data[param]['x'].append(row['time_step'])
-            plotly_data[param]['y'].append(row['value'])
-        
+    elif format_type in ARROW_FORMATS:
+        if not cap_in_sql:
+            rows = dict_batches(rows)  # downsampled row dicts
+        filename = export_filename(f'experiment_{experiment_id}_data', EXTENSIONS[format_type])
+        # mean downsampling leaves bucket-mean time steps, which an integer column would drop
+        return arrow_response(rows, format_type, filename, {'time_step': 'REAL'} if sampling == 'mean' else None)
+    
+    # Default JSON response
+    return json_response(
+        "timeseries_data", rows,
+        data={"experiment_id": experiment_id},
+        metadata=lambda count: {
+            "total_points": count,
+            "parameters_included": parameters if parameters else "all",
+            "sampling": sampling,
+            "sampling_value": sampling_value,
+            "aggregation": resolution or "none",
+            "format": format_type,
+            "time_range": {
+                "start": time_start,
+                "end": time_end
+            } if time_start or time_end else None
+        },
+        message=lambda count: f"Retrieved {count} time series data points for experiment {experiment_id}"
+    )
+
+RAW_COLUMNS = "series_name, parameter_name, time_step, timestamp, value, unit, notes"
+PLOTLY_COLUMNS = "time_step, value"
+
+def raw_data_query(columns=RAW_COLUMNS, filters="", limited=True):
+    """
+    Raw points of one parameter in time step order; params are (experiment_id,
+    parameter_name, *filter params[, limit]). Also checked by cheminf.db.indexes.
+    """
+    query = f"""
+        SELECT {columns}
+        FROM {DB_PREFIX}time_series
+        WHERE experiment_id = ? AND parameter_name IS ?{filters}
+        ORDER BY time_step
+        """
+    return query + " LIMIT ?" if limited else query
+
+def statistics_query(advanced_stats=False, parameter_count=0):
+    """Per-parameter statistics of an experiment; params are (experiment_id, *parameter names)."""
+    # SQLite doesn't have built-in percentile functions; ts_stats computes them in the same pass
+    query = f"""
+        SELECT parameter_name, unit,
+               COUNT(*) as data_points,
+               MIN(value) as min_value,
+               MAX(value) as max_value,
+               AVG(value) as avg_value,
+               (MAX(value) - MIN(value)) as value_range,
+               MIN(timestamp) as start_time,
+               MAX(timestamp) as end_time{", ts_stats(value) as value_stats" if advanced_stats else ""}
+        FROM {DB_PREFIX}time_series
+        WHERE experiment_id = ?
+        """
+    if parameter_count:
+        query += f" AND parameter_name IN ({','.join('?' for _ in range(parameter_count))})"
+    return query + " GROUP BY parameter_name, unit ORDER BY parameter_name"
+
+# Distinct parameter names of an experiment, read from the points themselves (not the
+# summary cache) as a loose index scan: one MIN() seek per name on the
+# (experiment_id, parameter_name, ...) index, however many points each name has
+PARAMETER_NAMES_QUERY = f"""
+WITH RECURSIVE names(parameter_name) AS (
+    SELECT MIN(parameter_name) FROM {DB_PREFIX}time_series WHERE experiment_id = :experiment_id
+    UNION ALL
+    SELECT (SELECT MIN(parameter_name) FROM {DB_PREFIX}time_series
+            WHERE experiment_id = :experiment_id AND parameter_name > names.parameter_name)
+    FROM names WHERE parameter_name IS NOT NULL
+)
+SELECT NULL AS parameter_name WHERE EXISTS (
+    SELECT 1 FROM {DB_PREFIX}time_series WHERE experiment_id = :experiment_id AND parameter_name IS NULL)
+UNION ALL
+SELECT parameter_name FROM names WHERE parameter_name IS NOT NULL
+"""
+
+def get_parameter_names(experiment_id):
+    """Names of the parameters with data in an experiment, sorted (a NULL name first)."""
+    return [row['parameter_name'] for row in iter_query(PARAMETER_NAMES_QUERY, {"experiment_id": experiment_id})]
+
+def plotly_data_response(experiment_id, series_queries, sampling, max_points, limit, encoding):
+    """plotly_json body built column-wise: one NumPy (x, y) pair per parameter, no row dicts."""
+    # Earliest series of each parameter names its unit
+    units = {}
+    for row in execute_query(f"SELECT parameter_name, unit FROM {SUMMARY_TABLE} "
+                             f"WHERE experiment_id = ? ORDER BY start_time", (experiment_id,)):
+        units.setdefault(row['parameter_name'], row['unit'])
+    
+    traces = []
+    for parameter_name, query, params in series_queries:
+        x, y = fetch_xy(query, params)
+        if not len(x):
+            continue
+        if max_points is not None and len(x) > max_points:
+            x, y, _ = downsample(x, y, max_points, sampling)
+            x, y = x[:limit], y[:limit]
+        traces.append(plotly_trace(parameter_name, units.get(parameter_name), x, y, encoding))
+    
+    if not traces:
         return api_response(
-            success=True,
-            data={
-                "plotly_traces": list(plotly_data.values()),
-                "layout_suggestions": {
-                    "title": f"Time Series Data - Experiment {experiment_id}",
-                    "xaxis": {"title": "Time Step"},
-                    "yaxis": {"title": "Value"}
-                }
-            },
-            message="Data formatted for Plotly visualization"
+            success=False,
+            error=f"No time series data found for experiment {experiment_id}",
+            status_code=404
         )
     
-    # Default JSON response
-    return api_response(
-        success=True,
-        data={
-            "experiment_id": experiment_id,
-            "timeseries_data": rows,
-            "metadata": {
-                "total_points": len(rows),
-                "parameters_included": parameters if parameters else "all",
-                "sampling": sampling,
-                "format": format_type,
-                "time_range": {
-                    "start": time_start,
-                    "end": time_end
-                } if time_start or time_end else None
-            }
+    return plotly_response(
+        traces,
+        {
+            "title": f"Time Series Data - Experiment {experiment_id}",
+            "xaxis": {"title": "Time Step"},
+            "yaxis": {"title": "Value"}
         },
-        message=f"Retrieved {len(rows)} time series data points for experiment {experiment_id}"
+        "Data formatted for Plotly visualization"
     )
 
 @server.route("/api/v1/timeseries/experiments/<int:experiment_id>/statistics", methods=["GET"])
@@ -440,46 +507,7 @@ def get_timeseries_statistics(experiment_id):
     if format_type not in ['json', 'csv', 'xml']:
         raise ValueError("Format must be json, csv, or xml")
     
-    # Build query with optional advanced statistics
-    if advanced_stats:
-        # SQLite doesn't have built-in percentile functions, so we'll calculate basic stats plus some derived metrics
-        base_query = f"""
-        SELECT parameter_name, unit,
-               COUNT(*) as data_points,
-               MIN(value) as min_value,
-               MAX(value) as max_value,
-               AVG(value) as avg_value,
-               (MAX(value) - MIN(value)) as value_range,
-               MIN(timestamp) as start_time,
-               MAX(timestamp) as end_time,
-               GROUP_CONCAT(value) as all_values
-        FROM {DB_PREFIX}time_series
-        WHERE experiment_id = ?
-        """
-    else:
-        base_query = f"""
-        SELECT parameter_name, unit,
-               COUNT(*) as data_points,
-               MIN(value) as min_value,
-               MAX(value) as max_value,
-               AVG(value) as avg_value,
-               (MAX(value) - MIN(value)) as value_range,
-               MIN(timestamp) as start_time,
-               MAX(timestamp) as end_time
-        FROM {DB_PREFIX}time_series
-        WHERE experiment_id = ?
-        """
-    
-    params = [experiment_id]
-    
-    if parameters:
-        placeholders = ','.join(['?' for _ in parameters])
-        base_query += f" AND parameter_name IN ({placeholders})"
-        params.extend(parameters)
-    
-    base_query += " GROUP BY parameter_name, unit ORDER BY parameter_name"
-    
-    rows = execute_query(base_query, params)
+    rows = execute_query(statistics_query(advanced_stats, len(parameters)), [experiment_id] + parameters)
     
     if not rows:
         return api_response(
@@ -488,70 +516,30 @@ def get_timeseries_statistics(experiment_id):
             status_code=404
         )
     
-    # Calculate advanced statistics if requested
+    # Unpack the advanced statistics computed by the ts_stats aggregate
     if advanced_stats:
         enhanced_rows = []
         for row in rows:
             enhanced_row = dict(row)
-            if 'all_values' in enhanced_row:
-                values = [float(v) for v in enhanced_row['all_values'].split(',')]
-                values.sort()
-                n = len(values)
-                
-                # Calculate percentiles
-                enhanced_row['median'] = values[n//2] if n % 2 == 1 else (values[n//2-1] + values[n//2]) / 2
-                enhanced_row['q1'] = values[n//4]
-                enhanced_row['q3'] = values[3*n//4]
-                enhanced_row['iqr'] = enhanced_row['q3'] - enhanced_row['q1']
-                
-                # Calculate standard deviation
-                mean = enhanced_row['avg_value']
-                variance = sum((v - mean) ** 2 for v in values) / n
-                enhanced_row['std_deviation'] = variance ** 0.5
-                enhanced_row['coefficient_of_variation'] = enhanced_row['std_deviation'] / mean if mean != 0 else 0
-                
-                # Remove the raw values field
-                del enhanced_row['all_values']
-            
+            enhanced_row.update(json.loads(enhanced_row.pop('value_stats')))
             enhanced_rows.append(enhanced_row)
         rows = enhanced_rows
     
     # Handle different output formats
     if format_type == 'csv':
-        output = io.StringIO()
-        if rows:
-            writer = csv.DictWriter(output, fieldnames=rows[0].keys())
-            writer.writeheader()
-            writer.writerows(rows)
-        
-        csv_data = io.BytesIO(output.getvalue().encode('utf-8'))
-        return send_file(csv_data,
-                        mimetype='text/csv',
-                        as_attachment=True,
-                        download_name=f'experiment_{experiment_id}_statistics_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
+        return csv_response(rows, export_filename(f'experiment_{experiment_id}_statistics', 'csv'))
     
     elif format_type == 'xml':
-        xml_data = f"<statistics experiment_id=\"{experiment_id}\">\n"
-        for row in rows:
-            xml_data += "  <parameter_stats>\n"
-            for key, value in row.items():
-                xml_data += f"    <{key}>{value}</{key}>\n"
-            xml_data += "  </parameter_stats>\n"
-        xml_data += "</statistics>"
-        
-        return xml_data, 200, {'Content-Type': 'application/xml'}
+        return xml_response('statistics', 'parameter_stats', rows, {'experiment_id': experiment_id})
     
     # Default JSON response
-    return api_response(
-        success=True,
-        data={
-            "experiment_id": experiment_id,
-            "statistics": rows,
-            "metadata": {
-                "parameters_analyzed": len(rows),
-                "advanced_statistics_included": advanced_stats,
-                "parameters_filter": parameters if parameters else "all"
-            }
+    return json_response(
+        "statistics", rows,
+        data={"experiment_id": experiment_id},
+        metadata={
+            "parameters_analyzed": len(rows),
+            "advanced_statistics_included": advanced_stats,
+            "parameters_filter": parameters if parameters else "all"
         },
         message=f"Statistical analysis completed for {len(rows)} parameters in experiment {experiment_id}"
     )
@@ -566,6 +554,13 @@ def post_timeseries_data(experiment_id):
     Path Parameters:
     - experiment_id: ID of the experiment
     
+    Query Parameters:
+    - wait: true (default) answers 201 once the points are committed;
+      false answers 202 as soon as they are queued
+    
+    Points are queued for the ingest writer (time_series/ingest.py); 429 with
+    Retry-After when its queue is full.
+    
     Request Body (JSON):
     {
         "data_points": [
@@ -588,65 +583,105 @@ def post_timeseries_data(experiment_id):
     if not request.is_json:
         raise ValueError("Request must be JSON")
     
-    data = request.get_json()
+    data = loads(request.get_data())
     
-    if 'data_points' not in data or not isinstance(data['data_points'], list):
+    if not isinstance(data, dict) or not isinstance(data.get('data_points'), list):
         raise ValueError("Request must contain 'data_points' array")
     
     data_points = data['data_points']
     metadata = data.get('metadata', {})
+    wait = request.args.get('wait', 'true').lower() == 'true'
     
     if len(data_points) == 0:
         raise ValueError("At least one data point is required")
     
-    if len(data_points) > 10000:
-        raise ValueError("Cannot insert more than 10000 data points in a single request")
-    
-    # Validate and prepare data for insertion
-    insert_data = []
-    required_fields = ['parameter_name', 'value', 'timestamp']
+    if len(data_points) > INGEST_MAX_REQUEST_POINTS:
+        raise ValueError(f"Cannot insert more than {INGEST_MAX_REQUEST_POINTS} data points in a single request")
     
-    for i, point in enumerate(data_points):
-        # Validate required fields
-        for field in required_fields:
-            if field not in point:
-                raise ValueError(f"Data point {i+1} missing required field: {field}")
-        
-        # Prepare insert tuple
-        insert_tuple = (
-            experiment_id,
-            point.get('series_name', f"{point['parameter_name']}-Series"),
-            point['parameter_name'],
-            point.get('time_step', i + 1),
-            point['timestamp'],
-            float(point['value']),
-            point.get('unit', ''),
-            point.get('notes', '')
-        )
-        insert_data.append(insert_tuple)
+    # Validate and queue for the ingest writer, which commits concurrent requests together
+    insert_data = prepare_points(experiment_id, data_points)
+    try:
+        ticket = get_writer().submit(insert_data)
+    except IngestQueueFull as e:
+        return ingest_busy(e)
     
-    # Insert data
-    insert_query = f"""
-    INSERT INTO {DB_PREFIX}time_series 
-    (experiment_id, series_name, parameter_name, time_step, timestamp, value, unit, notes)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """
-    
-    # Use execute_many for bulk insert
-    from cheminf.db.db import execute_many
-    execute_many(insert_query, insert_data)
+    if wait:
+        try:
+            ticket.wait(INGEST_WAIT_TIMEOUT)
+        except TimeoutError:
+            wait = False  # still queued; it will be written
     
     return api_response(
         success=True,
         data={
             "experiment_id": experiment_id,
-            "inserted_points": len(data_points),
+            "inserted_points" if wait else "queued_points": len(insert_data),
             "metadata": metadata
         },
-        message=f"Successfully inserted {len(data_points)} data points into experiment {experiment_id}",
-        status_code=201
+        message=(f"Successfully inserted {len(insert_data)} data points into experiment {experiment_id}" if wait
+                 else f"Queued {len(insert_data)} data points for experiment {experiment_id}"),
+        status_code=201 if wait else 202
     )
 
+def ingest_busy(error, data=None):
+    """429 response for a full ingest queue, with a Retry-After hint."""
+    response, status_code = api_response(success=False, data=data, error=str(error), status_code=429)
+    response.headers['Retry-After'] = '1'
+    return response, status_code
+
+@server.route("/api/v1/timeseries/experiments/<int:experiment_id>/stream", methods=["POST"])
+@handle_api_errors
+def stream_timeseries_data(experiment_id):
+    """
+    Stream time series data points into an experiment, one per line
+    
+    Path Parameters:
+    - experiment_id: ID of the experiment
+    
+    Query Parameters:
+    - format: ndjson or line (default: from Content-Type, application/x-ndjson
+      or text/plain; otherwise ndjson)
+    
+    Request Body, usually sent with Transfer-Encoding: chunked and kept open:
+    - ndjson: one data point object per line, as in post_timeseries_data
+      {"parameter_name": "Temperature", "value": 85.5, "unit": "°C", "timestamp": "2024-10-15T09:05:00Z"}
+    - line: <parameter>[,unit=<unit>][,series=<series_name>] <value> <timestamp> [<time_step>]
+      Temperature,unit=°C 85.5 2024-10-15T09:05:00Z 1
+    
+    Points are committed in batches while the body is still arriving (see
+    time_series/stream_ingest.py); the response, sent when the body ends, reports
+    the totals. Invalid lines are skipped and counted.
+    """
+    format_type = request.args.get('format') or stream_format(request.mimetype)
+    if format_type not in STREAM_FORMATS:
+        raise ValueError(f"Invalid format. Must be one of: {', '.join(STREAM_FORMATS)}")
+    
+    ingest = StreamIngest(experiment_id, format_type).run(request.stream, request.content_length)
+    data = ingest.summary()
+    
+    if ingest.busy is not None:
+        return ingest_busy(ingest.busy, data)
+    
+    return api_response(
+        success=True,
+        data=data,
+        message=(f"Streamed {data['lines']} lines into experiment {experiment_id}: "
+                 f"{data['inserted_points']} points inserted, {data['queued_points']} queued, "
+                 f"{data['rejected_lines']} lines rejected"),
+        status_code=202 if data['queued_points'] else 201
+    )
+
+@server.route("/api/v1/timeseries/ingest/metrics", methods=["GET"])
+@handle_api_errors
+def get_ingest_metrics():
+    """
+    Ingest queue depth, throughput and lag
+
+    Lags are seconds from a request entering the queue to its commit, over the
+    most recent requests.
+    """
+    return api_response(success=True, data=get_writer().metrics(), message="Ingest writer metrics")
+
 # Bulk data export endpoint
 @server.route("/api/v1/timeseries/export", methods=["GET"])
 @handle_api_errors
@@ -657,7 +692,7 @@ def export_timeseries_bulk():
     Query Parameters:
     - experiment_ids: comma-separated list of experiment IDs
     - parameters: comma-separated list of parameter names
-    - format: csv, json, xml (default: csv)
+    - format: csv, json, xml, arrow (Arrow IPC stream), parquet (default: csv)
     - date_from: ISO timestamp for start date filter
     - date_to: ISO timestamp for end date filter
     """
@@ -677,8 +712,10 @@ def export_timeseries_bulk():
     if len(experiment_ids) > 50:
         raise ValueError("Cannot export more than 50 experiments at once")
     
-    if format_type not in ['json', 'csv', 'xml']:
-        raise ValueError("Format must be json, csv, or xml")
+    if format_type not in ['json', 'csv', 'xml'] + list(ARROW_FORMATS):
+        raise ValueError("Format must be json, csv, xml, arrow, or parquet")
+    if format_type in ARROW_FORMATS:
+        require_pyarrow(format_type)
     
     # Build query
     placeholders = ','.join(['?' for _ in experiment_ids])
@@ -690,7 +727,7 @@ def export_timeseries_bulk():
     WHERE ts.experiment_id IN ({placeholders})
     """
     
-    params = experiment_ids
+    params = list(experiment_ids)
     
     if parameters:
         param_placeholders = ','.join(['?' for _ in parameters])
@@ -707,65 +744,41 @@ def export_timeseries_bulk():
     
     query += " ORDER BY ts.experiment_id, ts.parameter_name, ts.time_step"
     
-    rows = execute_query(query, params)
+    # Rows are pulled from the cursor in batches and streamed; no format holds the full result set
+    if format_type in ARROW_FORMATS:
+        first_row, rows = peek(cursor_batches([(query, params)]))  # tuple batches, no row dicts
+    else:
+        first_row, rows = peek(iter_query(query, params))
     
-    if not rows:
+    if first_row is None:
         return api_response(
             success=False,
             error="No data found for specified criteria",
             status_code=404
         )
     
-    # Handle different output formats
+    # Handle different output formats (no Content-Length: sent with chunked transfer encoding)
+    if format_type in ARROW_FORMATS:
+        return arrow_response(rows, format_type, export_filename('timeseries_bulk_export', EXTENSIONS[format_type]))
+    
     if format_type == 'csv':
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=rows[0].keys())
-        writer.writeheader()
-        writer.writerows(rows)
-        
-        csv_data = io.BytesIO(output.getvalue().encode('utf-8'))
-        return send_file(csv_data,
-                        mimetype='text/csv',
-                        as_attachment=True,
-                        download_name=f'timeseries_bulk_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
+        return csv_response(rows, export_filename('timeseries_bulk_export', 'csv'))
     
-    elif format_type == 'xml':
-        xml_data = "<bulk_export>\n"
-        current_exp = None
-        
-        for row in rows:
-            if row['experiment_id'] != current_exp:
-                if current_exp is not None:
-                    xml_data += "  </experiment>\n"
-                xml_data += f"  <experiment id=\"{row['experiment_id']}\" name=\"{row['experiment_name']}\">\n"
-                current_exp = row['experiment_id']
-            
-            xml_data += "    <datapoint>\n"
-            for key, value in row.items():
-                if key not in ['experiment_id', 'experiment_name']:
-                    xml_data += f"      <{key}>{value}</{key}>\n"
-            xml_data += "    </datapoint>\n"
-        
-        if current_exp is not None:
-            xml_data += "  </experiment>\n"
-        xml_data += "</bulk_export>"
-        
-        return xml_data, 200, {'Content-Type': 'application/xml'}
+    if format_type == 'xml':
+        return xml_response('bulk_export', 'datapoint', rows,
+                            group=('experiment', {'id': 'experiment_id', 'name': 'experiment_name'}))
     
     # Default JSON response
-    return api_response(
-        success=True,
-        data={
-            "export_data": rows,
-            "metadata": {
-                "total_points": len(rows),
-                "experiments_included": experiment_ids,
-                "parameters_included": parameters if parameters else "all",
-                "date_range": {
-                    "from": date_from,
-                    "to": date_to
-                } if date_from or date_to else None
-            }
+    return json_response(
+        "export_data", rows,
+        metadata=lambda count: {
+            "total_points": count,
+            "experiments_included": experiment_ids,
+            "parameters_included": parameters if parameters else "all",
+            "date_range": {
+                "from": date_from,
+                "to": date_to
+            } if date_from or date_to else None
         },
-        message=f"Bulk export completed with {len(rows)} data points"
-    )
\ No newline at end of file
+        message=lambda count: f"Bulk export completed with {count} data points"
+    )
@@ -0,0 +1,197 @@
+"""
+Time Series Rollups
+Min/max/sum/count buckets per (experiment, parameter, unit) at minute, hour and day
+resolution, stored in {prefix}time_series_rollup. Rollups are updated in the same
+transaction as each ingest, so long runs can be charted from a few thousand buckets
+instead of millions of raw points.
+"""
+
+from cheminf.config import DB_PREFIX
+from cheminf.db.db import execute_query
+from cheminf.time_series.summary import SUMMARY_TABLE, table_exists
+
+ROLLUP_TABLE = f"{DB_PREFIX}time_series_rollup"
+TIME_SERIES_TABLE = f"{DB_PREFIX}time_series"
+
+# Finest to coarsest; value is the strftime format of the bucket start
+RESOLUTIONS = {
+    "minute": "%Y-%m-%d %H:%M:00",
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+# Values accepted by the ?aggregation= query parameter
+AGGREGATIONS = {
+    "minute": "minute",
+    "hourly": "hour",
+    "daily": "day",
+}
+
+CREATE_ROLLUP_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+    experiment_id INTEGER NOT NULL,
+    resolution VARCHAR(10) NOT NULL,
+    parameter_name VARCHAR(50),
+    unit VARCHAR(20),
+    bucket_start DATETIME NOT NULL,
+    data_points INTEGER NOT NULL,
+    min_value REAL,
+    max_value REAL,
+    sum_value REAL,
+    UNIQUE (experiment_id, resolution, parameter_name, unit, bucket_start)
+)
+"""
+
+def _upsert_sql(where):
+    # "WHERE 1" keeps the parser from reading ON CONFLICT as a join constraint
+    return f"""
+        INSERT INTO {ROLLUP_TABLE}
+        (experiment_id, resolution, parameter_name, unit, bucket_start,
+         data_points, min_value, max_value, sum_value)
+        SELECT experiment_id, :resolution, parameter_name, unit, strftime(:fmt, timestamp) as bucket,
+               COUNT(value), MIN(value), MAX(value), SUM(value)
+        FROM {TIME_SERIES_TABLE}
+        WHERE 1 AND {where} AND value IS NOT NULL AND strftime(:fmt, timestamp) IS NOT NULL
+        GROUP BY experiment_id, parameter_name, unit, bucket
+        ON CONFLICT (experiment_id, resolution, parameter_name, unit, bucket_start) DO UPDATE SET
+            data_points = data_points + excluded.data_points,
+            min_value = MIN(min_value, excluded.min_value),
+            max_value = MAX(max_value, excluded.max_value),
+            sum_value = sum_value + excluded.sum_value
+    """
+
+# New points aggregated once at the finest resolution; every resolution is upserted from these
+ROLLUP_DELTA = "temp.time_series_rollup_delta"
+
+CREATE_ROLLUP_DELTA = f"""
+CREATE TEMP TABLE IF NOT EXISTS time_series_rollup_delta (
+    experiment_id INTEGER, parameter_name VARCHAR(50), unit VARCHAR(20), bucket_start DATETIME,
+    data_points INTEGER, min_value REAL, max_value REAL, sum_value REAL
+)
+"""
+
+FILL_ROLLUP_DELTA = f"""
+INSERT INTO {ROLLUP_DELTA}
+SELECT experiment_id, parameter_name, unit, strftime(:fmt, timestamp) as bucket,
+       COUNT(value), MIN(value), MAX(value), SUM(value)
+FROM {TIME_SERIES_TABLE}
+WHERE series_id >= :first_id AND value IS NOT NULL AND bucket IS NOT NULL
+GROUP BY experiment_id, parameter_name, unit, bucket
+"""
+
+UPSERT_FROM_DELTA = f"""
+INSERT INTO {ROLLUP_TABLE}
+(experiment_id, resolution, parameter_name, unit, bucket_start,
+ data_points, min_value, max_value, sum_value)
+SELECT experiment_id, :resolution, parameter_name, unit, strftime(:fmt, bucket_start) as bucket,
+       SUM(data_points), MIN(min_value), MAX(max_value), SUM(sum_value)
+FROM {ROLLUP_DELTA}
+WHERE 1
+GROUP BY experiment_id, parameter_name, unit, bucket
+ON CONFLICT (experiment_id, resolution, parameter_name, unit, bucket_start) DO UPDATE SET
+    data_points = data_points + excluded.data_points,
+    min_value = MIN(min_value, excluded.min_value),
+    max_value = MAX(max_value, excluded.max_value),
+    sum_value = sum_value + excluded.sum_value
+"""
+
+def ensure_rollup_table(connection):
+    """
+    Create the rollup table if needed, filling it from the raw data on first creation
+    (left empty when the database has no time_series table yet).
+    """
+    if table_exists(connection, ROLLUP_TABLE):
+        return False
+    connection.execute(CREATE_ROLLUP_TABLE)
+    if table_exists(connection, TIME_SERIES_TABLE):
+        rebuild_rollups(connection)
+    return True
+
+def rebuild_rollups(connection):
+    """Recompute all rollups from time_series; returns the number of buckets."""
+    connection.execute(f"DELETE FROM {ROLLUP_TABLE}")
+    for resolution, fmt in RESOLUTIONS.items():
+        connection.execute(_upsert_sql("1"), {"resolution": resolution, "fmt": fmt})
+    connection.commit()
+    return connection.execute(f"SELECT COUNT(*) FROM {ROLLUP_TABLE}").fetchone()[0]
+
+def update_rollups(connection, inserted_count):
+    """
+    Fold the rows just inserted into time_series into every resolution (caller commits).
+    Must run in the inserting transaction: the new rows are the last inserted_count series_ids.
+    """
+    last_id = connection.execute(f"SELECT MAX(series_id) FROM {TIME_SERIES_TABLE}").fetchone()[0]
+    first_id = last_id - inserted_count + 1
+    # One strftime/GROUP BY pass over the new rows (minute buckets); the coarser
+    # resolutions are rolled up from those few buckets instead of re-reading the rows
+    connection.execute(CREATE_ROLLUP_DELTA)
+    connection.execute(f"DELETE FROM {ROLLUP_DELTA}")
+    connection.execute(FILL_ROLLUP_DELTA, {"fmt": next(iter(RESOLUTIONS.values())), "first_id": first_id})
+    for resolution, fmt in RESOLUTIONS.items():
+        connection.execute(UPSERT_FROM_DELTA, {"resolution": resolution, "fmt": fmt})
+
+def choose_resolution(experiment_id, budget, parameters=None, time_start=None, time_end=None):
+    """
+    Pick the finest data source whose largest per-parameter point count fits the budget:
+    None for raw points, otherwise a RESOLUTIONS key (falls back to the coarsest one).
+    """
+    filters, params = _filters(experiment_id, parameters, time_start, time_end)
+    # Without a time range the per-series summary already holds the point counts
+    source, count = (TIME_SERIES_TABLE, "COUNT(*)") if time_start or time_end else (SUMMARY_TABLE, "SUM(data_points)")
+    raw_max = execute_query(f"""
+        SELECT MAX(n) as n FROM (SELECT {count} as n FROM {source}
+                                 WHERE {filters} GROUP BY parameter_name)
+    """, params)[0]['n']
+    if raw_max is None or raw_max <= budget:
+        return None
+
+    for resolution in RESOLUTIONS:
+        filters, params = _filters(experiment_id, parameters, time_start, time_end, resolution=resolution)
+        bucket_max = execute_query(f"""
+            SELECT MAX(n) as n FROM (SELECT COUNT(*) as n FROM {ROLLUP_TABLE}
+                                     WHERE resolution = ? AND {filters} GROUP BY parameter_name)
+        """, [resolution] + params)[0]['n']
+        if bucket_max is not None and bucket_max <= budget:
+            return resolution
+    return list(RESOLUTIONS)[-1]
+
+def rollup_query(experiment_id, resolution, parameters=None, time_start=None, time_end=None):
+    """
+    Build (query, params) returning one row per bucket, shaped like raw data points.
+    A time range selects every bucket it overlaps, so the buckets at either edge are
+    whole (they may include points just outside the range).
+    """
+    filters, params = _filters(experiment_id, parameters, time_start, time_end, resolution=resolution)
+    query = f"""
+    SELECT parameter_name || '-{resolution}' as series_name, parameter_name,
+           ROW_NUMBER() OVER (PARTITION BY parameter_name ORDER BY bucket_start) as time_step,
+           bucket_start as timestamp,
+           sum_value / data_points as value,
+           unit,
+           min_value, max_value, data_points
+    FROM {ROLLUP_TABLE}
+    WHERE resolution = ? AND {filters}
+    ORDER BY parameter_name, bucket_start
+    """
+    return query, [resolution] + params
+
+def _filters(experiment_id, parameters, time_start, time_end, resolution=None):
+    # Raw points compare their timestamp with the range as given. Buckets compare
+    # bucket_start with the range bounds floored to the same resolution and format
+    # ('YYYY-MM-DD HH:MM:00'), so an ISO '...T...Z' bound neither drops the bucket it
+    # falls in nor misorders on the ' ' / 'T' separator
+    clauses = ["experiment_id = ?"]
+    params = [experiment_id]
+    if parameters:
+        clauses.append(f"parameter_name IN ({','.join(['?' for _ in parameters])})")
+        params.extend(parameters)
+    for operator, bound in ((">=", time_start), ("<=", time_end)):
+        if not bound:
+            continue
+        if resolution is None:
+            clauses.append(f"timestamp {operator} ?")
+            params.append(bound)
+        else:
+            clauses.append(f"bucket_start {operator} strftime(?, ?)")
+            params.extend([RESOLUTIONS[resolution], bound])
+    return " AND ".join(clauses), params
@@ -0,0 +1,139 @@
+"""
+Time Series Serializers
+Streaming JSON, CSV and XML responses for the time series API. Each serializer
+consumes rows (dicts) from any iterable, e.g. iter_query(), and yields the body in
+~CHUNK_SIZE pieces, so the work is linear in the row count and nothing holds the
+whole document in memory. XML text and attribute values are escaped.
+
+The JSON body has the same envelope as api_response(); metadata and message may be
+functions of the row count, since that is only known after the last row.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import chain
+from xml.sax.saxutils import escape, quoteattr
+
+from flask import Response
+
+CHUNK_SIZE = 64 * 1024  # Flush streamed output in ~64 KiB chunks
+
+def peek(rows):
+    """Return (first row or None, iterator over all rows including the first)."""
+    rows = iter(rows)
+    first = next(rows, None)
+    return first, (rows if first is None else chain([first], rows))
+
+def _chunked(pieces):
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+# -------------------------------
+# CSV
+# -------------------------------
+
+def stream_csv(rows):
+    """Yield CSV text in chunks, with a header taken from the first row's keys."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+    for row in rows:
+        if not header_written:
+            writer.writerow(row.keys())
+            header_written = True
+        writer.writerow(row.values())
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+def csv_response(rows, filename):
+    """CSV attachment streamed with chunked transfer encoding (no Content-Length)."""
+    return Response(stream_csv(rows), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+# -------------------------------
+# XML
+# -------------------------------
+
+def _xml_element(name, row, indent, skip=()):
+    fields = ''.join(f"{indent}  <{key}>{escape(str(value))}</{key}>\n"
+                     for key, value in row.items() if key not in skip)
+    return f"{indent}<{name}>\n{fields}{indent}</{name}>\n"
+
+def _attributes(attributes):
+    return ''.join(f" {name}={quoteattr(str(value))}" for name, value in attributes.items())
+
+def stream_xml(root, element, rows, attributes=None, group=None):
+    """
+    Yield <root attributes...><element>...</element>...</root> in chunks.
+    group=(name, {attribute: column}) wraps consecutive rows with equal values of
+    those columns in a <name attribute="..."> element, and leaves the columns out of
+    the rows; rows must be ordered by them.
+    """
+    def pieces():
+        yield f"<{root}{_attributes(attributes or {})}>\n"
+        if group is None:
+            for row in rows:
+                yield _xml_element(element, row, "  ")
+        else:
+            group_name, columns = group
+            current = None
+            for row in rows:
+                key = tuple(row[column] for column in columns.values())
+                if key != current:
+                    if current is not None:
+                        yield f"  </{group_name}>\n"
+                    yield f"  <{group_name}{_attributes(dict(zip(columns, key)))}>\n"
+                    current = key
+                yield _xml_element(element, row, "    ", skip=columns.values())
+            if current is not None:
+                yield f"  </{group_name}>\n"
+        yield f"</{root}>"
+    return _chunked(pieces())
+
+def xml_response(root, element, rows, attributes=None, group=None):
+    return Response(stream_xml(root, element, rows, attributes, group), mimetype='application/xml')
+
+# -------------------------------
+# JSON
+# -------------------------------
+
+def _dumps(value):
+    return json.dumps(value, default=str)
+
+def stream_json(rows_key, rows, data=None, metadata=None, message=None):
+    """
+    Yield {"success": true, "timestamp": ..., "data": {**data, rows_key: [rows...],
+    "metadata": ...}, "message": ..., "error": null} in chunks.
+    """
+    def pieces():
+        timestamp = datetime.utcnow().isoformat() + "Z"
+        yield f'{{"success": true, "timestamp": {_dumps(timestamp)}, "data": {{'
+        for key, value in (data or {}).items():
+            yield f'{_dumps(key)}: {_dumps(value)}, '
+        yield f'{_dumps(rows_key)}: ['
+        count = 0
+        for row in rows:
+            yield (',' if count else '') + _dumps(row)
+            count += 1
+        yield ']'
+        if metadata is not None:
+            yield f', "metadata": {_dumps(metadata(count) if callable(metadata) else metadata)}'
+        text = message(count) if callable(message) else message
+        yield f'}}, "message": {_dumps(text)}, "error": null}}'
+    return _chunked(pieces())
+
+def json_response(rows_key, rows, data=None, metadata=None, message=None, status_code=200):
+    return Response(stream_json(rows_key, rows, data, metadata, message),
+                    status=status_code, mimetype='application/json')
@@ -0,0 +1,272 @@
+"""
+Streaming Time Series Ingest
+POST /api/v1/timeseries/experiments/{id}/stream takes one data point per line, as
+NDJSON or a compact line protocol, usually over a chunked HTTP request that an
+instrument keeps open for as long as it runs. Lines are parsed as they arrive and
+handed to the ingest writer (time_series/ingest.py) in batches: every
+INGEST_STREAM_BATCH_POINTS points, or INGEST_STREAM_FLUSH_INTERVAL seconds after
+the oldest unsent point, whichever comes first. The request thread reads and parses
+the body; a timer thread submits points that have waited the flush interval while
+the sender is quiet. Data is committed while the request is still open, and the
+response at the end of the body only reports the totals.
+
+Line protocol, one point per line (no spaces or commas inside names):
+
+    <parameter>[,unit=<unit>][,series=<series_name>] <value> <timestamp> [<time_step>]
+    Temperature,unit=°C,series=R1 85.5 2024-10-15T09:05:00Z 101
+
+Blank lines and lines starting with # are skipped. A line without a time step gets
+its line number. Invalid lines are counted and skipped, not fatal, so one bad
+reading does not end a long-lived stream. If the sender disconnects, the points
+received so far are still written (except a partly received last line).
+
+When the ingest queue is full the stream stops reading (the sender is held back by
+TCP flow control) and retries for up to INGEST_WAIT_TIMEOUT before giving up with 429.
+"""
+
+import io
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from werkzeug.exceptions import ClientDisconnected
+
+from cheminf.config import INGEST_STREAM_BATCH_POINTS, INGEST_STREAM_FLUSH_INTERVAL, INGEST_WAIT_TIMEOUT
+from cheminf.time_series.ingest import IngestQueueFull, check_point, get_writer, loads, point_row
+
+STREAM_FORMATS = ('ndjson', 'line')
+CONTENT_TYPES = {
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/plain': 'line',
+}
+
+READ_BYTES = 64 * 1024        # block size of Content-Length bodies without a native readline()
+MAX_LINE_BYTES = 64 * 1024     # longer lines are cut and rejected
+MAX_REPORTED_ERRORS = 10       # rejected lines listed in the response
+SUBMIT_RETRY_INTERVAL = 0.05   # seconds between submits while the queue is full
+
+LINE_PROTOCOL = "<parameter>[,unit=<unit>][,series=<series_name>] <value> <timestamp> [<time_step>]"
+
+def stream_format(mimetype):
+    """Stream format implied by a request Content-Type (ndjson when unknown)."""
+    return CONTENT_TYPES.get(mimetype, 'ndjson')
+
+def iter_blocks(stream, content_length=None):
+    """
+    Yield the lines of a request body as they arrive, as lists of lines (bytes).
+    A chunked body (no content_length) is read line by line: read(n) would wait until
+    n bytes arrived, which a quiet instrument may not send for a long time. On the
+    Werkzeug development server that readline() is the generic byte-by-byte one. A
+    body of known length is read in READ_BYTES blocks, unless the server has a native
+    readline() (gunicorn, uWSGI).
+    """
+    native_readline = getattr(type(stream), 'readline', None) is not io.IOBase.readline
+    if native_readline or content_length is None:
+        while True:
+            line = stream.readline(MAX_LINE_BYTES)
+            if not line:
+                return
+            yield [line]
+    pending = b''
+    while True:
+        block = stream.read(READ_BYTES)
+        if not block:
+            break
+        lines = (pending + block).split(b'\n')
+        pending = lines.pop()
+        if len(pending) >= MAX_LINE_BYTES:
+            lines.append(pending)
+            pending = b''
+        if lines:
+            yield lines
+    if pending:
+        yield [pending]
+
+def ndjson_row(experiment_id, line, number):
+    """Insert tuple of one NDJSON line: a data point object as in post_timeseries_data."""
+    try:
+        point = loads(line)
+    except ValueError:
+        raise ValueError("is not valid JSON")
+    try:
+        return point_row(experiment_id, point, number)
+    except (KeyError, TypeError, ValueError, AttributeError):
+        check_point(point)
+        raise ValueError("is not a valid data point")
+
+@lru_cache(maxsize=4096)
+def _line_key(key):
+    # (series_name, parameter, unit) of a "<parameter>[,tag=value...]" field; an
+    # instrument repeats the same few keys, so each is only parsed once
+    parameter, *tags = key.decode('utf-8').split(',')
+    if not parameter:
+        raise ValueError("has no parameter name")
+    unit, series_name = '', f"{parameter}-Series"
+    for tag in tags:
+        name, _, tag_value = tag.partition('=')
+        if name == 'unit':
+            unit = tag_value
+        elif name == 'series':
+            series_name = tag_value
+        else:
+            raise ValueError(f"has an unknown tag: {tag!r} (expected unit= or series=)")
+    return series_name, parameter, unit
+
+def line_protocol_row(experiment_id, line, number):
+    """Insert tuple of one line protocol line (see LINE_PROTOCOL)."""
+    fields = line.split()
+    if len(fields) not in (3, 4):
+        raise ValueError(f"must be '{LINE_PROTOCOL}'")
+    series_name, parameter, unit = _line_key(fields[0])
+    try:
+        value = float(fields[1])
+    except ValueError:
+        raise ValueError(f"has a non-numeric value: {fields[1].decode('utf-8', 'replace')!r}")
+    try:
+        time_step = int(fields[3]) if len(fields) == 4 else number
+    except ValueError:
+        raise ValueError(f"has a non-integer time step: {fields[3].decode('utf-8', 'replace')!r}")
+    return (experiment_id, series_name, parameter, time_step, fields[2].decode('utf-8'), value, unit, '')
+
+PARSERS = {'ndjson': ndjson_row, 'line': line_protocol_row}
+
+class StreamIngest:
+    """Parses one streamed request body and feeds it to the ingest writer in batches."""
+
+    def __init__(self, experiment_id, format_type, batch_points=INGEST_STREAM_BATCH_POINTS,
+                 flush_interval=INGEST_STREAM_FLUSH_INTERVAL):
+        self.experiment_id = experiment_id
+        self.format_type = format_type
+        self.batch_points = batch_points
+        self.flush_interval = flush_interval
+        self.pending = []
+        self.pending_since = None
+        self.tickets = deque()  # submitted batches, oldest first
+        self.lines = self.rejected_lines = self.batches = 0
+        self.inserted_points = self.failed_points = self.dropped_points = 0
+        self.errors = []
+        self.busy = None          # IngestQueueFull that ended the stream
+        self.disconnected = False
+        self.stopping = False
+        self.cond = threading.Condition()  # guards the pending points between run() and the flush timer
+        self.duration = 0.0
+
+    def run(self, stream, content_length=None):
+        """Read the stream to its end, then wait up to INGEST_WAIT_TIMEOUT for the last commits."""
+        started = time.monotonic()
+        parse = PARSERS[self.format_type]
+        timer = threading.Thread(target=self._flush_on_time, name="timeseries-stream-flush", daemon=True)
+        timer.start()
+        try:
+            # Reads stay on the request thread: nothing touches the body once run() returns
+            for lines in iter_blocks(stream, content_length):
+                with self.cond:
+                    if not self._parse(parse, lines) or self.busy is not None:
+                        break
+        except (ClientDisconnected, OSError):
+            # The sender went away; what it sent so far is still written
+            self.disconnected = True
+        finally:
+            with self.cond:
+                self.stopping = True
+                self.cond.notify()
+            timer.join()
+        if self.busy is None:
+            self._flush()
+        self._collect(timeout=INGEST_WAIT_TIMEOUT)
+        self.duration = time.monotonic() - started
+        return self
+
+    def _flush_on_time(self):
+        # Timer thread: submits the pending points once the oldest has waited flush_interval,
+        # also while the request thread is blocked reading a quiet sender. It never reads the
+        # stream, so run() can always join it.
+        with self.cond:
+            while not self.stopping:
+                if not self.pending or self.busy is not None:
+                    self.cond.wait()
+                    continue
+                left = self.pending_since + self.flush_interval - time.monotonic()
+                if left > 0:
+                    self.cond.wait(left)
+                else:
+                    self._flush()
+
+    def _parse(self, parse, lines):
+        """Parse a block of lines into pending rows; False if a flush found the queue full."""
+        for line in lines:
+            self.lines += 1
+            if line.strip() and not line.startswith(b'#'):
+                try:
+                    self.pending.append(parse(self.experiment_id, line, self.lines))
+                    if self.pending_since is None:
+                        self.pending_since = time.monotonic()
+                        self.cond.notify()  # start the flush timer
+                except ValueError as e:
+                    self._reject(self.lines, e)
+            if len(self.pending) >= self.batch_points and not self._flush():
+                return False
+        return True
+
+    def _reject(self, number, error):
+        self.rejected_lines += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Line {number} {error}")
+
+    def _flush(self):
+        """Submit the pending points, retrying while the queue is full. False if it stayed full."""
+        if not self.pending:
+            return True
+        rows, self.pending, self.pending_since = self.pending, [], None
+        deadline = time.monotonic() + INGEST_WAIT_TIMEOUT
+        while True:
+            try:
+                self.tickets.append(get_writer().submit(rows))
+                break
+            except IngestQueueFull as e:
+                if time.monotonic() >= deadline:
+                    self.busy = e
+                    self.dropped_points += len(rows)
+                    return False
+                time.sleep(SUBMIT_RETRY_INTERVAL)
+        self.batches += 1
+        self._collect()
+        return True
+
+    def _collect(self, timeout=None):
+        """Count finished batches; with a timeout, wait that long for the rest."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.tickets:
+            ticket = self.tickets[0]
+            if deadline is None and not ticket.done():
+                return
+            try:
+                self.inserted_points += ticket.wait(None if deadline is None else max(0, deadline - time.monotonic()))
+            except TimeoutError:
+                return
+            except Exception as e:
+                self.failed_points += len(ticket.rows)
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    self.errors.append(f"Batch of {len(ticket.rows)} points failed: {e}")
+            self.tickets.popleft()
+
+    def summary(self):
+        queued = sum(len(ticket.rows) for ticket in self.tickets)
+        points = self.inserted_points + queued + self.failed_points + self.dropped_points
+        return {
+            "experiment_id": self.experiment_id,
+            "format": self.format_type,
+            "lines": self.lines,
+            "inserted_points": self.inserted_points,
+            "queued_points": queued,
+            "failed_points": self.failed_points,
+            "dropped_points": self.dropped_points,
+            "rejected_lines": self.rejected_lines,
+            "errors": self.errors,
+            "batches": self.batches,
+            "disconnected": self.disconnected,
+            "duration_s": round(self.duration, 3),
+            "points_per_second": round(points / self.duration, 1) if self.duration else None,
+        }
@@ -0,0 +1,145 @@
+"""
+Streaming Time Series Statistics
+Single-pass mean/variance (Welford) and quantiles for the statistics endpoint.
+
+Quantiles are exact while a group has at most EXACT_LIMIT values. Larger groups
+switch to a t-digest sketch, so memory per group stays bounded however many
+points a parameter has.
+"""
+
+import json
+import math
+from array import array
+
+import numpy as np
+
+EXACT_LIMIT = 100000       # values kept verbatim (8 bytes each) before switching to the t-digest
+TDIGEST_COMPRESSION = 200  # roughly compression / 2 centroids are kept
+
+class TDigest:
+    """Merging t-digest with the k1 (arcsine) scale function."""
+
+    def __init__(self, compression=TDIGEST_COMPRESSION):
+        self.compression = compression
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._buffer = array('d')
+        self._buffer_limit = compression * 10
+
+    def add(self, value):
+        self._buffer.append(value)
+        if len(self._buffer) >= self._buffer_limit:
+            self._compress()
+
+    def extend(self, values):
+        self._buffer.extend(values)
+        self._compress()
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        values = np.concatenate([self._means, np.frombuffer(self._buffer, dtype=np.float64)])
+        weights = np.concatenate([self._weights, np.ones(len(self._buffer))])
+        self._buffer = array('d')
+
+        order = np.argsort(values, kind='mergesort')
+        values, weights = values[order], weights[order]
+        total = weights.sum()
+
+        # Each centroid spans at most one unit of k(q) = compression / (2*pi) * asin(2q - 1)
+        q_left = (np.cumsum(weights) - weights) / total
+        k = np.floor(self.compression / (2 * math.pi) * np.arcsin(2 * q_left - 1)).astype(np.int64)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(k)) + 1])
+        merged_weights = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(values * weights, starts) / merged_weights
+        self._weights = merged_weights
+
+    def quantile(self, q, minimum, maximum):
+        """Estimate the q-quantile (0 <= q <= 1); minimum/maximum clamp the tails."""
+        self._compress()
+        if len(self._means) == 0:
+            return None
+        total = self._weights.sum()
+        centers = np.cumsum(self._weights) - self._weights / 2
+        xs = np.concatenate([[0.0], centers, [total]])
+        ys = np.concatenate([[minimum], self._means, [maximum]])
+        return float(np.interp(q * total, xs, ys))
+
+class StreamingStats:
+    """Accumulates count, mean, variance, min/max and quantiles in a single pass."""
+
+    def __init__(self, exact_limit=EXACT_LIMIT):
+        self.exact_limit = exact_limit
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._values = array('d')
+        self._digest = None
+
+    def add(self, value):
+        if value is None:
+            return
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+        if self._digest is not None:
+            self._digest.add(value)
+        else:
+            self._values.append(value)
+            if len(self._values) > self.exact_limit:
+                self._digest = TDigest()
+                self._digest.extend(self._values)
+                self._values = array('d')
+
+    @property
+    def variance(self):
+        """Population variance (same definition the endpoint has always used)."""
+        return self._m2 / self.count if self.count else 0.0
+
+    def quartiles(self):
+        """Return (q1, median, q3), exact or t-digest estimated."""
+        n = self.count
+        if n == 0:
+            return None, None, None
+        if self._digest is not None:
+            return tuple(self._digest.quantile(q, self.minimum, self.maximum) for q in (0.25, 0.5, 0.75))
+
+        # Exact order statistics, using the same positions as the original implementation
+        values = np.frombuffer(self._values, dtype=np.float64).copy()
+        ranks = sorted({n // 4, n // 2, (n - 1) // 2, 3 * n // 4})
+        values.partition(ranks)
+        median = values[n // 2] if n % 2 == 1 else (values[n // 2 - 1] + values[n // 2]) / 2
+        return float(values[n // 4]), float(median), float(values[3 * n // 4])
+
+    def result(self):
+        q1, median, q3 = self.quartiles()
+        std_deviation = math.sqrt(self.variance)
+        return {
+            "median": median,
+            "q1": q1,
+            "q3": q3,
+            "iqr": q3 - q1 if q1 is not None else None,
+            "std_deviation": std_deviation,
+            "coefficient_of_variation": std_deviation / self.mean if self.mean != 0 else 0,
+        }
+
+class StatsAggregate:
+    """SQLite aggregate: ts_stats(value) returns the StreamingStats result as JSON."""
+
+    def __init__(self):
+        self.stats = StreamingStats()
+
+    def step(self, value):
+        self.stats.add(value)
+
+    def finalize(self):
+        return json.dumps(self.stats.result())
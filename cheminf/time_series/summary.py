@@ -0,0 +1,101 @@
+"""
+Time Series Summary Table
+Per-series COUNT/MIN/MAX/SUM kept in {prefix}time_series_summary, keyed by
+(experiment_id, series_name, parameter_name, unit). Listing endpoints read this
+table instead of aggregating the raw points, so they cost O(series) not O(points).
+
+The table is updated in the same transaction as every insert into time_series and
+can be rebuilt from the raw data at any time with rebuild_summary().
+"""
+
+from cheminf.config import DB_PREFIX
+
+SUMMARY_TABLE = f"{DB_PREFIX}time_series_summary"
+TIME_SERIES_TABLE = f"{DB_PREFIX}time_series"
+
+CREATE_SUMMARY_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+    experiment_id INTEGER NOT NULL,
+    series_name VARCHAR(100),
+    parameter_name VARCHAR(50),
+    unit VARCHAR(20),
+    data_points INTEGER NOT NULL,
+    value_count INTEGER NOT NULL,
+    start_time DATETIME,
+    end_time DATETIME,
+    min_value REAL,
+    max_value REAL,
+    sum_value REAL,
+    UNIQUE (experiment_id, series_name, parameter_name, unit)
+)
+"""
+
+# Columns shared by the listing queries; avg uses value_count so NULL values are ignored like AVG()
+SUMMARY_COLUMNS = """series_name, parameter_name, unit,
+                   data_points,
+                   start_time,
+                   end_time,
+                   min_value,
+                   max_value,
+                   sum_value / value_count as avg_value"""
+
+def table_exists(connection, table):
+    row = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+def ensure_summary_table(connection):
+    """
+    Create the summary table if needed, filling it from the raw data on first creation.
+    A database without a time_series table (e.g. from init_sqlite.py) gets an empty one.
+    """
+    if table_exists(connection, SUMMARY_TABLE):
+        return False
+    connection.execute(CREATE_SUMMARY_TABLE)
+    if table_exists(connection, TIME_SERIES_TABLE):
+        rebuild_summary(connection)
+    return True
+
+def rebuild_summary(connection):
+    """Recompute the whole summary table from time_series; returns the number of series."""
+    connection.execute(f"DELETE FROM {SUMMARY_TABLE}")
+    cursor = connection.execute(f"""
+        INSERT INTO {SUMMARY_TABLE}
+        (experiment_id, series_name, parameter_name, unit, data_points, value_count,
+         start_time, end_time, min_value, max_value, sum_value)
+        SELECT experiment_id, series_name, parameter_name, unit, COUNT(*), COUNT(value),
+               MIN(timestamp), MAX(timestamp), MIN(value), MAX(value), SUM(value)
+        FROM {TIME_SERIES_TABLE}
+        GROUP BY experiment_id, series_name, parameter_name, unit
+    """)
+    connection.commit()
+    return cursor.rowcount
+
+def update_summary(connection, inserted_count):
+    """
+    Fold the rows just inserted into time_series into the summary table (caller commits).
+    Must run in the inserting transaction: the new rows are the last inserted_count
+    series_ids. The delta is aggregated in SQL, so MIN/MAX treat NULL and mixed-type
+    timestamps exactly as rebuild_summary() does.
+    """
+    last_id = connection.execute(f"SELECT MAX(series_id) FROM {TIME_SERIES_TABLE}").fetchone()[0]
+    connection.execute(f"""
+        INSERT INTO {SUMMARY_TABLE}
+        (experiment_id, series_name, parameter_name, unit, data_points, value_count,
+         start_time, end_time, min_value, max_value, sum_value)
+        SELECT experiment_id, series_name, parameter_name, unit, COUNT(*), COUNT(value),
+               MIN(timestamp), MAX(timestamp), MIN(value), MAX(value), SUM(value)
+        FROM {TIME_SERIES_TABLE}
+        WHERE series_id > ?
+        GROUP BY experiment_id, series_name, parameter_name, unit
+        ON CONFLICT (experiment_id, series_name, parameter_name, unit) DO UPDATE SET
+            data_points = data_points + excluded.data_points,
+            value_count = value_count + excluded.value_count,
+            start_time = MIN(COALESCE(start_time, excluded.start_time), COALESCE(excluded.start_time, start_time)),
+            end_time = MAX(COALESCE(end_time, excluded.end_time), COALESCE(excluded.end_time, end_time)),
+            min_value = MIN(COALESCE(min_value, excluded.min_value), COALESCE(excluded.min_value, min_value)),
+            max_value = MAX(COALESCE(max_value, excluded.max_value), COALESCE(excluded.max_value, max_value)),
+            sum_value = CASE WHEN sum_value IS NULL THEN excluded.sum_value
+                             ELSE sum_value + COALESCE(excluded.sum_value, 0) END
+    """, (last_id - inserted_count,))
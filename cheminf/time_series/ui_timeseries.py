@@ -7,6 +7,13 @@ import pandas as pd
 from cheminf.app_server import server
 from cheminf.db.db import execute_query
 from cheminf.config import DB_PREFIX
+from cheminf.time_series.downsampling import downsample_rows
+from cheminf.time_series.summary import SUMMARY_TABLE
+from itertools import groupby
+from cheminf.ui_utils import lazy_layout
+
+# Maximum points drawn per trace; longer series are downsampled server-side
+CHART_MAX_POINTS = 2000
 
 external_stylesheets = ['/static/styles.css']
 
@@ -20,10 +27,10 @@ def get_all_experiments():
     """Get all experiments that have time series data"""
     try:
         query = f"""
-        SELECT DISTINCT e.experiment_id, e.experiment_name, e.description,
-               COUNT(ts.series_id) as series_count
+        SELECT e.experiment_id, e.experiment_name, e.description,
+               SUM(s.data_points) as series_count
         FROM {DB_PREFIX}experiments e
-        JOIN {DB_PREFIX}time_series ts ON e.experiment_id = ts.experiment_id
+        JOIN {SUMMARY_TABLE} s ON e.experiment_id = s.experiment_id
         GROUP BY e.experiment_id, e.experiment_name, e.description
         ORDER BY e.experiment_name
         """
@@ -36,13 +43,12 @@ def get_series_for_experiment(experiment_id):
     """Get all time series for a specific experiment"""
     try:
         query = f"""
-        SELECT DISTINCT series_name, parameter_name, unit,
-               COUNT(*) as data_points,
-               MIN(timestamp) as start_time,
-               MAX(timestamp) as end_time
-        FROM {DB_PREFIX}time_series
+        SELECT series_name, parameter_name, unit,
+               data_points,
+               start_time,
+               end_time
+        FROM {SUMMARY_TABLE}
         WHERE experiment_id = ?
-        GROUP BY series_name, parameter_name, unit
         ORDER BY parameter_name
         """
         return execute_query(query, (experiment_id,))
@@ -76,7 +82,7 @@ def get_time_series_data(experiment_id, parameters=None):
         print(f"Error getting time series data: {e}")
         return []
 
-def create_line_chart(experiment_id, selected_parameters):
+def create_line_chart(experiment_id, selected_parameters, downsampling="lttb"):
     """Create a line chart for selected parameters"""
     if not experiment_id or not selected_parameters:
         return {}
@@ -85,6 +91,14 @@ def create_line_chart(experiment_id, selected_parameters):
     if not data:
         return {}
     
+    # Rows are ordered by parameter, so each group is one trace
+    if downsampling and downsampling != "none":
+        data = [
+            row
+            for _, param_rows in groupby(data, key=lambda r: r['parameter_name'])
+            for row in downsample_rows(list(param_rows), CHART_MAX_POINTS, downsampling)
+        ]
+    
     # Convert to DataFrame for easier manipulation
     df = pd.DataFrame(data, columns=['series_name', 'parameter_name', 'time_step', 'timestamp', 'value', 'unit'])
     
@@ -151,73 +165,90 @@ def create_line_chart(experiment_id, selected_parameters):
     
     return fig
 
-app.layout = html.Div([
-    html.Header([
-        html.H1("ChemINF-EDU - Time Series Analysis", style={"color": "white"})
-    ], className="header"),
+def build_layout(experiments):
+    """Page layout, built per request so the experiment dropdown lists current experiments."""
+    return html.Div([
+        html.Header([
+            html.H1("ChemINF-EDU - Time Series Analysis", style={"color": "white"})
+        ], className="header"),
     
-    html.Div([
         html.Div([
-            html.H2("Experiment Selection"),
-            dcc.Dropdown(
-                id="experiment-dropdown",
-                options=[
-                    {"label": f"{exp['experiment_name']} ({exp['series_count']} series)", "value": exp['experiment_id']} 
-                    for exp in get_all_experiments()
-                ],
-                placeholder="Select experiment...",
-                style={"marginBottom": "20px"}
-            ),
-        ], className="input-section"),
+            html.Div([
+                html.H2("Experiment Selection"),
+                dcc.Dropdown(
+                    id="experiment-dropdown",
+                    options=[
+                        {"label": f"{exp['experiment_name']} ({exp['series_count']} series)", "value": exp['experiment_id']} 
+                        for exp in experiments
+                    ],
+                    placeholder="Select experiment...",
+                    style={"marginBottom": "20px"}
+                ),
+            ], className="input-section"),
         
-        html.Div([
-            html.H2("Parameter Selection"),
-            dcc.Checklist(
-                id="parameter-checklist",
-                options=[],
-                value=[],
-                inline=False,
-                style={"marginBottom": "20px"}
-            ),
-            html.Button("Update Chart", id="update-chart-btn", n_clicks=0, className="button"),
-        ], className="input-section"),
+            html.Div([
+                html.H2("Parameter Selection"),
+                dcc.Checklist(
+                    id="parameter-checklist",
+                    options=[],
+                    value=[],
+                    inline=False,
+                    style={"marginBottom": "20px"}
+                ),
+                html.Label("Downsampling:"),
+                dcc.Dropdown(
+                    id="downsampling-dropdown",
+                    options=[
+                        {"label": "Largest-Triangle-Three-Buckets", "value": "lttb"},
+                        {"label": "Min/Max per bucket", "value": "minmax"},
+                        {"label": "Mean per bucket", "value": "mean"},
+                        {"label": "None (all points)", "value": "none"}
+                    ],
+                    value="lttb",
+                    clearable=False,
+                    style={"marginBottom": "20px"}
+                ),
+                html.Button("Update Chart", id="update-chart-btn", n_clicks=0, className="button"),
+            ], className="input-section"),
         
-        html.Div([
-            html.H2("Time Series Chart"),
-            dcc.Graph(
-                id="timeseries-chart",
-                figure={},
-                style={"height": "600px"}
-            )
-        ], className="table-section"),
+            html.Div([
+                html.H2("Time Series Chart"),
+                dcc.Graph(
+                    id="timeseries-chart",
+                    figure={},
+                    style={"height": "600px"}
+                )
+            ], className="table-section"),
         
-        html.Div([
-            html.H2("Series Information"),
-            dash_table.DataTable(
-                id="series-info-table",
-                columns=[
-                    {"name": "Parameter", "id": "parameter_name"},
-                    {"name": "Unit", "id": "unit"},
-                    {"name": "Data Points", "id": "data_points"},
-                    {"name": "Start Time", "id": "start_time"},
-                    {"name": "End Time", "id": "end_time"}
-                ],
-                data=[],
-                style_cell={'textAlign': 'left'},
-                style_header={'backgroundColor': '#333', 'color': 'white', 'fontWeight': 'bold'},
-                style_data={'backgroundColor': '#1f1f1f', 'color': '#e0e0e0'},
-            )
-        ], className="table-section"),
+            html.Div([
+                html.H2("Series Information"),
+                dash_table.DataTable(
+                    id="series-info-table",
+                    columns=[
+                        {"name": "Parameter", "id": "parameter_name"},
+                        {"name": "Unit", "id": "unit"},
+                        {"name": "Data Points", "id": "data_points"},
+                        {"name": "Start Time", "id": "start_time"},
+                        {"name": "End Time", "id": "end_time"}
+                    ],
+                    data=[],
+                    style_cell={'textAlign': 'left'},
+                    style_header={'backgroundColor': '#333', 'color': 'white', 'fontWeight': 'bold'},
+                    style_data={'backgroundColor': '#1f1f1f', 'color': '#e0e0e0'},
+                )
+            ], className="table-section"),
         
-        html.Div(id="timeseries-status", className="status-message"),
+            html.Div(id="timeseries-status", className="status-message"),
         
-        html.Div([
-            html.A("← Back to Home", href="/", className="nav-link"),
-            html.A("View Experiments →", href="/experiments/", className="nav-link", style={"marginLeft": "20px"}),
-        ], className="navigation")
+            html.Div([
+                html.A("← Back to Home", href="/", className="nav-link"),
+                html.A("View Experiments →", href="/experiments/", className="nav-link", style={"marginLeft": "20px"}),
+            ], className="navigation")
         
-    ], className="container")
-])
+        ], className="container")
+    ])
+
+app.layout = lazy_layout(build_layout, experiments=get_all_experiments)
 
 @app.callback(
     [Output("parameter-checklist", "options"),
@@ -249,9 +280,10 @@ def update_parameter_options(experiment_id):
      Output("timeseries-status", "children")],
     [Input("update-chart-btn", "n_clicks")],
     [State("experiment-dropdown", "value"),
-     State("parameter-checklist", "value")]
+     State("parameter-checklist", "value"),
+     State("downsampling-dropdown", "value")]
 )
-def update_chart(n_clicks, experiment_id, selected_parameters):
+def update_chart(n_clicks, experiment_id, selected_parameters, downsampling):
     """Update the time series chart"""
     if not experiment_id or not selected_parameters:
         return {}, "Please select an experiment and parameters"
@@ -260,7 +292,7 @@ def update_chart(n_clicks, experiment_id, selected_parameters):
         return {}, "Please select up to 4 parameters maximum"
     
     try:
-        fig = create_line_chart(experiment_id, selected_parameters)
+        fig = create_line_chart(experiment_id, selected_parameters, downsampling)
         if not fig:
             return {}, "No data available for selected parameters"
         
@@ -0,0 +1,21 @@
+"""
+Helpers shared by the Dash pages.
+"""
+
+from flask import has_request_context
+
+def lazy_layout(build, **loaders):
+    """
+    Turn build(**data) into a Dash layout function that runs the loaders on every page load,
+    e.g. app.layout = lazy_layout(build_layout, experiments=get_all_experiments).
+
+    Dash calls a layout function once when it is assigned, to validate it; that call happens
+    outside any request, so it gets [] for every loader instead of querying the database.
+    """
+    def serve_layout():
+        if has_request_context():
+            data = {name: load() for name, load in loaders.items()}
+        else:
+            data = {name: [] for name in loaders}
+        return build(**data)
+    return serve_layout
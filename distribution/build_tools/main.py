@@ -9,6 +9,7 @@ It provides a unified interface for running the application as a standalone exec
 
 import sys
 import os
+import multiprocessing
 import threading
 import webbrowser
 from pathlib import Path
@@ -118,7 +119,8 @@ def main():
     try:
         # Import and start the Flask application
         print("Starting ChemINF-EDU server...")
-        from cheminf.app import server
+        from cheminf.app import init_app
+        server = init_app()
         
         # Start browser in background thread
         browser_thread = threading.Thread(target=open_browser, daemon=True)
@@ -151,5 +153,8 @@ def main():
         return 1
 
 if __name__ == "__main__":
+    # Frozen build: let spawned worker processes (depiction, descriptors, bulk import)
+    # run their task instead of starting the application again
+    multiprocessing.freeze_support()
     exit_code = main()
     sys.exit(exit_code)
\ No newline at end of file
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Cheminf-EDU Benchmarks
+======================
+
+Small, self-contained performance checks for the Cheminf-EDU backend.
+
+Usage:
+    python scripts/benchmark.py db-pool                  # Queries/s with and without the connection pool
+    python scripts/benchmark.py db-pool --threads 8      # Same, with 8 concurrent worker threads
+    python scripts/benchmark.py molecule-crud            # Molecule CRUD ops/s: legacy SQL vs repository
+    python scripts/benchmark.py app-startup --queries 5  # Seconds to import cheminf.app and run init_app(), best of 5 runs
+    python scripts/benchmark.py plotly-json --queries 50000  # plotly_json build time/size for a 50k-point trace
+    python scripts/benchmark.py arrow-export --queries 200000  # Export size and pandas parse time: CSV vs Arrow/Parquet
+    python scripts/benchmark.py ingest --queries 200000 --threads 16  # Points/s: per-request commits vs ingest writer
+    python scripts/benchmark.py stream-parse --queries 200000  # Bytes and parse time per point: JSON document vs NDJSON vs line protocol
+"""
+
+import sys
+import time
+import shutil
+import subprocess
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+# Add project root to Python path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+def _run_threads(worker, threads, queries):
+    """Run `queries` calls of worker() split across `threads` threads and return queries/s."""
+    per_thread = max(1, queries // threads)
+
+    def loop():
+        for _ in range(per_thread):
+            worker()
+
+    pool = [threading.Thread(target=loop) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return (per_thread * threads) / elapsed
+
+def benchmark_db_pool(queries=5000, threads=4):
+    """Compare a connect-per-query baseline with the pooled get_db_connection()."""
+    from cheminf.db import db
+
+    query = f"SELECT * FROM {db.TABLE_NAME} WHERE id = ?"
+
+    def unpooled():
+        connection = db.connect(pooled=False)
+        try:
+            connection.execute(query, (1,)).fetchall()
+        finally:
+            connection.close()
+
+    def pooled():
+        db.execute_query(query, (1,))
+
+    before = _run_threads(unpooled, threads, queries)
+    after = _run_threads(pooled, threads, queries)
+    stats = db.get_pool().stats()
+    db.close_pool()
+
+    print(f"\n📊 Connection pool benchmark ({queries} queries, {threads} threads)")
+    print(f"   Without pool: {before:,.0f} queries/s")
+    print(f"   With pool:    {after:,.0f} queries/s")
+    print(f"   Speed-up:     {after / before:.1f}x")
+    print(f"   Pool: {stats['open']} open connections (max {stats['max_size']})")
+    return {"before_qps": before, "after_qps": after}
+
+def _timed(operation, count):
+    """Run operation() once and return count / elapsed seconds."""
+    start = time.perf_counter()
+    operation()
+    return count / (time.perf_counter() - start)
+
+def benchmark_molecule_crud(queries=5000, threads=4):
+    """
+    Molecule create/read/update/delete throughput on a scratch copy of the database:
+    one connection and commit per statement (the old UI/REST code path), the
+    repository one row at a time, and the repository's batch methods.
+    Runs single-threaded; threads is accepted for a uniform command line.
+    """
+    from cheminf.db import db
+    from cheminf.molecules.structure import ensure_structure_columns
+    from cheminf.molecules.descriptors import ensure_descriptor_table
+    from cheminf.molecules.fingerprints import ensure_fingerprint_table
+
+    scratch = Path(tempfile.mkdtemp(prefix='cheminf-bench-'))
+    db.close_pool()
+    shutil.copy(db.DB_PATH, scratch / 'bench.db')
+    db.DB_PATH = scratch / 'bench.db'
+    try:
+        with db.transaction() as connection:
+            ensure_structure_columns(connection)
+            ensure_descriptor_table(connection)
+            ensure_fingerprint_table(connection)
+        from cheminf.molecules.repository import MoleculeRepository, TABLE_COLUMNS
+        repo = MoleculeRepository()
+        table = db.TABLE_NAME
+        names = [f"bench-{i}" for i in range(queries)]
+
+        def legacy(sql, params_list):
+            def run():
+                for params in params_list:
+                    connection = db.connect(pooled=False)
+                    cursor = connection.execute(sql, params)
+                    cursor.fetchall()
+                    connection.commit()
+                    connection.close()
+            return run
+
+        results = {}
+        legacy_ids = []
+        start = time.perf_counter()
+        for name in names:
+            connection = db.connect(pooled=False)
+            legacy_ids.append(connection.execute(f"INSERT INTO {table} (MoleculeUpacName) VALUES (?)", (name,)).lastrowid)
+            connection.commit()
+            connection.close()
+        results['legacy'] = {
+            'create': queries / (time.perf_counter() - start),
+            'read': _timed(legacy(f"SELECT * FROM {table} WHERE id = ?", [(i,) for i in legacy_ids]), queries),
+            'update': _timed(legacy(f"UPDATE {table} SET MoleculeUpacName = ? WHERE id = ?",
+                                    [(name + '-x', i) for name, i in zip(names, legacy_ids)]), queries),
+            'delete': _timed(legacy(f"DELETE FROM {table} WHERE id = ?", [(i,) for i in legacy_ids]), queries),
+        }
+
+        ids = []
+        start = time.perf_counter()
+        for name in names:
+            ids.append(repo.create(name))
+        results['repository'] = {
+            'create': queries / (time.perf_counter() - start),
+            'read': _timed(lambda: [repo.get(i, TABLE_COLUMNS) for i in ids], queries),
+            'update': _timed(lambda: [repo.update(i, name + '-x') for name, i in zip(names, ids)], queries),
+            'delete': _timed(lambda: [repo.delete(i) for i in ids], queries),
+        }
+
+        created = []
+        results['batched'] = {
+            'create': _timed(lambda: created.extend(repo.create_many([(name, None) for name in names])), queries),
+            'read': _timed(lambda: repo.get_many(created, TABLE_COLUMNS), queries),
+            'update': _timed(lambda: repo.rename_many({i: name + '-x' for name, i in zip(names, created)}), queries),
+            'delete': _timed(lambda: repo.delete_many(created), queries),
+        }
+    finally:
+        db.close_pool()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"\n📊 Molecule CRUD benchmark ({queries} rows, ops/s)")
+    print(f"   {'':<12}{'create':>10}{'read':>10}{'update':>10}{'delete':>10}")
+    for label, ops in results.items():
+        print(f"   {label:<12}" + ''.join(f"{ops[op]:>10,.0f}" for op in ('create', 'read', 'update', 'delete')))
+    return results
+
+STARTUP_SCRIPT = """
+import sys, time
+from cheminf.db import db
+db.DB_PATH = sys.argv[1]
+start = time.perf_counter()
+import cheminf.app
+cheminf.app.init_app()
+print(time.perf_counter() - start)
+"""
+
+def benchmark_app_startup(queries=5, threads=4):
+    """
+    Time `import cheminf.app` plus init_app() (Dash pages, REST blueprints, schema checks) in a fresh
+    interpreter, `queries` times, against a scratch copy of the database. The first
+    run also pays the one-off migrations of that copy, so best and median are reported.
+    threads is accepted for a uniform command line.
+    """
+    from cheminf.db import db
+
+    runs = max(1, min(queries, 20))  # --queries defaults to 5000
+    scratch = Path(tempfile.mkdtemp(prefix='cheminf-bench-'))
+    shutil.copy(db.DB_PATH, scratch / 'bench.db')
+    try:
+        timings = []
+        for _ in range(runs):
+            result = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, str(scratch / 'bench.db')],
+                                    cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+            timings.append(float(result.stdout.strip().splitlines()[-1]))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    timings.sort()
+    print(f"\n📊 App startup benchmark ({runs} runs of `import cheminf.app` + init_app())")
+    print(f"   Best:   {timings[0]:.3f} s")
+    print(f"   Median: {timings[len(timings) // 2]:.3f} s")
+    print(f"   Worst:  {timings[-1]:.3f} s")
+    return {"best_s": timings[0], "median_s": timings[len(timings) // 2]}
+
+def benchmark_plotly_json(queries=50000, threads=4):
+    """
+    Build the plotly_json body of one `queries`-point trace from a scratch copy of the
+    database: row dicts appended to lists and json.dumps'd (the old path) versus
+    columnar NumPy reads encoded by plotly_traces.dumps(), plain and base64.
+    Reports the best of 3 runs (fetch + encode) and the payload size.
+    threads is accepted for a uniform command line.
+    """
+    import json
+    from cheminf.db import db
+    from cheminf.time_series import plotly_traces
+
+    scratch = Path(tempfile.mkdtemp(prefix='cheminf-bench-'))
+    db.close_pool()
+    shutil.copy(db.DB_PATH, scratch / 'bench.db')
+    db.DB_PATH = scratch / 'bench.db'
+    try:
+        experiment_id = db.execute_query(f"SELECT COALESCE(MAX(experiment_id), 0) + 1 AS id "
+                                         f"FROM {db.DB_PREFIX}time_series")[0]['id']
+        db.execute_many(
+            f"INSERT INTO {db.DB_PREFIX}time_series "
+            f"(experiment_id, series_name, parameter_name, time_step, timestamp, value, unit, notes) "
+            f"VALUES (?, 'bench', 'Temperature', ?, '2025-01-01T00:00:00Z', ?, 'C', '')",
+            [(experiment_id, step, 20 + (step % 977) / 7.0) for step in range(1, queries + 1)]
+        )
+        query = (f"SELECT {{}} FROM {db.DB_PREFIX}time_series "
+                 f"WHERE experiment_id = ? AND parameter_name IS ? ORDER BY time_step")
+        params = [experiment_id, 'Temperature']
+
+        def legacy():
+            trace = None
+            for row in db.execute_query(query.format("parameter_name, time_step, value, unit"), params):
+                if trace is None:
+                    trace = {'x': [], 'y': [], 'name': f"{row['parameter_name']} ({row['unit']})",
+                             'type': 'scatter', 'mode': 'lines+markers', 'unit': row['unit']}
+                trace['x'].append(row['time_step'])
+                trace['y'].append(row['value'])
+            return json.dumps({"data": {"plotly_traces": [trace]}}).encode('utf-8')
+
+        def columnar(encoding):
+            def run():
+                x, y = plotly_traces.fetch_xy(query.format("time_step, value"), params)
+                trace = plotly_traces.plotly_trace('Temperature', 'C', x, y, encoding)
+                return plotly_traces.dumps({"data": {"plotly_traces": [trace]}})
+            return run
+
+        results = {}
+        for label, build in (('rows + json', legacy), ('columnar', columnar('json')),
+                             ('columnar b64', columnar('base64'))):
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                body = build()
+                timings.append(time.perf_counter() - start)
+            results[label] = {'ms': min(timings) * 1000, 'bytes': len(body)}
+    finally:
+        db.close_pool()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    encoder = 'orjson' if plotly_traces.orjson is not None else 'json (orjson not installed)'
+    print(f"\n📊 plotly_json benchmark ({queries} points, encoder: {encoder})")
+    for label, result in results.items():
+        print(f"   {label:<14}{result['ms']:>9.1f} ms{result['bytes']:>12,} bytes")
+    return results
+
+def benchmark_arrow_export(queries=200000, threads=4):
+    """
+    Export `queries` time series points from a scratch copy of the database as CSV,
+    Arrow IPC and Parquet: server-side build time, transfer size, and the time pandas
+    takes to load each body. threads is accepted for a uniform command line.
+    """
+    import io
+    import pandas as pd
+    from cheminf.db import db
+    from cheminf.time_series import arrow_export
+    from cheminf.time_series.serializers import stream_csv
+
+    arrow_export.require_pyarrow('arrow')
+    pa = arrow_export.pa
+    scratch = Path(tempfile.mkdtemp(prefix='cheminf-bench-'))
+    db.close_pool()
+    shutil.copy(db.DB_PATH, scratch / 'bench.db')
+    db.DB_PATH = scratch / 'bench.db'
+    try:
+        prefix = db.DB_PREFIX
+        experiment_id = db.execute_query(f"SELECT MIN(experiment_id) AS id FROM {prefix}experiments")[0]['id']
+        parameters = [('Temperature', '°C'), ('Pressure', 'bar'), ('pH', ''), ('Yield', '%')]
+        db.execute_many(
+            f"INSERT INTO {prefix}time_series "
+            f"(experiment_id, series_name, parameter_name, time_step, timestamp, value, unit, notes) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?, '')",
+            [(experiment_id, f"bench-{name}", name, 10 ** 6 + step, f"2025-01-01T00:00:{step % 60:02d}Z",
+              20 + (step % 977) / 7.0, unit)
+             for step in range(queries // len(parameters)) for name, unit in parameters]
+        )
+        query = f"""
+        SELECT e.experiment_name, ts.experiment_id, ts.series_name, ts.parameter_name,
+               ts.time_step, ts.timestamp, ts.value, ts.unit, ts.notes
+        FROM {prefix}time_series ts
+        JOIN {prefix}experiments e ON ts.experiment_id = e.experiment_id
+        WHERE ts.experiment_id = ? AND ts.series_name LIKE 'bench-%'
+        ORDER BY ts.experiment_id, ts.parameter_name, ts.time_step
+        """
+        params = [experiment_id]
+
+        builders = {
+            'csv': (lambda: ''.join(stream_csv(db.iter_query(query, params))).encode('utf-8'),
+                    lambda body: pd.read_csv(io.BytesIO(body), low_memory=False)),
+            'arrow': (lambda: b''.join(arrow_export.stream_arrow(arrow_export.cursor_batches([(query, params)]), 'arrow')),
+                      lambda body: pa.ipc.open_stream(body).read_pandas()),
+            'parquet': (lambda: b''.join(arrow_export.stream_arrow(arrow_export.cursor_batches([(query, params)]), 'parquet')),
+                        lambda body: pd.read_parquet(io.BytesIO(body))),
+        }
+        results = {}
+        for label, (build, parse) in builders.items():
+            start = time.perf_counter()
+            body = build()
+            built = time.perf_counter() - start
+            start = time.perf_counter()
+            rows = len(parse(body))
+            results[label] = {'build_ms': built * 1000, 'parse_ms': (time.perf_counter() - start) * 1000,
+                              'bytes': len(body), 'rows': rows}
+    finally:
+        db.close_pool()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"\n📊 Time series export benchmark ({results['csv']['rows']:,} points)")
+    print(f"   {'':<10}{'build':>11}{'size':>15}{'pandas load':>14}")
+    for label, result in results.items():
+        print(f"   {label:<10}{result['build_ms']:>8.0f} ms{result['bytes']:>15,}{result['parse_ms']:>11.0f} ms")
+    return results
+
+def benchmark_ingest(queries=200000, threads=16, request_points=50):
+    """
+    Time series ingest on a scratch copy of the database: `threads` instruments each
+    POST-ing JSON bodies of `request_points` points until `queries` points are stored.
+    The old path parses, validates and commits every request in its own transaction;
+    the new one queues it for the coalescing ingest writer and waits for the commit.
+    """
+    import json
+    from cheminf.db import db
+    from cheminf.time_series import ingest
+    from cheminf.time_series.rollups import ensure_rollup_table, update_rollups
+    from cheminf.time_series.summary import ensure_summary_table, update_summary
+
+    scratch = Path(tempfile.mkdtemp(prefix='cheminf-bench-'))
+    db.close_pool()
+    shutil.copy(db.DB_PATH, scratch / 'bench.db')
+    db.DB_PATH = scratch / 'bench.db'
+    with db.transaction() as connection:
+        ensure_summary_table(connection)
+        ensure_rollup_table(connection)
+    requests_per_thread = max(1, queries // (threads * request_points))
+
+    def bodies(instrument, offset):
+        for r in range(requests_per_thread):
+            start = offset + r * request_points
+            yield json.dumps({"data_points": [
+                {"parameter_name": f"Sensor-{instrument}", "value": 20 + (step % 97) / 10, "unit": "C",
+                 "timestamp": f"2025-02-01T{(step // 3600) % 24:02d}:{(step // 60) % 60:02d}:{step % 60:02d}Z",
+                 "time_step": step}
+                for step in range(start, start + request_points)
+            ]}).encode('utf-8')
+
+    def legacy(body):
+        rows = ingest.prepare_points(1, json.loads(body)['data_points'])
+        with db.transaction() as connection:
+            connection.executemany(ingest.INSERT_POINTS, rows)
+            update_summary(connection, len(rows))
+            update_rollups(connection, len(rows))
+
+    def queued(body):
+        ingest.get_writer().submit(ingest.prepare_points(1, ingest.loads(body)['data_points'])).wait()
+
+    def run(post, offset):
+        payloads = [list(bodies(instrument, offset)) for instrument in range(threads)]
+        workers = [threading.Thread(target=lambda p=p: [post(body) for body in p]) for p in payloads]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return threads * requests_per_thread * request_points / (time.perf_counter() - start)
+
+    try:
+        before = run(legacy, 0)
+        after = run(queued, 10 ** 7)
+        metrics = ingest.get_writer().metrics()
+        ingest.stop_writer()
+    finally:
+        db.close_pool()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    points = threads * requests_per_thread * request_points
+    print(f"\n📊 Ingest benchmark ({points:,} points, {threads} threads, {request_points} points/request)")
+    print(f"   Commit per request: {before:,.0f} points/s")
+    print(f"   Ingest writer:      {after:,.0f} points/s ({metrics['written_batches']} transactions, "
+          f"lag p50 {metrics['lag_p50_s']} s, p99 {metrics['lag_p99_s']} s)")
+    return {"before_pps": before, "after_pps": after, "metrics": metrics}
+
+def benchmark_stream_parse(queries=200000, threads=4):
+    """
+    Bytes on the wire and parse + validate time per point for the same readings sent
+    as one {"data_points": [...]} document (POST .../data), as NDJSON and as line
+    protocol (POST .../stream). Parsing only; nothing is written to the database.
+    """
+    import io
+    import json
+    from cheminf.time_series import ingest
+    from cheminf.time_series.stream_ingest import PARSERS, iter_blocks
+
+    points = [{"parameter_name": "Temperature", "value": round(20 + (i % 997) / 10, 1), "unit": "C",
+               "timestamp": f"2025-02-01T{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}Z", "time_step": i}
+              for i in range(queries)]
+    bodies = {
+        'JSON document': json.dumps({"data_points": points}).encode('utf-8'),
+        'NDJSON': b''.join(json.dumps(point).encode('utf-8') + b'\n' for point in points),
+        'Line protocol': ''.join(f"{p['parameter_name']},unit={p['unit']} {p['value']} {p['timestamp']} {p['time_step']}\n"
+                                 for p in points).encode('utf-8'),
+    }
+
+    def parse_document(body):
+        return ingest.prepare_points(1, ingest.loads(body)['data_points'])
+
+    def parse_lines(format_type):
+        parse = PARSERS[format_type]
+        return lambda body: [parse(1, line, number) for number, line in
+                             enumerate((line for lines in iter_blocks(io.BytesIO(body)) for line in lines), 1)]
+
+    parsers = {'JSON document': parse_document, 'NDJSON': parse_lines('ndjson'), 'Line protocol': parse_lines('line')}
+    results = {}
+    print(f"\n📊 Ingest parse benchmark ({queries:,} points)")
+    for name, body in bodies.items():
+        best = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            rows = parsers[name](body)
+            best = min(best, time.perf_counter() - start)
+        assert len(rows) == queries
+        results[name] = {"bytes_per_point": len(body) / queries, "us_per_point": best / queries * 1e6}
+        print(f"   {name:14s} {len(body) / queries:6.1f} bytes/point  {best / queries * 1e6:5.2f} µs/point  "
+              f"(peak memory: {'whole body' if name == 'JSON document' else 'one line'})")
+    return results
+
+BENCHMARKS = {
+    'db-pool': benchmark_db_pool,
+    'molecule-crud': benchmark_molecule_crud,
+    'app-startup': benchmark_app_startup,
+    'plotly-json': benchmark_plotly_json,
+    'arrow-export': benchmark_arrow_export,
+    'ingest': benchmark_ingest,
+    'stream-parse': benchmark_stream_parse,
+}
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Cheminf-EDU Benchmarks',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS), help='Benchmark to run')
+    parser.add_argument('--queries', type=int, default=5000, help='Number of operations (default: 5000)')
+    parser.add_argument('--threads', type=int, default=4, help='Concurrent worker threads (default: 4)')
+    args = parser.parse_args()
+
+    BENCHMARKS[args.benchmark](queries=args.queries, threads=args.threads)
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,9 @@ Usage:
     python scripts/run.py --module molecules # Start specific module
     python scripts/run.py --init-db         # Initialize database only
     python scripts/run.py --test-db         # Test database connection
+    python scripts/run.py --rebuild-summary # Rebuild time series summary/rollup tables
+    python scripts/run.py --sync-descriptors # Compute missing molecular descriptors
+    python scripts/run.py --import-molecules FILE # Bulk import a .sdf/.smi/.csv file
     python scripts/run.py --help            # Show help
 
 Requirements:
@@ -84,6 +87,27 @@ def test_database():
         print(f"   Inventory Items: {inventory[0]['count']}")
         print(f"   Experiments: {experiments[0]['count']}")
         
+        # Verify that the hot query paths use indexes instead of table scans, as the
+        # database is (indexes are not created first, so a missing one fails the test)
+        from cheminf.db.indexes import missing_indexes, check_query_plans
+        conn = get_db_connection()
+        try:
+            missing = missing_indexes(conn)
+            plan_results = check_query_plans(conn)
+        finally:
+            conn.close()
+        if missing:
+            print(f"\n⚠️  Missing indexes (created when the application starts): "
+                  f"{', '.join(name for name, _, _ in missing)}")
+        print("\n🔍 Query plans:")
+        plans_ok = True
+        for description, ok, plan in plan_results:
+            print(f"   {'✅' if ok else '❌'} {description}: {'; '.join(plan)}")
+            plans_ok = plans_ok and ok
+        if not plans_ok:
+            print("\n❌ Database test failed: a query does not use its index")
+            return False
+        
         print("\n✅ Database test completed successfully!")
         return True
         
@@ -93,6 +117,72 @@ def test_database():
         traceback.print_exc()
         return False
 
+def rebuild_summaries():
+    """Rebuild the time series summary and rollup tables from the raw data points."""
+    try:
+        print("Rebuilding time series summary and rollup tables...")
+        from cheminf.db.db import transaction
+        from cheminf.time_series.summary import ensure_summary_table, rebuild_summary
+        from cheminf.time_series.rollups import ensure_rollup_table, rebuild_rollups
+        with transaction() as conn:
+            ensure_summary_table(conn)
+            series = rebuild_summary(conn)
+            ensure_rollup_table(conn)
+            buckets = rebuild_rollups(conn)
+        print(f"✅ Summary rebuilt for {series} series, {buckets} rollup buckets")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to rebuild summary tables: {e}")
+        return False
+
+def sync_descriptors():
+    """Compute descriptors for every molecule that has none or changed (process pool)."""
+    try:
+        print("Computing molecular descriptors...")
+        from cheminf.db.db import transaction
+        from cheminf.molecules.descriptors import ensure_descriptor_table, sync_descriptors as sync
+        with transaction() as conn:
+            ensure_descriptor_table(conn)
+        count = sync()
+        print(f"✅ Descriptors computed for {count} molecules")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to compute descriptors: {e}")
+        return False
+
+def import_molecules(path, fmt=None):
+    """Bulk import molecules from a .sdf, .smi or .csv file with a progress line."""
+    try:
+        from cheminf.db.db import transaction
+        from cheminf.molecules.structure import ensure_structure_columns
+        from cheminf.molecules.descriptors import ensure_descriptor_table
+        from cheminf.molecules.fingerprints import ensure_fingerprint_table
+        from cheminf.molecules.bulk_import import detect_format, import_molecules as run_import
+        with transaction() as conn:
+            ensure_structure_columns(conn)
+            ensure_descriptor_table(conn)
+            ensure_fingerprint_table(conn)
+        fmt = detect_format(path, fmt)
+        print(f"Importing {path} ({fmt})...")
+
+        def progress(report):
+            rate = report['records'] / report['elapsed_s'] if report['elapsed_s'] else 0
+            print(f"\r   {report['records']} records, {report['inserted']} inserted, "
+                  f"{report['duplicates']} duplicates, {report['invalid']} invalid ({rate:.0f}/s)", end="", flush=True)
+
+        with open(path, 'rb') as stream:
+            report = run_import(stream, fmt, progress=progress)
+        print()
+        for error in report['errors']:
+            print(f"   ⚠️  record {error['record']}: {error['error']}")
+        if report['errors_truncated']:
+            print(f"   ... {report['invalid'] - len(report['errors'])} more invalid records")
+        print(f"✅ Imported {report['inserted']} of {report['records']} records in {report['elapsed_s']}s")
+        return True
+    except Exception as e:
+        print(f"\n❌ Import failed: {e}")
+        return False
+
 def start_main_app():
     """Start the main Cheminf-EDU application."""
     try:
@@ -100,7 +190,8 @@ def start_main_app():
         
         # Try to import the main app
         try:
-            from cheminf.app import server
+            from cheminf.app import init_app
+            server = init_app()
             app_type = "Flask"
         except ImportError as e1:
             print(f"   Could not import main Flask app: {e1}")
@@ -179,6 +270,10 @@ COMMANDS:
     python scripts/run.py --module NAME     Start specific module
     python scripts/run.py --init-db         Initialize database only
     python scripts/run.py --test-db         Test database connection
+    python scripts/run.py --rebuild-summary Rebuild time series summary/rollup tables
+    python scripts/run.py --sync-descriptors Compute missing molecular descriptors
+    python scripts/run.py --import-molecules FILE [--format sdf|smi|csv]
+                                            Bulk import molecules from a file
     python scripts/run.py --help            Show this help
 
 MODULES:
@@ -250,6 +345,30 @@ def main():
         help='Test database connection and show statistics'
     )
     
+    parser.add_argument(
+        '--rebuild-summary',
+        action='store_true',
+        help='Rebuild the time series summary and rollup tables from raw data and exit'
+    )
+    
+    parser.add_argument(
+        '--sync-descriptors',
+        action='store_true',
+        help='Compute descriptors for molecules that have none and exit'
+    )
+    
+    parser.add_argument(
+        '--import-molecules',
+        metavar='FILE',
+        help='Bulk import molecules from a .sdf, .smi or .csv file and exit'
+    )
+    
+    parser.add_argument(
+        '--format',
+        choices=['sdf', 'smi', 'csv'],
+        help='File format for --import-molecules (default: from the extension)'
+    )
+    
     parser.add_argument(
         '--help-detailed',
         action='store_true',
@@ -287,6 +406,21 @@ def main():
             sys.exit(1)
         return
     
+    if args.rebuild_summary:
+        if not rebuild_summaries():
+            sys.exit(1)
+        return
+    
+    if args.sync_descriptors:
+        if not sync_descriptors():
+            sys.exit(1)
+        return
+    
+    if args.import_molecules:
+        if not import_molecules(args.import_molecules, args.format):
+            sys.exit(1)
+        return
+    
     if args.module:
         if not start_module(args.module):
             sys.exit(1)
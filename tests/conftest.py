@@ -0,0 +1,31 @@
+"""
+Shared fixtures. Every test runs against a copy of cheminf_edu.db in a temporary
+directory, so the tracked database is never written.
+"""
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from cheminf.db import db
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Path of a scratch copy of the sample database, used by every pooled connection."""
+    path = tmp_path / "cheminf_edu.db"
+    shutil.copy(PROJECT_ROOT / "cheminf_edu.db", path)
+    db.close_pool()
+    monkeypatch.setattr(db, "DB_PATH", path)
+    yield path
+    db.close_pool()
+
+@pytest.fixture
+def client(database):
+    """Flask test client of the full application, initialised against the scratch database."""
+    from cheminf.app import init_app
+    return init_app().test_client()
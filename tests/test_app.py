@@ -0,0 +1,43 @@
+import hashlib
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+IMPORT_APP = """
+import sys
+from pathlib import Path
+from cheminf.db import db
+db.DB_PATH = Path(sys.argv[1])
+import cheminf.app
+"""
+
+def test_importing_the_app_does_not_write_the_database(database):
+    before = hashlib.md5(database.read_bytes()).hexdigest()
+    subprocess.run([sys.executable, "-c", IMPORT_APP, str(database)], cwd=PROJECT_ROOT, check=True,
+                   capture_output=True)
+    assert hashlib.md5(database.read_bytes()).hexdigest() == before
+    assert sorted(path.name for path in database.parent.iterdir()) == [database.name]
+
+def test_init_app_prepares_the_database(client, database):
+    from cheminf.db.db import execute_query, DB_PREFIX
+    tables = {row["name"] for row in execute_query("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {f"{DB_PREFIX}time_series_summary", f"{DB_PREFIX}molecule_descriptors"} <= tables
+    assert client.get("/api/v1/timeseries/experiments").status_code == 200
+
+def test_lazy_layout_loads_only_inside_a_request():
+    from flask import Flask
+    from cheminf.ui_utils import lazy_layout
+    calls = []
+    serve = lazy_layout(lambda rows: rows, rows=lambda: calls.append(1) or ["row"])
+    assert serve() == [] and calls == []
+    with Flask(__name__).test_request_context():
+        assert serve() == ["row"] and calls == [1]
+
+def test_pages_read_the_database_per_request(client):
+    from cheminf.db.db import execute_query, DB_PREFIX
+    execute_query(f"INSERT INTO {DB_PREFIX}project (name) VALUES ('Layout probe')")
+    with client.session_transaction() as session:
+        session["authenticated"] = True
+    assert b"Layout probe" in client.get("/projects/_dash-layout").data
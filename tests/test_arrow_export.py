@@ -0,0 +1,49 @@
+import pyarrow as pa
+
+from cheminf.db import db
+from cheminf.time_series.arrow_export import stream_arrow
+
+EXPERIMENT = 5
+EXPORT_URL = f"/api/v1/timeseries/export?experiment_ids={EXPERIMENT}&format=arrow"
+
+def read_stream(data):
+    return pa.ipc.open_stream(data).read_all()
+
+def insert_point(time_step, timestamp, value, unit):
+    db.execute_query(f"INSERT INTO {db.DB_PREFIX}time_series "
+                     f"(experiment_id, series_name, parameter_name, time_step, timestamp, value, unit) "
+                     f"VALUES (?, 'odd', 'zz_odd', ?, ?, ?, ?)", (EXPERIMENT, time_step, timestamp, value, unit))
+
+def test_types_come_from_the_declared_columns_not_the_first_batch(database):
+    names = ["time_step", "timestamp", "value", "unit"]
+    batches = [(names, [(1, "2025-01-01T00:00:00Z", 1, "bar")]),
+               (names, [(2.0, 1735689600, 2.5, 7), (2.5, None, "n/a", None)])]
+    table = read_stream(b"".join(stream_arrow(iter(batches), "arrow")))
+    assert table.schema.field("time_step").type == pa.int64()
+    assert table.schema.field("timestamp").type == pa.string()
+    assert table.schema.field("value").type == pa.float64()
+    assert table.column("time_step").to_pylist() == [1, 2, None]
+    assert table.column("timestamp").to_pylist() == ["2025-01-01T00:00:00Z", "1735689600", None]
+    assert table.column("value").to_pylist() == [1.0, 2.5, None]
+    assert table.column("unit").to_pylist() == ["bar", "7", None]
+
+def test_export_of_mixed_type_rows_is_complete(client):
+    insert_point(1, "2025-01-01T00:00:00Z", 1.5, "bar")
+    insert_point(2, 1735689600, 2, 3)  # numeric timestamp and unit, integer value
+    insert_point(3, "2025-01-01T00:02:00Z", "n/a", "bar")
+    response = client.get(EXPORT_URL)
+    assert response.status_code == 200
+    table = read_stream(response.data)
+    odd = [row for row in table.to_pylist() if row["parameter_name"] == "zz_odd"]
+    assert [row["timestamp"] for row in odd] == ["2025-01-01T00:00:00Z", "1735689600", "2025-01-01T00:02:00Z"]
+    assert [row["value"] for row in odd] == [1.5, 2.0, None]
+    assert [row["unit"] for row in odd] == ["bar", "3", "bar"]
+    assert table.num_rows == db.execute_query(f"SELECT COUNT(*) AS n FROM {db.DB_PREFIX}time_series "
+                                              f"WHERE experiment_id = ?", (EXPERIMENT,))[0]["n"]
+
+def test_mean_downsampling_keeps_fractional_time_steps(client):
+    response = client.get(f"/api/v1/timeseries/experiments/{EXPERIMENT}/data?format=arrow&sampling=mean"
+                          f"&sampling_value=7&parameters=Pressure")
+    table = read_stream(response.data)
+    assert table.schema.field("time_step").type == pa.float64()
+    assert any(not step.is_integer() for step in table.column("time_step").to_pylist())
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from cheminf.time_series.downsampling import (METHODS, MIN_POINTS, downsample, downsample_rows, lttb_indices,
+                                              minmax_indices)
+
+@pytest.fixture
+def series():
+    x = np.arange(1000, dtype=np.float64)
+    return x, np.sin(x / 25) + (x == 500) * 5  # one spike
+
+@pytest.mark.parametrize("max_points", [0, 1, 2, -5])
+def test_lttb_rejects_fewer_than_three_points(series, max_points):
+    with pytest.raises(ValueError):
+        lttb_indices(*series, max_points)
+
+@pytest.mark.parametrize("method", METHODS)
+def test_too_small_max_points_raise_for_every_entry_point(series, method):
+    rows = [{"time_step": i, "value": v} for i, v in enumerate(series[1])]
+    with pytest.raises(ValueError):
+        downsample(*series, MIN_POINTS[method] - 1, method)
+    with pytest.raises(ValueError):
+        downsample_rows(rows[:1], MIN_POINTS[method] - 1, method)
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("max_points", [3, 10, 250])
+def test_output_is_bounded_and_ordered(series, method, max_points):
+    x_out, y_out, idx = downsample(*series, max_points, method)
+    assert len(x_out) == len(y_out) == len(idx) <= max_points
+    assert np.all(np.diff(idx) > 0)
+
+def test_lttb_keeps_the_ends_and_the_spike(series):
+    idx = lttb_indices(*series, 50)
+    assert len(idx) == 50
+    assert idx[0] == 0 and idx[-1] == 999
+    assert 500 in idx
+
+def test_minmax_keeps_the_spike(series):
+    assert 500 in minmax_indices(*series, 20)
+
+def test_short_series_are_returned_whole(series):
+    x, y = series[0][:10], series[1][:10]
+    for method in METHODS:
+        assert len(downsample(x, y, 100, method)[0]) == 10
+
+def test_non_finite_values_are_dropped_and_indices_map_back():
+    x = np.arange(20, dtype=np.float64)
+    y = x.copy()
+    y[[3, 7]] = np.nan
+    _, y_out, idx = downsample(x, y, 5, 'lttb')
+    assert np.all(np.isfinite(y_out))
+    assert np.array_equal(y[idx], y_out)
@@ -0,0 +1,42 @@
+import pytest
+
+from cheminf.molecules.repository import molecules
+from cheminf.molecules.ui import parse_filter_query
+
+def test_contains_is_case_sensitive_like_dash():
+    assert parse_filter_query("{MoleculeUpacName} contains acid") == [("MoleculeUpacName", "contains", "acid")]
+    assert parse_filter_query("{MoleculeUpacName} scontains acid") == [("MoleculeUpacName", "contains", "acid")]
+    assert parse_filter_query("{MoleculeUpacName} icontains acid") == [("MoleculeUpacName", "icontains", "acid")]
+
+def test_contains_filters_match_case_as_dash_does(database):
+    _, sensitive = molecules.page(filters=parse_filter_query("{MoleculeUpacName} contains acid"))
+    _, exact_case = molecules.page(filters=parse_filter_query("{MoleculeUpacName} contains Acid"))
+    _, insensitive = molecules.page(filters=parse_filter_query("{MoleculeUpacName} icontains acid"))
+    assert sensitive == 0
+    assert exact_case > 0
+    assert insensitive == exact_case
+
+def test_clauses_are_split_on_and_outside_quotes_only():
+    query = '{MoleculeUpacName} contains "a && b" && {SMILES} icontains \'C && O\' && {id} > 5'
+    assert parse_filter_query(query) == [
+        ("MoleculeUpacName", "contains", "a && b"),
+        ("SMILES", "icontains", "C && O"),
+        ("id", ">", 5),
+    ]
+
+def test_quoted_values_keep_escaped_quotes():
+    assert parse_filter_query(r'{MoleculeUpacName} = "say \"hi\""') == [("MoleculeUpacName", "=", 'say "hi"')]
+    assert parse_filter_query("{MoleculeUpacName} contains O'Brien") == [("MoleculeUpacName", "contains", "O'Brien")]
+
+def test_empty_query_has_no_filters():
+    assert parse_filter_query("") == []
+    assert parse_filter_query(None) == []
+
+@pytest.mark.parametrize("query", [
+    "{unknown} contains x",
+    "{MoleculeUpacName} matches x",
+    "{MoleculeUpacName} contains acid && garbage",
+])
+def test_unsupported_filters_raise(query):
+    with pytest.raises(ValueError):
+        parse_filter_query(query)
@@ -0,0 +1,33 @@
+import pytest
+
+from cheminf.db import db
+from cheminf.db.indexes import INDEXES, check_query_plans, ensure_indexes, missing_indexes, plan_checks
+from cheminf.time_series.summary import ensure_summary_table
+
+@pytest.fixture
+def connection(database):
+    connection = db.get_db_connection()
+    ensure_summary_table(connection)  # created by init_app(); the listing pages join it
+    connection.commit()
+    yield connection
+    connection.close()
+
+def test_every_hot_query_searches_an_index(connection):
+    ensure_indexes(connection)
+    results = check_query_plans(connection)
+    assert len(results) == len(plan_checks())
+    for description, ok, plan in results:
+        assert ok, f"{description}: {plan}"
+        assert any(" USING INDEX " in line or " USING COVERING INDEX " in line for line in plan)
+
+def test_missing_indexes_fail_the_check(connection):
+    ensure_indexes(connection)
+    connection.execute(f"DROP INDEX {db.DB_PREFIX}idx_samples_experiment")
+    results = {description: ok for description, ok, _ in check_query_plans(connection)}
+    assert results["samples by experiment"] is False
+    assert [name for name, _, _ in missing_indexes(connection)] == [f"{db.DB_PREFIX}idx_samples_experiment"]
+
+def test_ensure_indexes_creates_each_declared_index_once(connection):
+    assert len(ensure_indexes(connection)) == len(INDEXES)  # the sample database ships without them
+    assert ensure_indexes(connection) == []
+    assert missing_indexes(connection) == []
@@ -0,0 +1,69 @@
+import pytest
+
+from cheminf.db import db
+from cheminf.time_series import rest_api
+from cheminf.time_series.ingest import IngestQueueFull, IngestWriter, prepare_points, stop_writer
+
+EXPERIMENT = 5
+DATA_URL = f"/api/v1/timeseries/experiments/{EXPERIMENT}/data"
+
+def points(count, parameter="Flow"):
+    return [{"parameter_name": parameter, "value": i, "unit": "L/min", "timestamp": f"2025-03-01T00:00:{i:02d}Z"}
+            for i in range(count)]
+
+def stored(parameter):
+    return db.execute_query(f"SELECT COUNT(*) AS n FROM {db.DB_PREFIX}time_series "
+                            f"WHERE experiment_id = ? AND parameter_name = ?", (EXPERIMENT, parameter))[0]["n"]
+
+@pytest.fixture
+def ingest_client(client):
+    yield client
+    stop_writer()  # write anything still queued before the scratch database goes away
+
+def test_wait_answers_201_once_committed(ingest_client):
+    response = ingest_client.post(DATA_URL, json={"data_points": points(5)})
+    assert response.status_code == 201
+    assert response.get_json()["data"]["inserted_points"] == 5
+    assert stored("Flow") == 5
+
+def test_no_wait_answers_202_and_writes_later(ingest_client):
+    response = ingest_client.post(f"{DATA_URL}?wait=false", json={"data_points": points(5)})
+    assert response.status_code == 202
+    assert response.get_json()["data"]["queued_points"] == 5
+    stop_writer()
+    assert stored("Flow") == 5
+
+def test_full_queue_answers_429_with_retry_after(ingest_client, monkeypatch):
+    writer = IngestWriter(max_points=3)  # not started, so queued points stay queued
+    writer.submit(prepare_points(EXPERIMENT, points(3, "Backlog")))
+    monkeypatch.setattr(rest_api, "get_writer", lambda: writer)
+    response = ingest_client.post(DATA_URL, json={"data_points": points(1)})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert writer.metrics()["rejected_requests"] == 1
+    assert stored("Flow") == 0
+
+def test_invalid_point_is_rejected_before_queueing(ingest_client):
+    response = ingest_client.post(DATA_URL, json={"data_points": points(2) + [{"parameter_name": "Flow"}]})
+    assert response.status_code == 400
+    assert "Data point 3" in response.get_json()["error"]
+
+def test_queue_takes_an_oversized_request_when_empty():
+    writer = IngestWriter(max_points=3)
+    writer.submit([()] * 5)
+    with pytest.raises(IngestQueueFull):
+        writer.submit([()])
+
+def test_writer_coalesces_requests_and_isolates_a_bad_one(client):
+    writer = IngestWriter(batch_points=100)
+    good = [writer.submit(prepare_points(EXPERIMENT, points(3))) for _ in range(3)]
+    bad = writer.submit([(EXPERIMENT, "Flow-Series", "Flow", 1, "2025-03-01T00:00:00Z", 1.0, "L/min")])  # 7 columns
+    writer.start()
+    writer.stop(timeout=10)
+    assert [ticket.wait(0) for ticket in good] == [3, 3, 3]
+    with pytest.raises(Exception):
+        bad.wait(0)
+    metrics = writer.metrics()
+    assert metrics["failed_requests"] == 1
+    assert metrics["last_batch_requests"] == 4
+    assert stored("Flow") == 9
@@ -0,0 +1,27 @@
+from cheminf.db import db
+from cheminf.molecules.depiction import MAX_SPRITE_PIXELS
+
+IMAGES_URL = "/api/molecules/images"
+
+def molecule_ids(count):
+    return [row["id"] for row in db.execute_query(
+        f"SELECT id FROM {db.DB_PREFIX}molecules WHERE SMILES IS NOT NULL ORDER BY id LIMIT ?", (count,))]
+
+def test_sprite_columns_are_clamped_to_the_number_of_ids(client):
+    ids = molecule_ids(3)
+    response = client.post(IMAGES_URL, json={"ids": ids, "format": "sprite", "size": 50, "columns": 1000})
+    assert response.status_code == 200
+    assert response.headers["X-Sprite-Columns"] == str(len(ids))
+
+def test_sprite_over_the_pixel_budget_is_rejected(client):
+    # 1000 columns x 1 row of 1000 px tiles would be a 1e9 px sheet
+    ids = (molecule_ids(1) * 1000)[:1000]
+    response = client.post(IMAGES_URL, json={"ids": ids, "format": "sprite", "size": 1000, "columns": 1000})
+    assert response.status_code == 400
+    assert str(MAX_SPRITE_PIXELS) in response.get_json()["error"]
+
+def test_zip_is_not_limited_by_the_sprite_budget(client):
+    ids = molecule_ids(2)
+    response = client.post(IMAGES_URL, json={"ids": ids, "format": "zip", "size": 1000, "columns": 1000})
+    assert response.status_code == 200
+    assert response.mimetype == "application/zip"
@@ -0,0 +1,76 @@
+import pytest
+
+from cheminf.db import db
+from cheminf.db.pagination import decode_cursor, encode_cursor, fetch_page
+
+EXPERIMENTS_URL = "/api/v1/timeseries/experiments"
+
+def test_cursor_round_trip():
+    values = ["Name with ünïcode", 42]
+    assert decode_cursor(encode_cursor(values), 2) == values
+
+@pytest.mark.parametrize("token", ["not-base64!", encode_cursor([1]), encode_cursor([{"a": 1}, 2]),
+                                   encode_cursor([[1], 2])])
+def test_invalid_cursors_are_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, 2)
+
+@pytest.fixture
+def names(database):
+    table = f"{db.DB_PREFIX}page_test"
+    db.execute_query(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, name TEXT)")
+    db.execute_many(f"INSERT INTO {table} (name) VALUES (?)", [(f"n{i % 7}",) for i in range(50)])
+    return f"SELECT id, name FROM {table}"
+
+def test_keyset_pages_cover_every_row_once_in_order(names):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = fetch_page(names, ["name", "id"], 8, cursor)
+        seen.extend((row["name"], row["id"]) for row in rows)
+        if cursor is None:
+            break
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) == 50
+
+def test_offset_pages_match_keyset_pages(names):
+    first, cursor = fetch_page(names, ["name", "id"], 10)
+    second, _ = fetch_page(names, ["name", "id"], 10, cursor)
+    assert fetch_page(names, ["name", "id"], 10, offset=10)[0] == second
+    with pytest.raises(ValueError):
+        fetch_page(names, ["name", "id"], 10, cursor, offset=10)
+
+@pytest.fixture
+def experiments(client):
+    """Twelve more experiments with one time series point each (name order differs from id order)."""
+    for i in range(12):
+        db.execute_query(f"INSERT INTO {db.DB_PREFIX}experiments (experiment_name) VALUES (?)", (f"Z-{11 - i:02d}",))
+        experiment_id = db.execute_query(f"SELECT MAX(experiment_id) AS id FROM {db.DB_PREFIX}experiments")[0]["id"]
+        response = client.post(f"/api/v1/timeseries/experiments/{experiment_id}/data",
+                               json={"data_points": [{"parameter_name": "T", "value": i, "timestamp": "2025-01-01"}]})
+        assert response.status_code == 201
+    return db.execute_query(f"SELECT experiment_id FROM {db.DB_PREFIX}experiments e WHERE EXISTS "
+                            f"(SELECT 1 FROM {db.DB_PREFIX}time_series t WHERE t.experiment_id = e.experiment_id) "
+                            f"ORDER BY experiment_name, experiment_id")
+
+def test_experiments_listing_pages_by_cursor(client, experiments):
+    ids, cursor = [], None
+    while True:
+        response = client.get(f"{EXPERIMENTS_URL}?limit=4" + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        body = response.get_json()
+        page = body["data"]["experiments"]
+        assert all(row["series_count"] >= 1 for row in page)
+        ids.extend(row["experiment_id"] for row in page)
+        cursor = body["data"]["metadata"]["next_cursor"]
+        assert response.headers.get("X-Next-Cursor") == cursor
+        if cursor is None:
+            break
+    assert ids == [row["experiment_id"] for row in experiments]
+
+def test_experiments_listing_offset_and_bad_requests(client, experiments):
+    page = client.get(f"{EXPERIMENTS_URL}?limit=5&offset=5").get_json()["data"]["experiments"]
+    assert [row["experiment_id"] for row in page] == [row["experiment_id"] for row in experiments[5:10]]
+    cursor = client.get(f"{EXPERIMENTS_URL}?limit=5").get_json()["data"]["metadata"]["next_cursor"]
+    assert client.get(f"{EXPERIMENTS_URL}?cursor={cursor}&offset=5").status_code == 400
+    assert client.get(f"{EXPERIMENTS_URL}?cursor=garbage").status_code == 400
+    assert client.get(f"{EXPERIMENTS_URL}?offset=-1").status_code == 400
@@ -0,0 +1,61 @@
+import sqlite3
+
+import pytest
+
+from cheminf.db import db
+from cheminf.db.pool import ConnectionPool, PooledConnection
+
+TABLE = f"{db.DB_PREFIX}pool_test"
+
+def count_rows():
+    return db.execute_query(f"SELECT COUNT(*) AS n FROM {TABLE}")[0]["n"]
+
+@pytest.fixture
+def table(database):
+    db.execute_query(f"CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, name TEXT)")
+    return TABLE
+
+def test_nested_acquire_returns_the_same_connection(tmp_path):
+    path = tmp_path / "pool.db"
+    pool = ConnectionPool(lambda: sqlite3.connect(path, factory=PooledConnection), max_size=2)
+    outer = pool.acquire()
+    inner = pool.acquire()
+    assert inner is outer
+    inner.close()
+    assert pool.stats()["in_use"] == 1
+    outer.close()
+    assert pool.stats()["in_use"] == 0
+    pool.close_all()
+
+def test_inner_execute_query_does_not_commit_the_outer_transaction(table):
+    with pytest.raises(RuntimeError):
+        with db.transaction() as connection:
+            connection.execute(f"INSERT INTO {table} (name) VALUES ('outer')")
+            db.execute_query(f"INSERT INTO {table} (name) VALUES (?)", ("inner",))
+            raise RuntimeError("abort")
+    assert count_rows() == 0
+
+def test_nested_transaction_rolls_back_to_its_savepoint(table):
+    with db.transaction() as connection:
+        connection.execute(f"INSERT INTO {table} (name) VALUES ('outer')")
+        with pytest.raises(RuntimeError):
+            with db.transaction() as inner:
+                inner.execute(f"INSERT INTO {table} (name) VALUES ('inner')")
+                raise RuntimeError("abort inner")
+        db.execute_query(f"INSERT INTO {table} (name) VALUES ('after')")
+    names = [row["name"] for row in db.execute_query(f"SELECT name FROM {table} ORDER BY id")]
+    assert names == ["outer", "after"]
+
+def test_execute_query_outside_a_transaction_commits(table):
+    db.execute_query(f"INSERT INTO {table} (name) VALUES ('solo')")
+    db.close_pool()
+    assert count_rows() == 1
+
+def test_transaction_can_be_nested_in_an_open_read(table):
+    db.execute_query(f"INSERT INTO {table} (name) VALUES ('a')")
+    rows = db.iter_query(f"SELECT name FROM {table}")
+    assert next(rows)["name"] == "a"
+    with db.transaction() as connection:
+        connection.execute(f"INSERT INTO {table} (name) VALUES ('b')")
+    rows.close()
+    assert count_rows() == 2
@@ -0,0 +1,62 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from cheminf.db import db
+from cheminf.time_series.rollups import RESOLUTIONS, ROLLUP_TABLE, rebuild_rollups
+
+EXPERIMENT = 5
+DATA_URL = f"/api/v1/timeseries/experiments/{EXPERIMENT}/data"
+START = datetime(2025, 3, 1, 22, 0)
+
+@pytest.fixture
+def flow(client):
+    """Flow points every 10 minutes from 22:00 to 02:00 across a day boundary, posted with ISO timestamps."""
+    points = [{"parameter_name": "Flow", "value": float(i), "unit": "L/min", "time_step": i + 1,
+               "timestamp": (START + timedelta(minutes=10 * i)).strftime("%Y-%m-%dT%H:%M:%SZ")}
+              for i in range(25)]
+    response = client.post(DATA_URL, json={"data_points": points})
+    assert response.status_code == 201
+    return points
+
+def raw_buckets(client, start, end, fmt):
+    rows = client.get(f"{DATA_URL}?parameters=Flow&time_range_start={start}&time_range_end={end}"
+                      ).get_json()["data"]["timeseries_data"]
+    buckets = defaultdict(list)
+    for row in rows:
+        buckets[datetime.strptime(row["timestamp"], "%Y-%m-%dT%H:%M:%SZ").strftime(fmt)].append(row["value"])
+    return buckets
+
+@pytest.mark.parametrize("aggregation,resolution", [("minute", "minute"), ("hourly", "hour"), ("daily", "day")])
+@pytest.mark.parametrize("start,end", [
+    ("2025-03-01T23:25:00Z", "2025-03-02T01:35:00Z"),
+    ("2025-03-01T22:00:00Z", "2025-03-02T02:00:00Z"),
+    ("2025-03-02T00:00:00Z", "2025-03-02T00:59:59Z"),
+])
+def test_range_query_keeps_the_buckets_of_the_raw_points(client, flow, aggregation, resolution, start, end):
+    expected = raw_buckets(client, start, end, RESOLUTIONS[resolution])
+    rows = client.get(f"{DATA_URL}?parameters=Flow&aggregation={aggregation}"
+                      f"&time_range_start={start}&time_range_end={end}").get_json()["data"]["timeseries_data"]
+    assert [row["timestamp"] for row in rows] == sorted(expected)
+    # Buckets wholly inside the range aggregate exactly the raw points
+    first, last = sorted(expected)[0], sorted(expected)[-1]
+    for row in rows:
+        if first < row["timestamp"] < last:
+            values = expected[row["timestamp"]]
+            assert row["data_points"] == len(values)
+            assert row["value"] == pytest.approx(sum(values) / len(values))
+
+def test_custom_aggregation_counts_buckets_on_the_same_boundaries(client, flow):
+    rows = client.get(f"{DATA_URL}?parameters=Flow&aggregation=custom&limit=3"
+                      f"&time_range_start=2025-03-01T23:25:00Z&time_range_end=2025-03-02T01:35:00Z"
+                      ).get_json()["data"]["timeseries_data"]
+    assert [row["timestamp"] for row in rows] == ["2025-03-01 23:00:00", "2025-03-02 00:00:00",
+                                                  "2025-03-02 01:00:00"]
+
+def test_incremental_rollups_match_a_rebuild(client, flow):
+    query = f"SELECT * FROM {ROLLUP_TABLE} ORDER BY experiment_id, resolution, parameter_name, unit, bucket_start"
+    incremental = db.execute_query(query)
+    with db.transaction() as connection:
+        rebuild_rollups(connection)
+    assert db.execute_query(query) == incremental
@@ -0,0 +1,108 @@
+import io
+import threading
+import time
+
+import pytest
+
+from cheminf.db import db
+from cheminf.time_series import stream_ingest
+from cheminf.time_series.ingest import IngestWriter, stop_writer
+from cheminf.time_series.stream_ingest import StreamIngest, iter_blocks
+
+EXPERIMENT = 5
+STREAM_URL = f"/api/v1/timeseries/experiments/{EXPERIMENT}/stream"
+
+def stored(parameter):
+    return db.execute_query(f"SELECT COUNT(*) AS n FROM {db.DB_PREFIX}time_series "
+                            f"WHERE experiment_id = ? AND parameter_name = ?", (EXPERIMENT, parameter))[0]["n"]
+
+class ChunkedInput(io.RawIOBase):
+    """Request body arriving in pieces, like a chunked upload, without a native readline()."""
+
+    def __init__(self, chunks, wait=None):
+        self.chunks = list(chunks)
+        self.wait = wait  # called before each chunk after the first, e.g. to stay quiet for a while
+        self.served = 0
+        self.partial = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.chunks:
+            return 0
+        if self.served and self.wait and not self.partial:
+            self.wait()
+        chunk = self.chunks.pop(0)
+        size = min(len(buffer), len(chunk))
+        buffer[:size] = chunk[:size]
+        self.partial = size < len(chunk)
+        if self.partial:
+            self.chunks.insert(0, chunk[size:])
+        else:
+            self.served += 1
+        return size
+
+@pytest.fixture
+def stream_client(client):
+    yield client
+    stop_writer()
+
+def test_line_protocol_body_is_committed(stream_client):
+    body = b"Flow,unit=L/min 1.5 2025-03-01T00:00:00Z\n# comment\nFlow 2.5 2025-03-01T00:00:01Z 7\nFlow oops now\n"
+    response = stream_client.post(STREAM_URL, data=body, content_type="text/plain")
+    assert response.status_code == 201
+    data = response.get_json()["data"]
+    assert (data["lines"], data["inserted_points"], data["rejected_lines"]) == (4, 2, 1)
+    assert "Line 4" in data["errors"][0]
+    assert stored("Flow") == 2
+
+def test_ndjson_body_is_committed(stream_client):
+    body = b'{"parameter_name": "Flow", "value": 1, "timestamp": "2025-03-01T00:00:00Z"}\n{"value": 2}\n'
+    response = stream_client.post(STREAM_URL, data=body, content_type="application/x-ndjson")
+    assert response.status_code == 201
+    assert response.get_json()["data"]["rejected_lines"] == 1
+    assert stored("Flow") == 1
+
+def test_chunked_body_is_read_line_by_line():
+    source = ChunkedInput([b"Flow 1 t\n", b"Flow 2 t\n"])
+    blocks = iter_blocks(source)
+    assert next(blocks) == [b"Flow 1 t\n"]
+    assert source.chunks == [b"Flow 2 t\n"]  # the first line did not wait for the second
+    assert list(blocks) == [[b"Flow 2 t\n"]]
+
+def test_body_of_known_length_is_read_in_blocks():
+    body = b"Flow 1 t\nFlow 2 t\nFlow 3"
+    assert list(iter_blocks(ChunkedInput([body]), len(body))) == [[b"Flow 1 t", b"Flow 2 t"], [b"Flow 3"]]
+
+def test_quiet_sender_is_committed_on_the_flush_timer(stream_client):
+    committed_while_open = []
+
+    def quiet():
+        deadline = time.monotonic() + 5
+        while stored("Flow") == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        committed_while_open.append(stored("Flow"))
+
+    source = ChunkedInput([b"Flow 1 2025-03-01T00:00:00Z\n", b"Flow 2 2025-03-01T00:00:01Z\n"], wait=quiet)
+    ingest = StreamIngest(EXPERIMENT, "line", flush_interval=0.1).run(source)
+    assert committed_while_open == [1]
+    assert ingest.summary()["inserted_points"] == 2
+
+def test_full_queue_stops_reading_and_answers_429(stream_client, monkeypatch):
+    writer = IngestWriter(max_points=1)  # not started, and already full
+    writer.submit([()])
+    monkeypatch.setattr(stream_ingest, "get_writer", lambda: writer)
+    monkeypatch.setattr(stream_ingest, "INGEST_WAIT_TIMEOUT", 0.1)
+
+    source = ChunkedInput([b"Flow 1 t\n", b"Flow 2 t\n", b"Flow 3 t\n"])
+    ingest = StreamIngest(EXPERIMENT, "line", batch_points=1).run(source)
+    assert ingest.busy is not None
+    assert ingest.summary()["dropped_points"] == 1
+    # The rest of the body is left to the server, and no thread is still reading it
+    assert len(source.chunks) == 2
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("timeseries-stream")]
+
+    response = stream_client.post(STREAM_URL, data=b"Flow 1 t\n" * 3, content_type="text/plain")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,57 @@
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+from cheminf.time_series.streaming_stats import StatsAggregate, StreamingStats, TDigest
+
+def exact_quartiles(values):
+    values = np.sort(values)
+    n = len(values)
+    median = values[n // 2] if n % 2 == 1 else (values[n // 2 - 1] + values[n // 2]) / 2
+    return values[n // 4], median, values[3 * n // 4]
+
+def add_all(stats, values):
+    for value in values:
+        stats.add(value)
+    return stats
+
+@pytest.mark.parametrize("n", [1, 2, 7, 1000])
+def test_small_groups_are_exact(n):
+    values = np.random.default_rng(n).normal(50, 10, n)
+    stats = add_all(StreamingStats(), values)
+    assert stats.quartiles() == pytest.approx(exact_quartiles(values))
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.variance == pytest.approx(values.var())
+
+@pytest.mark.parametrize("distribution", ["normal", "exponential", "uniform"])
+def test_tdigest_quartiles_are_within_half_a_percentile(distribution):
+    rng = np.random.default_rng(6)
+    values = getattr(rng, distribution)(size=50000)
+    stats = add_all(StreamingStats(exact_limit=1000), values)  # switches to the digest early
+    estimates = stats.quartiles()
+    for q, estimate in zip((0.25, 0.5, 0.75), estimates):
+        rank = np.searchsorted(np.sort(values), estimate) / len(values)
+        assert abs(rank - q) < 0.005
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.minimum == values.min() and stats.maximum == values.max()
+
+def test_tdigest_memory_stays_bounded():
+    digest = TDigest(compression=100)
+    digest.extend(np.random.default_rng(1).random(200000))
+    assert len(digest._means) <= 100
+
+def test_none_values_are_skipped():
+    stats = add_all(StreamingStats(), [1.0, None, 3.0])
+    assert stats.count == 2 and stats.quartiles()[1] == 2.0
+
+def test_sql_aggregate_matches_the_streaming_result():
+    connection = sqlite3.connect(":memory:")
+    connection.create_aggregate("ts_stats", 1, StatsAggregate)
+    connection.execute("CREATE TABLE t (value REAL)")
+    connection.executemany("INSERT INTO t VALUES (?)", [(float(i),) for i in range(1, 101)])
+    result = json.loads(connection.execute("SELECT ts_stats(value) FROM t").fetchone()[0])
+    assert result["median"] == 50.5
+    assert result["q1"] == 26.0 and result["q3"] == 76.0
+    assert result["iqr"] == 50.0
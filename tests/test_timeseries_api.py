@@ -0,0 +1,31 @@
+import pytest
+
+from cheminf.db import db
+from cheminf.time_series.summary import SUMMARY_TABLE
+
+EXPERIMENT = 5  # sample experiment with Pressure, Temperature, Yield and pH series
+DATA_URL = f"/api/v1/timeseries/experiments/{EXPERIMENT}/data"
+
+def parameters_of(response):
+    return sorted({row["parameter_name"] for row in response.get_json()["data"]["timeseries_data"]})
+
+def test_raw_data_does_not_depend_on_the_summary_table(client):
+    before = parameters_of(client.get(DATA_URL))
+    assert before == ["Pressure", "Temperature", "Yield", "pH"]
+    db.execute_query(f"DELETE FROM {SUMMARY_TABLE} WHERE experiment_id = ? AND parameter_name = ?",
+                     (EXPERIMENT, "Yield"))
+    assert parameters_of(client.get(DATA_URL)) == before
+    db.execute_query(f"DELETE FROM {SUMMARY_TABLE} WHERE experiment_id = ?", (EXPERIMENT,))
+    assert parameters_of(client.get(DATA_URL)) == before
+
+def test_raw_data_includes_points_without_a_parameter_name(client):
+    db.execute_query(f"INSERT INTO {db.DB_PREFIX}time_series "
+                     f"(experiment_id, series_name, parameter_name, time_step, timestamp, value) "
+                     f"VALUES (?, 'unnamed', NULL, 1, '2025-01-01T00:00:00Z', 1.5)", (EXPERIMENT,))
+    rows = client.get(DATA_URL).get_json()["data"]["timeseries_data"]
+    assert [row["value"] for row in rows if row["parameter_name"] is None] == [1.5]
+
+@pytest.mark.parametrize("sampling", ["lttb", "minmax", "mean"])
+def test_downsampling_below_three_points_is_rejected(client, sampling):
+    response = client.get(f"{DATA_URL}?sampling={sampling}&sampling_value=2")
+    assert response.status_code == 400